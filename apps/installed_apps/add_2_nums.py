@@ -1,4 +1,3 @@
-import time  # type:ignore
 from math import *
 # import machine
 from data_modules.object_handler import display, nav, typer, keypad_state_manager, form, form_refresh
@@ -48,4 +47,3 @@ def add_2_nums(db={}):
         if inp not in ["alpha", "beta", "ok"]:
             form.update_buffer(inp)
         form_refresh.refresh(state=nav.current_state())
-        time.sleep(0.15)
\ No newline at end of file
@@ -1,7 +1,7 @@
 # from mocking import utime as time  # type:ignore
-from math import *
 from mocking import machine
 from data_modules.object_handler import display, text, nav, text_refresh, typer, keypad_state_manager, keypad_state_manager_reset, current_app, app
+from process_modules.expression import evaluate_expression
 # from process_modules import boot_up_data_update
 # import uasyncio as asyncio
 # from test_async import main, cancel_task
@@ -43,7 +43,7 @@ def calculate():
 
             if x == "ans" and text.text_buffer[0] != "𖤓":
                 try:
-                    res = str(eval(text.text_buffer[:text.text_buffer_nospace]))
+                    res = str(evaluate_expression(text.text_buffer[:text.text_buffer_nospace]))
                 except Exception as e:
                     res = "Invalid Input"
                 text.all_clear()
@@ -1,4 +1,3 @@
-import time
 import json
 from data_modules.object_handler import nav, keypad_state_manager, typer
 from data_modules.object_handler import app, display, menu, menu_refresh
@@ -31,6 +30,5 @@ def home(db={}):
                 break
             menu.update_buffer(inp)
             menu_refresh.refresh(state=nav.current_state())
-            time.sleep(0.2)
     except Exception as e:
         print(f"Error: {e}")
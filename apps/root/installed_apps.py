@@ -1,4 +1,3 @@
-import time
 # import json
 # # import machine
 from data_modules.object_handler import nav, keypad_state_manager, menu, menu_refresh, typer, display, app
@@ -8,7 +7,6 @@ from process_modules.app_downloader import Apps
 from data_modules.object_handler import apps_installer
 
 def installed_apps():
-    time.sleep(0.1)
     # apps_installer=Apps()
     display.clear_display()
     # json_file = "/db/installed_apps.json"
@@ -45,6 +43,5 @@ def installed_apps():
                 break
             menu.update_buffer(inp)
             menu_refresh.refresh(state=nav.current_state())
-            time.sleep(0.2)
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -1,4 +1,3 @@
-import time
 import json
 # import machine
 from data_modules.object_handler import current_app, nav, keypad_state_manager, menu, menu_refresh, typer, display
@@ -52,6 +51,5 @@ def settings():
                 break
             menu.update_buffer(inp_menu)
             menu_refresh.refresh(state=nav.current_state())
-            time.sleep(0.2)
     except Exception as e:
         print(f"Error: {e}")
@@ -1,4 +1,3 @@
-from mocking import utime as time  # type:ignore
 from data_modules.object_handler import display, nav, typer, keypad_state_manager, chrs
 from data_modules.object_handler import current_app, data_bucket
 from process_modules.search_buffer import SearchBuffer
@@ -57,4 +56,3 @@ def constants(db={}):
             search_buffer.update_buffer(inp)
 
         search_uploader.refresh(state=nav.current_state())
-        time.sleep(0.1)
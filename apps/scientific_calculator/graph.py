@@ -1,62 +1,45 @@
 from mocking import framebuf # type: ignore
 import math
+import threading
 from mocking import utime as time  # type:ignore
 from data_modules.object_handler import display, form, nav, text, text_refresh, form_refresh, typer, keypad_state_manager, keypad_state_manager_reset
-from data_modules.object_handler import current_app
+from data_modules.object_handler import current_app, chrs
+from process_modules.expression import compile_function, evaluate_expression
+from process_modules.sample_cache import get_sample_cache
+from process_modules.plot_worker import PlotWorker
+from process_modules.adaptive_sampler import sample_curve
+from process_modules.table_buffer import TableBuffer
+from process_modules.menu_buffer_uploader import MenuUploader
+from process_modules.solver import brent_root, golden_section_min, sign_changes, turning_points
+from ui import register_idle_hook, unregister_idle_hook, wake
 import gc
 try:
     from mocking import gc_mock  # type: ignore  # Extends gc with MicroPython functions for simulator
 except:
     pass
 
-eval_globals = {
-    # Functions
-    'sin': math.sin,
-    'cos': math.cos,
-    'tan': math.tan,
-    'asin': math.asin,
-    'acos': math.acos,
-    'atan': math.atan,
-    'atan2': math.atan2,
-    'ceil': math.ceil,
-    'copysign': math.copysign,
-    'degrees': math.degrees,
-    'exp': math.exp,
-    'fabs': math.fabs,
-    'floor': math.floor,
-    'fmod': math.fmod,
-    'frexp': math.frexp,
-    'ldexp': math.ldexp,
-    'log': math.log,
-    'modf': math.modf,
-    'pow': math.pow,
-    'radians': math.radians,
-    'sqrt': math.sqrt,
-    'trunc': math.trunc,
-    
-    # Constants
-    'pi': math.pi,
-    'e': math.e,
-}
-
 # Graph configuration for consistent experience
 GRAPH_CONFIG = {
     'zoom_in': 0.8,
     'zoom_out': 1.25,
     'pan_shift': 0.15,
-    'base_samples_per_px': 3,   # Minimum samples per pixel
-    'zoom_quality_factor': 6,   # Extra quality at high zoom
-    'refine_samples': 12,       # Extra samples in rapid change regions
-    'max_jump_fraction': 0.2,   # Break lines if jump exceeds this
-    'min_segment_length': 2,
+    'initial_step_px': 2,       # Spacing of the first sampling pass
+    'max_error_px': 0.5,        # Split until the midpoint lies this close to the drawn line
+    'min_step_px': 1 / 64,      # Finest split, to locate domain edges and jumps
+    'eval_budget_per_px': 8,    # Evaluations per pixel column and frame, shared by f1..f4
     'transition_steps': 6,
     'transition_delay_ms': 15,
     'bottom_margin': 8,
     'smart_ticks': True,
-    'adaptive_increase': 4,     # Multiplier for increasing samples (higher = more aggressive)
-    'adaptive_decrease': 5,     # Divisor for decreasing samples (higher = less aggressive)
+    'axis_labels': False,       # Range labels in the plot corners (draw_axis_labels)
+    'table_step': 1,            # Default x step of the table of values
 }
 
+# Form inputs of f1..f4 and the dash pattern each one is drawn with
+# (one char per pixel along the curve, repeated; None = solid line)
+FUNCTION_INPUTS = ("inp_0", "inp_5", "inp_6", "inp_7")
+FUNCTION_PATTERNS = (None, "111000", "10", "11110100")
+
 # Cursor state
 class CursorState:
     def __init__(self):
@@ -70,6 +53,11 @@ class CursorState:
         current_idx = modes.index(self.mode)
         self.mode = modes[(current_idx + 1) % len(modes)]
 
+    def copy(self):
+        state = CursorState()
+        state.mode, state.x_pixel, state.y_pixel = self.mode, self.x_pixel, self.y_pixel
+        return state
+
     def toggle_active(self):
         """Toggle cursor visibility (none <-> both)."""
         self.mode = 'both' if self.mode == 'none' else 'none'
@@ -134,14 +122,7 @@ class SmallCharacters:
 
 def draw_small_text(fb, text, x, y):
     """Draw text using the 3x5 font on the framebuffer."""
-    for char in text:
-        char_data = SmallCharacters.get_char(char)
-        for col in range(3):  # 3 pixels wide
-            byte = char_data[col]
-            for row in range(5):  # 5 pixels tall
-                if byte & (1 << (4 - row)):  # Bit is set (1)
-                    fb.pixel(x + col, y + row, 1)
-        x += 4  # Move 4 pixels to the right for the next character (3 width + 1 space)
+    blit_columns(fb, text_bitmap(text, SmallCharacters), x, y)
 
 
 class MediumDigits:
@@ -172,14 +153,64 @@ class MediumDigits:
 
 def draw_medium_text(fb, text, x, y):
     """Draw text using a 5x7 font for clearer numeric display."""
+    blit_columns(fb, text_bitmap(text, MediumDigits), x, y)
+
+
+# Text rendered once to MONO_VLSB column bytes (bit 0 = top row), keyed by (font, text)
+TEXT_CACHE_SIZE = 64
+_text_bitmaps = {}
+_render_cache_lock = threading.Lock()  # Guards _text_bitmaps and _axis_layouts (UI thread and plot worker)
+
+
+def text_bitmap(text, font):
+    """Return the column bytes of text in SmallCharacters or MediumDigits, rasterized once."""
+    key = (font, text)
+    with _render_cache_lock:
+        bitmap = _text_bitmaps.get(key)
+    if bitmap is not None:
+        return bitmap
+    columns = bytearray()
     for char in text:
-        char_data = MediumDigits.get_char(char)
-        for col in range(5):
-            byte = char_data[col]
-            for row in range(7):  # 7 rows to fit bottom margin
+        char_data = font.get_char(char)
+        if font is SmallCharacters:
+            # 3x5 glyph columns have the top row in bit 4
+            for byte in char_data:
+                columns.append(sum(1 << row for row in range(5) if byte & (1 << (4 - row))))
+            columns.append(0)  # 3 width + 1 space
+        else:
+            for byte in char_data:
+                columns.append(byte & 0x7F)  # 7 rows to fit bottom margin
+            columns.append(0)  # 5 width + 1 space
+    bitmap = bytes(columns)
+    with _render_cache_lock:
+        if key not in _text_bitmaps and len(_text_bitmaps) >= TEXT_CACHE_SIZE:
+            _text_bitmaps.pop(next(iter(_text_bitmaps)))
+        _text_bitmaps[key] = bitmap
+    return bitmap
+
+
+def blit_columns(fb, columns, x, y):
+    """OR column bytes into a MONO_VLSB framebuffer with the top row at y, a byte per column."""
+    buffer = getattr(fb, 'buffer', None)
+    if buffer is None or getattr(fb, 'format', framebuf.MONO_VLSB) != framebuf.MONO_VLSB:
+        for i, byte in enumerate(columns):
+            for row in range(8):
                 if byte & (1 << row):
-                    fb.pixel(x + col, y + row, 1)
-        x += 6  # 5 width + 1 space
+                    fb.pixel(x + i, y + row, 1)
+        return
+    stride = getattr(fb, 'stride', fb.width)
+    pages = (fb.height + 7) >> 3
+    page = y >> 3
+    shift = y & 7
+    for i, byte in enumerate(columns):
+        col = x + i
+        if not byte or col < 0 or col >= fb.width:
+            continue
+        bits = byte << shift
+        if 0 <= page < pages and bits & 0xFF:
+            buffer[page * stride + col] |= bits & 0xFF
+        if 0 <= page + 1 < pages and bits >> 8:
+            buffer[(page + 1) * stride + col] |= bits >> 8
 
 
 def find_smart_tick_values(min_val, max_val, target_count=8):
@@ -311,12 +342,24 @@ def _mem_free():
 def get_bounds_from_form():
     """Extract bounds from form input."""
     return {
-        'x_min': eval(form.inp_list()["inp_1"], eval_globals),
-        'x_max': eval(form.inp_list()["inp_2"], eval_globals),
-        'y_min': eval(form.inp_list()["inp_3"], eval_globals),
-        'y_max': eval(form.inp_list()["inp_4"], eval_globals),
+        'x_min': evaluate_expression(form.inp_list()["inp_1"]),
+        'x_max': evaluate_expression(form.inp_list()["inp_2"]),
+        'y_min': evaluate_expression(form.inp_list()["inp_3"]),
+        'y_max': evaluate_expression(form.inp_list()["inp_4"]),
     }
 
+def get_functions_from_form():
+    """Return the f1..f4 expressions; blank slots are kept so each function keeps its pattern."""
+    inputs = form.inp_list()
+    return [inputs.get(key, " ") for key in FUNCTION_INPUTS]
+
+def first_function(exp_strs):
+    """The function the cursor reads out: the first non-blank one."""
+    for exp_str in exp_strs:
+        if exp_str.strip():
+            return exp_str
+    return None
+
 def update_bounds(x_min, x_max, y_min, y_max):
     """Update form with new bounds."""
     form.input_list["inp_1"] = format_number(x_min)
@@ -449,51 +492,248 @@ def draw_cursor(fb, cursor_state, bounds, func, exp_str, width=128, height=64):
         # Display "undefined" if function is not defined at this x
         draw_medium_text(fb, "y undef", width - 42, plot_height + 1)
 
-def replot_graph(fb, exp_str, bounds, cursor_state=None):
-    """Clear and replot the graph with new bounds."""
+def view_samples(exp_str, x_lo, x_hi, other=None):
+    """Sorted (x, y) samples already cached for exp_str in [x_lo, x_hi], y None where undefined.
+
+    With other, y is exp_str - other at the x values both caches hold.
+    Falls back to the first-pass sampling grid when the cache has no samples there.
+    """
+    caches = [get_sample_cache(compile_function(exp_str))]
+    if other is not None:
+        caches.append(get_sample_cache(compile_function(other)))
+    # Copies: the plot worker may be adding samples meanwhile
+    tables = [cache.snapshot() for cache in caches]
+    xs = sorted(x for x in tables[0] if x_lo <= x <= x_hi and all(x in table for table in tables[1:]))
+    if len(xs) < 3:
+        _, xs = sampling_grid(x_lo, x_hi, 128, caches[0])
+        tables = [dict(zip(xs, cache.lookup(xs))) for cache in caches]
+    samples = []
+    for x in xs:
+        values = [table[x] for table in tables]
+        if all(ok for _, ok in values):
+            samples.append((x, values[0][0] - values[1][0] if other is not None else values[0][0]))
+        else:
+            samples.append((x, None))
+    return samples
+
+
+def find_feature(kind, exp_strs, bounds, x_from, width=128, height=64):
+    """Return x of the next root, min, max or intersection right of x_from, wrapping around the view.
+
+    Brackets come from the samples the plotter cached; each one is refined
+    with brent_root or golden_section_min on the compiled expression
+    until a real feature is found (a sign change or turning point at a
+    discontinuity is rejected). Returns None when the view has none.
+    """
+    exp_str = first_function(exp_strs)
+    if exp_str is None:
+        return None
+    x_min, x_max = bounds['x_min'], bounds['x_max']
+    x_scale = (x_max - x_min) / (width - 1)
+    y_tol = (bounds['y_max'] - bounds['y_min']) / (height - 1)  # about a pixel
+    x_tol = abs(x_scale) * 1e-9
+
+    def value_of(a_str, b_str=None):
+        def f(x):
+            y = safe_eval(polynom1, a_str, x)
+            if y is None or b_str is None:
+                return y
+            other = safe_eval(polynom1, b_str, x)
+            return None if other is None else y - other
+        return f
+
+    candidates = []  # (a, b, refine)
+    if kind in ('root', 'intersection'):
+        others = [None] if kind == 'root' else [e for e in exp_strs if e.strip() and e is not exp_str]
+        for other in others:
+            f = value_of(exp_str, other)
+            for a, b, fa, fb in sign_changes(view_samples(exp_str, x_min, x_max, other)):
+                def refine(a=a, b=b, fa=fa, fb=fb, f=f):
+                    x = brent_root(f, a, b, fa, fb, xtol=x_tol)
+                    if x is None:
+                        return None
+                    fx = f(x)
+                    return x if fx is not None and abs(fx) <= y_tol else None
+                candidates.append((a, b, refine))
+    else:
+        f = value_of(exp_str)
+        sign = 1 if kind == 'min' else -1
+        for a, b, found in turning_points(view_samples(exp_str, x_min, x_max)):
+            if found != kind:
+                continue
+            def refine(a=a, b=b):
+                result = golden_section_min(lambda x: None if f(x) is None else sign * f(x), a, b, xtol=x_tol)
+                if result is None:
+                    return None
+                x, fx = result
+                # A smooth turning point: both neighbours within a pixel and on the right side
+                h = abs(x_scale) / 8
+                for y in (f(x - h), f(x + h)):
+                    if y is None or abs(sign * y - fx) > y_tol or sign * y < fx - y_tol * 1e-6:
+                        return None
+                return x
+            candidates.append((a, b, refine))
+
+    threshold = x_from + abs(x_scale) / 2
+    candidates.sort(key=lambda candidate: candidate[0])
+    for a, b, refine in candidates:
+        if b > threshold:
+            x = refine()
+            if x is not None and x > threshold:
+                return x
+    for a, b, refine in candidates:
+        if a >= x_from:
+            break
+        x = refine()
+        if x is not None and x < x_from - abs(x_scale) / 2:
+            return x
+    return None
+
+
+def jump_to_feature(kind, exp_strs, bounds, cursor_state, width=128):
+    """Move the cursor to the next root/min/max/intersection; returns False if there is none."""
+    x_scale = (bounds['x_max'] - bounds['x_min']) / (width - 1)
+    if cursor_state.mode == 'none':
+        x_from = bounds['x_min'] - x_scale  # start from the left edge
+    else:
+        x_from = bounds['x_min'] + cursor_state.x_pixel * x_scale
+    x = find_feature(kind, exp_strs, bounds, x_from, width)
+    if x is None:
+        print("no", kind, "in view")
+        return False
+    if cursor_state.mode == 'none':
+        cursor_state.mode = 'both'
+    cursor_state.x_pixel = (x - bounds['x_min']) / x_scale
+    return True
+
+
+def table_view(exp_str, start, step):
+    """Scroll a table of x / f(x) rows; returns (key, x) with the key that left it and the selected x.
+
+    Up/down move the cursor one row, left/right a page; rows are only
+    evaluated when they scroll into view (see TableBuffer).
+    """
+    table = TableBuffer(compile_function(exp_str), start, step)
+    table_refresh = MenuUploader(disp_out=display, chrs=chrs, m_b=table)
+    table_refresh.refresh()
+    while True:
+        inp = typer.start_typing()
+        if inp in ("back", "home", "ok"):
+            return inp, table.selected_x()
+        if inp == "alpha" or inp == "beta":
+            keypad_state_manager(x=inp)
+        else:
+            table.update_buffer(inp)
+        table_refresh.refresh(state=nav.current_state())
+
+
+def render_graph(fb, exp_strs, bounds, cursor_state=None, cancelled=None):
+    """Draw the graph of f1..f4 (or a single expression) into fb."""
+    if isinstance(exp_strs, str):
+        exp_strs = [exp_strs]
     fb.fill(0)
     # Use dynamic bottom margin based on cursor state
     bottom_margin = get_bottom_margin(cursor_state)
-    plot_function(fb=fb, func=polynom1, exp_str=exp_str,
-                  x_min=bounds['x_min'], x_max=bounds['x_max'],
-                  y_min=bounds['y_min'], y_max=bounds['y_max'],
-                  width=128, height=64, bottom_margin=bottom_margin)
-    if cursor_state:
-        draw_cursor(fb, cursor_state, bounds, polynom1, exp_str)
+    plot_functions(fb=fb, exp_strs=exp_strs,
+                   x_min=bounds['x_min'], x_max=bounds['x_max'],
+                   y_min=bounds['y_min'], y_max=bounds['y_max'],
+                   width=128, height=64, bottom_margin=bottom_margin, cancelled=cancelled)
+    cursor_exp = first_function(exp_strs)
+    if cursor_state and cursor_exp is not None:
+        draw_cursor(fb, cursor_state, bounds, polynom1, cursor_exp)
+
+def replot_graph(fb, exp_strs, bounds, cursor_state=None):
+    """Clear and replot the graph with new bounds."""
+    render_graph(fb, exp_strs, bounds, cursor_state)
     display.clear_display()
     display.graphics(fb)
 
-def animate_transition(fb, exp_str, start_bounds, end_bounds, cursor_state=None):
-    """Smoothly animate graph between bounds."""
-    steps = GRAPH_CONFIG.get('transition_steps', 1)
-    delay_ms = GRAPH_CONFIG.get('transition_delay_ms', 0)
-    if steps <= 1:
-        replot_graph(fb, exp_str, end_bounds, cursor_state)
-        return
-    for step in range(1, steps + 1):
-        t = step / steps
-        interp = {
-            'x_min': start_bounds['x_min'] + (end_bounds['x_min'] - start_bounds['x_min']) * t,
-            'x_max': start_bounds['x_max'] + (end_bounds['x_max'] - start_bounds['x_max']) * t,
-            'y_min': start_bounds['y_min'] + (end_bounds['y_min'] - start_bounds['y_min']) * t,
-            'y_max': start_bounds['y_max'] + (end_bounds['y_max'] - start_bounds['y_max']) * t,
-        }
-        replot_graph(fb, exp_str, interp, cursor_state)
-        if delay_ms:
-            _sleep_ms(delay_ms)
+def interpolate_bounds(start_bounds, end_bounds, t):
+    return {key: start_bounds[key] + (end_bounds[key] - start_bounds[key]) * t
+            for key in ('x_min', 'x_max', 'y_min', 'y_max')}
+
+
+class GraphRenderer:
+    """Renders graph frames on a PlotWorker thread and shows the latest finished one.
+
+    Every replot or transition supersedes the one in progress, so keys
+    pressed while a frame is being sampled take effect right away. A
+    transition animates from the bounds of the last frame actually
+    rendered, so an interrupted pan continues from where it stopped.
+    """
+
+    def __init__(self, fb):
+        self.fb = fb
+        self.worker = PlotWorker(self.render, wake=wake)
+        self.rendered_bounds = None
+        self.active = False
+
+    def start(self, exp_strs, bounds, cursor_state):
+        """Show the first frame synchronously (errors propagate) and start listening."""
+        self.worker.cancel()
+        self.worker.wait()  # The stale job may still be sampling into the shared caches
+        replot_graph(self.fb, exp_strs, bounds, cursor_state)
+        self.rendered_bounds = dict(bounds)
+        if not self.active:
+            register_idle_hook(self.show)
+            self.active = True
+
+    def cancel(self):
+        """Drop pending work, e.g. before another screen takes over the display."""
+        self.worker.cancel()
+        self.worker.wait()
+
+    def stop(self):
+        """Stop listening and end the worker thread (the next start() begins a new one)."""
+        self.worker.close()
+        if self.active:
+            unregister_idle_hook(self.show)
+            self.active = False
+
+    def replot(self, exp_strs, bounds, cursor_state=None):
+        self.worker.submit((list(exp_strs), None, dict(bounds), cursor_state and cursor_state.copy()))
+
+    def transition(self, exp_strs, end_bounds, cursor_state=None):
+        """Smoothly animate the graph to end_bounds."""
+        self.worker.submit((list(exp_strs), self.rendered_bounds, dict(end_bounds),
+                            cursor_state and cursor_state.copy()))
+
+    def render(self, job, cancelled):
+        """Worker thread: yield the frames of a replot or a transition."""
+        exp_strs, start_bounds, end_bounds, cursor_state = job
+        fb = framebuf.FrameBuffer(bytearray(len(self.fb.buffer)), self.fb.width, self.fb.height, framebuf.MONO_VLSB)
+        steps = GRAPH_CONFIG.get('transition_steps', 1) if start_bounds is not None else 1
+        delay_ms = GRAPH_CONFIG.get('transition_delay_ms', 0)
+        for step in range(1, max(steps, 1) + 1):
+            bounds = end_bounds if step >= steps else interpolate_bounds(start_bounds, end_bounds, step / steps)
+            render_graph(fb, exp_strs, bounds, cursor_state, cancelled)
+            if cancelled():
+                return
+            self.rendered_bounds = bounds
+            yield bytes(fb.buffer)
+            if step < steps and delay_ms:
+                _sleep_ms(delay_ms)
+
+    def show(self):
+        """Idle hook: put the latest finished frame on the display."""
+        frame = self.worker.take()
+        if frame is not None:
+            self.fb.buffer[:] = frame
+            display.graphics(self.fb)
 
 
 def graph(db={}):
     print("start of graph", _mem_free())
     keypad_state_manager_reset()
-    global display, form, form_refresh, typer, nav, current_app, eval_globals
-    form.input_list={"inp_0": "x*sin(x) ", "inp_1": "-20 ", "inp_2": "20 ", "inp_3": "-10 ", "inp_4": "10 "}
-    form.form_list=["enter function:f(x)", "inp_0", "enter x_min:", "inp_1", "enter x_max:", "inp_2", "enter y_min:", "inp_3", "enter y_max:", "inp_4"]
+    global display, form, form_refresh, typer, nav, current_app
+    form.input_list={"inp_0": "x*sin(x) ", "inp_5": " ", "inp_6": " ", "inp_7": " ", "inp_1": "-20 ", "inp_2": "20 ", "inp_3": "-10 ", "inp_4": "10 "}
+    form.form_list=["enter f1(x):", "inp_0", "enter f2(x):", "inp_5", "enter f3(x):", "inp_6", "enter f4(x):", "inp_7", "enter x_min:", "inp_1", "enter x_max:", "inp_2", "enter y_min:", "inp_3", "enter y_max:", "inp_4"]
     form.update()
     form_refresh.refresh()
 
     buffer1 = bytearray((128 * 64) // 8)
     fb1 = framebuf.FrameBuffer(buffer1, 128, 64, framebuf.MONO_VLSB)
+    renderer = GraphRenderer(fb1)
 
     while True:
         inp = typer.start_typing()
@@ -513,7 +753,7 @@ def graph(db={}):
             try:
                 bounds = get_bounds_from_form()
                 cursor_state = CursorState()
-                replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                renderer.start(get_functions_from_form(), bounds, cursor_state)
             except:
                 continue
             print("after plotting", _mem_free())
@@ -524,26 +764,26 @@ def graph(db={}):
                 # Toggle cursor on/off with the physical A key (module/copy/a depending on mode)
                 if inp_breaker in ("a", "A", "module", "copy"):
                     cursor_state.toggle_active()
-                    replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                    renderer.replot(get_functions_from_form(), bounds, cursor_state)
 
                 # Navigation keys behavior depends on cursor mode
                 elif inp_breaker == "nav_u":
                     if cursor_state.mode != 'none':
                         cursor_state.move('up')
-                        replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                        renderer.replot(get_functions_from_form(), bounds, cursor_state)
                     else:
                         new_bounds = apply_pan(bounds, 'up')
-                        animate_transition(fb1, form.inp_list()["inp_0"], bounds, new_bounds, cursor_state)
+                        renderer.transition(get_functions_from_form(), new_bounds, cursor_state)
                         bounds = new_bounds
                         update_bounds(**bounds)
 
                 elif inp_breaker == "nav_d":
                     if cursor_state.mode != 'none':
                         cursor_state.move('down')
-                        replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                        renderer.replot(get_functions_from_form(), bounds, cursor_state)
                     else:
                         new_bounds = apply_pan(bounds, 'down')
-                        animate_transition(fb1, form.inp_list()["inp_0"], bounds, new_bounds, cursor_state)
+                        renderer.transition(get_functions_from_form(), new_bounds, cursor_state)
                         bounds = new_bounds
                         update_bounds(**bounds)
 
@@ -551,11 +791,11 @@ def graph(db={}):
                     if cursor_state.mode != 'none':
                         # Pan graph left (moves viewing window left, function moves right)
                         bounds = pan_by_pixels(bounds, dx_px=-1, width=128, height=64)
-                        replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                        renderer.replot(get_functions_from_form(), bounds, cursor_state)
                         update_bounds(**bounds)
                     else:
                         new_bounds = apply_pan(bounds, 'left')
-                        animate_transition(fb1, form.inp_list()["inp_0"], bounds, new_bounds, cursor_state)
+                        renderer.transition(get_functions_from_form(), new_bounds, cursor_state)
                         bounds = new_bounds
                         update_bounds(**bounds)
 
@@ -563,45 +803,135 @@ def graph(db={}):
                     if cursor_state.mode != 'none':
                         # Pan graph right (moves viewing window right, function moves left)
                         bounds = pan_by_pixels(bounds, dx_px=1, width=128, height=64)
-                        replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                        renderer.replot(get_functions_from_form(), bounds, cursor_state)
                         update_bounds(**bounds)
                     else:
                         new_bounds = apply_pan(bounds, 'right')
-                        animate_transition(fb1, form.inp_list()["inp_0"], bounds, new_bounds, cursor_state)
+                        renderer.transition(get_functions_from_form(), new_bounds, cursor_state)
                         bounds = new_bounds
                         update_bounds(**bounds)
 
                 elif inp_breaker == "plus":
                     new_bounds = apply_zoom(bounds, GRAPH_CONFIG['zoom_in'])
-                    animate_transition(fb1, form.inp_list()["inp_0"], bounds, new_bounds, cursor_state)
+                    renderer.transition(get_functions_from_form(), new_bounds, cursor_state)
                     bounds = new_bounds
                     update_bounds(**bounds)
 
                 elif inp_breaker == "minus":
                     new_bounds = apply_zoom(bounds, GRAPH_CONFIG['zoom_out'])
-                    animate_transition(fb1, form.inp_list()["inp_0"], bounds, new_bounds, cursor_state)
+                    renderer.transition(get_functions_from_form(), new_bounds, cursor_state)
                     bounds = new_bounds
                     update_bounds(**bounds)
 
+                # Jump the cursor to the next feature of f1 (the first non-blank function):
+                # D = root, E = intersection with the other functions, M = minimum, N = maximum
+                elif inp_breaker in ("cos", "d", "D", "acos(", "tan", "e", "E", "atan(",
+                                     "log", "m", "M", "^", "pow(", "n", "N", "~"):
+                    if inp_breaker in ("cos", "d", "D", "acos("):
+                        kind = 'root'
+                    elif inp_breaker in ("tan", "e", "E", "atan("):
+                        kind = 'intersection'
+                    elif inp_breaker in ("log", "m", "M", "^"):
+                        kind = 'min'
+                    else:
+                        kind = 'max'
+                    # Solved on this thread: stop the worker sampling the same functions first,
+                    # then replot either way since the cancelled frame may never have been shown
+                    renderer.cancel()
+                    jump_to_feature(kind, get_functions_from_form(), bounds, cursor_state)
+                    renderer.replot(get_functions_from_form(), bounds, cursor_state)
+
+                elif inp_breaker in ("t", "T", "9", "%"):
+                    # Table of values of f1, starting at the cursor (or the left edge)
+                    renderer.cancel()
+                    fb1.fill(0)
+                    display.clear_display()
+
+                    table_exp = first_function(get_functions_from_form())
+                    x_scale = (bounds['x_max'] - bounds['x_min']) / 127
+                    table_start = bounds['x_min']
+                    if cursor_state.mode != 'none':
+                        table_start += cursor_state.x_pixel * x_scale
+
+                    # Create temporary form for the table start and step
+                    temp_form_list = ["Table start:", "inp_temp_start", "Table step:", "inp_temp_step"]
+                    temp_input_list = {"inp_temp_start": "%.6g " % table_start,
+                                       "inp_temp_step": "%.6g " % GRAPH_CONFIG['table_step']}
+
+                    # Save current form state
+                    saved_form_list = form.form_list
+                    saved_input_list = form.input_list
+
+                    # Set up temporary form
+                    form.form_list = temp_form_list
+                    form.input_list = temp_input_list
+                    form.update()
+                    form_refresh.refresh()
+
+                    table_key = None
+                    while True:
+                        inp_temp = typer.start_typing()
+                        if inp_temp == "ok":
+                            try:
+                                table_start = evaluate_expression(form.inp_list()["inp_temp_start"])
+                                table_step = evaluate_expression(form.inp_list()["inp_temp_step"])
+                                if table_step != 0 and table_exp is not None:
+                                    GRAPH_CONFIG['table_step'] = table_step
+                                    table_key, table_x = table_view(table_exp, table_start, table_step)
+                            except Exception as e:
+                                print("table failed:", e)
+                            break
+                        elif inp_temp == "back":
+                            break
+                        elif inp_temp == "alpha" or inp_temp == "beta":
+                            keypad_state_manager(x=inp_temp)
+                            form.update_buffer("")
+                        elif inp_temp not in ["alpha", "beta", "ok"]:
+                            form.update_buffer(inp_temp)
+                        form_refresh.refresh(state=nav.current_state())
+
+                    # Restore original form
+                    form.form_list = saved_form_list
+                    form.input_list = saved_input_list
+                    form.update()
+
+                    if table_key == "home":
+                        renderer.stop()
+                        del buffer1, fb1
+                        current_app[0] = "home"
+                        current_app[1] = "root"
+                        return
+                    if table_key == "ok":
+                        # Put the cursor on the selected row, centering the view on it when outside
+                        if not bounds['x_min'] <= table_x <= bounds['x_max']:
+                            x_range = bounds['x_max'] - bounds['x_min']
+                            bounds['x_min'] = table_x - x_range / 2
+                            bounds['x_max'] = table_x + x_range / 2
+                            update_bounds(**bounds)
+                        cursor_state.x_pixel = (table_x - bounds['x_min']) / x_scale
+                        if cursor_state.mode == 'none':
+                            cursor_state.mode = 'both'
+                    display.clear_display()
+                    renderer.replot(get_functions_from_form(), bounds, cursor_state)
+
                 elif inp_breaker == "4":
-                    # Reduce adaptive sampling
-                    GRAPH_CONFIG['adaptive_increase'] = max(1, GRAPH_CONFIG.get('adaptive_increase', 4) - 1)
-                    GRAPH_CONFIG['adaptive_decrease'] = min(30, GRAPH_CONFIG.get('adaptive_decrease', 5) + 1)
-                    print(GRAPH_CONFIG['adaptive_increase'], GRAPH_CONFIG['adaptive_decrease'])
-                    replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                    # Coarser sampling: allow a larger screen-space error
+                    GRAPH_CONFIG['max_error_px'] = min(4, GRAPH_CONFIG.get('max_error_px', 0.5) * 2)
+                    print("max error px:", GRAPH_CONFIG['max_error_px'])
+                    renderer.replot(get_functions_from_form(), bounds, cursor_state)
 
                 elif inp_breaker == "5":
-                    # Increase adaptive sampling
-                    GRAPH_CONFIG['adaptive_increase'] = min(30, GRAPH_CONFIG.get('adaptive_increase', 4) + 1)
-                    GRAPH_CONFIG['adaptive_decrease'] = max(1, GRAPH_CONFIG.get('adaptive_decrease', 5) - 1)
-                    print(GRAPH_CONFIG['adaptive_increase'], GRAPH_CONFIG['adaptive_decrease'])
-                    replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                    # Finer sampling: allow a smaller screen-space error
+                    GRAPH_CONFIG['max_error_px'] = max(0.125, GRAPH_CONFIG.get('max_error_px', 0.5) / 2)
+                    print("max error px:", GRAPH_CONFIG['max_error_px'])
+                    renderer.replot(get_functions_from_form(), bounds, cursor_state)
 
                 elif inp_breaker in ("alpha", "beta"):
                     keypad_state_manager(x=inp_breaker)
 
                 elif inp_breaker in ("b", "B", "bluetooth", "paste"):
                     # Input custom X value and center graph on it
+                    renderer.cancel()
                     fb1.fill(0)
                     display.clear_display()
 
@@ -625,7 +955,7 @@ def graph(db={}):
                         if inp_temp == "ok":
                             try:
                                 # Get the X value
-                                custom_x = eval(form.inp_list()["inp_temp_x"], eval_globals)
+                                custom_x = evaluate_expression(form.inp_list()["inp_temp_x"])
 
                                 # Calculate new bounds centered on custom_x
                                 x_range = bounds['x_max'] - bounds['x_min']
@@ -648,7 +978,7 @@ def graph(db={}):
 
                                 # Force complete recalculation with new sampling around custom X
                                 fb1.fill(0)
-                                replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                                renderer.replot(get_functions_from_form(), bounds, cursor_state)
                                 update_bounds(**bounds)
                                 break
                             except:
@@ -656,14 +986,14 @@ def graph(db={}):
                                 form.form_list = saved_form_list
                                 form.input_list = saved_input_list
                                 form.update()
-                                replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                                renderer.replot(get_functions_from_form(), bounds, cursor_state)
                                 break
                         elif inp_temp == "back":
                             # Cancel - restore form
                             form.form_list = saved_form_list
                             form.input_list = saved_input_list
                             form.update()
-                            replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                            renderer.replot(get_functions_from_form(), bounds, cursor_state)
                             break
                         elif inp_temp == "alpha" or inp_temp == "beta":
                             keypad_state_manager(x=inp_temp)
@@ -673,13 +1003,14 @@ def graph(db={}):
                         form_refresh.refresh(state=nav.current_state())
 
                 elif inp_breaker in ("c", "C", "sin(", "asin("):
-                    # Set custom delta step (base_samples_per_px)
+                    # Set the evaluation budget (eval_budget_per_px)
+                    renderer.cancel()
                     fb1.fill(0)
                     display.clear_display()
 
-                    # Create temporary form for delta input
-                    temp_form_list = ["Delta (samples/px):", "inp_temp_delta"]
-                    temp_input_list = {"inp_temp_delta": str(GRAPH_CONFIG.get('base_samples_per_px', 3)) + " "}
+                    # Create temporary form for budget input
+                    temp_form_list = ["Budget (evals/px):", "inp_temp_delta"]
+                    temp_input_list = {"inp_temp_delta": str(GRAPH_CONFIG.get('eval_budget_per_px', 8)) + " "}
 
                     # Save current form state
                     saved_form_list = form.form_list
@@ -696,37 +1027,36 @@ def graph(db={}):
                         inp_temp = typer.start_typing()
                         if inp_temp == "ok":
                             try:
-                                # Get the delta value
-                                custom_delta = eval(form.inp_list()["inp_temp_delta"], eval_globals)
+                                # Get the budget
+                                custom_delta = evaluate_expression(form.inp_list()["inp_temp_delta"])
 
-                                # Validate and apply (allow any positive value, cap at reasonable maximum)
-                                if custom_delta >= 0.1:  # Allow fractional and very fine sampling
-                                    # Cap at 100 for performance, but allow flexibility
-                                    GRAPH_CONFIG['base_samples_per_px'] = min(custom_delta, 100)
-                                    print(f"Delta step set to: {GRAPH_CONFIG['base_samples_per_px']}")
+                                # Validate and apply (at least one evaluation per column, cap for frame time)
+                                if custom_delta >= 1:
+                                    GRAPH_CONFIG['eval_budget_per_px'] = min(custom_delta, 100)
+                                    print(f"Budget set to: {GRAPH_CONFIG['eval_budget_per_px']}")
 
                                 # Restore original form
                                 form.form_list = saved_form_list
                                 form.input_list = saved_input_list
                                 form.update()
 
-                                # Force complete recalculation with new delta
+                                # Force complete recalculation with the new budget
                                 fb1.fill(0)
-                                replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                                renderer.replot(get_functions_from_form(), bounds, cursor_state)
                                 break
                             except:
                                 # Restore form and continue without changes
                                 form.form_list = saved_form_list
                                 form.input_list = saved_input_list
                                 form.update()
-                                replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                                renderer.replot(get_functions_from_form(), bounds, cursor_state)
                                 break
                         elif inp_temp == "back":
                             # Cancel - restore form
                             form.form_list = saved_form_list
                             form.input_list = saved_input_list
                             form.update()
-                            replot_graph(fb1, form.inp_list()["inp_0"], bounds, cursor_state)
+                            renderer.replot(get_functions_from_form(), bounds, cursor_state)
                             break
                         elif inp_temp == "alpha" or inp_temp == "beta":
                             keypad_state_manager(x=inp_temp)
@@ -739,11 +1069,13 @@ def graph(db={}):
                     break
 
                 elif inp_breaker == "home":
+                    renderer.stop()
                     del buffer1, fb1
                     current_app[0] = "home"
                     current_app[1] = "root"
                     return
 
+            renderer.stop()
             fb1.fill(0)
             form.refresh_rows = (0, form.actual_rows)
             display.clear_display()
@@ -756,40 +1088,12 @@ def graph(db={}):
             form.update_buffer(inp)
         form_refresh.refresh(state=nav.current_state())
 
-        time.sleep(0.1)
     print("end of graph", _mem_free())
 
-def plot_function(fb, func, exp_str, x_min, x_max, y_min, y_max, width, height, bottom_margin=None):
-    """Advanced plotting with adaptive sampling and edge case handling."""
-    global eval_globals
-
-    if bottom_margin is None:
-        bottom_margin = GRAPH_CONFIG['bottom_margin']
-    plot_height = height - bottom_margin
-    if width < 2 or plot_height < 2:
-        return
-
-    x_range = x_max - x_min
-    y_range = y_max - y_min
-    if x_range == 0 or y_range == 0:
-        return
-
-    x_scale = x_range / (width - 1)
-    y_scale = y_range / (plot_height - 1)
-
-    def map_x(x_val):
-        """Map x value to pixel, return None if out of bounds"""
-        px = int((x_val - x_min) / x_scale + 0.5)
-        if px < 0 or px >= width:
-            return None
-        return px
-
-    def map_y(y_val):
-        """Map y value to pixel, return None if out of bounds"""
-        py = int((y_max - y_val) / y_scale + 0.5)
-        if py < 0 or py >= plot_height:
-            return None
-        return py
+def render_axes(fb, x_min, x_max, y_min, y_max, width, plot_height):
+    """Draw the x/y axes and their smart tick marks; returns the tick pixel positions."""
+    x_scale = (x_max - x_min) / (width - 1)
+    y_scale = (y_max - y_min) / (plot_height - 1)
 
     def map_x_clamped(x_val):
         """Map x value to pixel with clamping (for axes only)"""
@@ -812,6 +1116,8 @@ def plot_function(fb, func, exp_str, x_min, x_max, y_min, y_max, width, height,
         fb.vline(y_axis_x, 0, plot_height, 1)
 
     # Smart tick marks (use clamped for ticks)
+    x_tick_px = []
+    y_tick_px = []
     if GRAPH_CONFIG.get('smart_ticks', True):
         x_ticks = find_smart_tick_values(x_min, x_max, 12)
         y_ticks = find_smart_tick_values(y_min, y_max, 8)
@@ -822,6 +1128,7 @@ def plot_function(fb, func, exp_str, x_min, x_max, y_min, y_max, width, height,
                 tick_x = map_x_clamped(tick_val)
                 if 0 <= tick_x < width:
                     fb.pixel(tick_x, x_axis_y - 1, 1)
+                    x_tick_px.append(tick_x)
 
         # Draw y-axis ticks
         if y_axis_x >= 0:
@@ -829,351 +1136,260 @@ def plot_function(fb, func, exp_str, x_min, x_max, y_min, y_max, width, height,
                 tick_y = map_y_clamped(tick_val)
                 if 0 <= tick_y < plot_height:
                     fb.pixel(y_axis_x + 1, tick_y, 1)
-
-    def eval_with_status(x_val):
-        """Evaluate and return (y, status) where status is 'valid', 'out_of_bounds', or 'undefined'."""
-        y_val = safe_eval(func, exp_str, x_val)
-        if y_val is None:
-            return (None, 'undefined')
-        if y_val < y_min or y_val > y_max:
-            return (y_val, 'out_of_bounds')
-        return (y_val, 'valid')
-
-    def eval_visible(x_val):
-        """Evaluate and return y only if it is valid and within visible bounds."""
-        y_val, status = eval_with_status(x_val)
-        if status == 'valid':
-            return y_val
-        return None
-
-    # Phase 1: Zoom-adaptive sampling
-    base_samples_per_px = GRAPH_CONFIG.get('base_samples_per_px', 3)
-    zoom_factor = GRAPH_CONFIG.get('zoom_quality_factor', 6)
-    adaptive_increase = GRAPH_CONFIG.get('adaptive_increase', 4)
-    adaptive_decrease = GRAPH_CONFIG.get('adaptive_decrease', 5)
-
-    # Calculate zoom level (smaller range = more zoomed in)
-    reference_range = 40.0  # Reference range for normal view
-    zoom_level = reference_range / max(x_range, 0.1)
-
-    # Scale sampling based on zoom - more samples when zoomed in
-    if zoom_level > 2:
-        # Zoomed in - increase quality aggressively
-        zoom_boost = min(zoom_level / zoom_factor, adaptive_increase)
-        samples_multiplier = 1 + zoom_boost
-    elif zoom_level < 0.5:
-        # Zoomed out - decrease sampling to save computation
-        samples_multiplier = max(0.5, 1.0 / min(adaptive_decrease, (1.0 / zoom_level) / 2))
-    else:
-        # Normal zoom
-        samples_multiplier = 1
-
-    coarse_count = int(width * base_samples_per_px * samples_multiplier)
-    coarse_count = max(coarse_count, width * 2)  # Minimum 2 samples per pixel
-    coarse_count = min(coarse_count, width * 25) # Maximum 25 samples per pixel for best quality
-
-    coarse_points = []
-    coarse_statuses = []
-    for i in range(coarse_count):
-        x_val = x_min + (x_range * i) / (coarse_count - 1)
-        y_val, status = eval_with_status(x_val)
-
-        if status == 'valid':
-            coarse_points.append((x_val, y_val, True))
+                    y_tick_px.append(tick_y)
+
+    return x_axis_y, y_axis_x, x_tick_px, y_tick_px
+
+
+class AxisLayout:
+    """Axes, tick marks and (optional) labels of one view, pre-rendered as page bytes."""
+
+    def __init__(self, x_min, x_max, y_min, y_max, width, height, plot_height):
+        self.width = width
+        self.height = height
+        layer = bytearray(width * ((height + 7) >> 3))
+        layer_fb = framebuf.FrameBuffer(layer, width, height, framebuf.MONO_VLSB)
+        self.x_axis_y, self.y_axis_x, self.x_ticks, self.y_ticks = render_axes(
+            layer_fb, x_min, x_max, y_min, y_max, width, plot_height)
+        if GRAPH_CONFIG.get('axis_labels', False):
+            draw_axis_labels(layer_fb, x_min, x_max, y_min, y_max, width, height, height - plot_height)
+        self.layer = bytes(layer)
+        self.bits = int.from_bytes(self.layer, 'little')
+
+    def draw(self, fb):
+        """OR the layer into fb, a whole buffer at once when the layouts match."""
+        buffer = getattr(fb, 'buffer', None)
+        if (buffer is not None and len(buffer) == len(self.layer) and fb.width == self.width
+                and getattr(fb, 'format', framebuf.MONO_VLSB) == framebuf.MONO_VLSB):
+            buffer[:] = (int.from_bytes(buffer, 'little') | self.bits).to_bytes(len(buffer), 'little')
         else:
-            coarse_points.append((x_val, None, False))
-        coarse_statuses.append(status)
-
-    if sum(1 for _, _, valid in coarse_points if valid) < 2:
+            blit_framebuffer = framebuf.FrameBuffer(bytearray(self.layer), self.width, self.height, framebuf.MONO_VLSB)
+            fb.blit(blit_framebuffer, 0, 0, 0)
+
+
+# Axis layouts keyed by the view, its offset quantized to 1/AXIS_QUANTUM of a pixel
+AXIS_QUANTUM = 16
+AXIS_CACHE_SIZE = 16
+_axis_layouts = {}
+
+
+def get_axis_layout(x_min, x_max, y_min, y_max, width, height, plot_height):
+    """Return the cached AxisLayout for a view, building it on first use.
+
+    Redraws with the same bounds (cursor moves, budget changes) and views
+    that differ by less than 1/AXIS_QUANTUM of a pixel skip tick placement
+    and label rendering entirely.
+    """
+    x_scale = (x_max - x_min) / (width - 1)
+    y_scale = (y_max - y_min) / (plot_height - 1)
+    # Pixel offsets of the bounds plus the scales (ticks depend on both)
+    key = (round(x_min / x_scale * AXIS_QUANTUM), round(y_min / y_scale * AXIS_QUANTUM),
+           float('%.9g' % x_scale), float('%.9g' % y_scale), width, height, plot_height,
+           GRAPH_CONFIG.get('smart_ticks', True), GRAPH_CONFIG.get('axis_labels', False))
+    with _render_cache_lock:
+        layout = _axis_layouts.get(key)
+    if layout is None:
+        # Built outside the lock: rendering the labels takes it for the text cache
+        layout = AxisLayout(x_min, x_max, y_min, y_max, width, height, plot_height)
+        with _render_cache_lock:
+            if key not in _axis_layouts and len(_axis_layouts) >= AXIS_CACHE_SIZE:
+                _axis_layouts.pop(next(iter(_axis_layouts)))
+            _axis_layouts[key] = layout
+    return layout
+
+
+def draw_axes(fb, x_min, x_max, y_min, y_max, width, plot_height):
+    """Composite the cached axes, ticks and labels of a view into fb."""
+    get_axis_layout(x_min, x_max, y_min, y_max, width, fb.height, plot_height).draw(fb)
+
+
+def sampling_grid(x_min, x_max, width, cache=None):
+    """Return (step, xs) of the first sampling pass, reaching one step past each edge.
+
+    With a sample cache the grid snaps to its power-of-two lattice.
+    """
+    x_scale = (x_max - x_min) / (width - 1)
+    spacing = GRAPH_CONFIG.get('initial_step_px', 2) * x_scale
+    if cache is not None:
+        return cache.lattice(x_min - spacing, x_max + spacing, spacing)
+    count = int(math.ceil((x_max - x_min) / spacing)) + 3
+    return spacing, [x_min + (i - 1) * spacing for i in range(count)]
+
+
+def clip_segment(x0, y0, x1, y1, y_lo, y_hi):
+    """Clip a segment to y_lo <= y <= y_hi; returns the clipped ends or None."""
+    dy = y1 - y0
+    if dy == 0:
+        return (x0, y0, x1, y1) if y_lo <= y0 <= y_hi else None
+    t_lo = (y_lo - y0) / dy
+    t_hi = (y_hi - y0) / dy
+    if t_lo > t_hi:
+        t_lo, t_hi = t_hi, t_lo
+    t_lo = max(0.0, t_lo)
+    t_hi = min(1.0, t_hi)
+    if t_lo > t_hi:
+        return None
+    dx = x1 - x0
+    return (x0 + t_lo * dx, y0 + t_lo * dy, x0 + t_hi * dx, y0 + t_hi * dy)
+
+
+def draw_patterned_line(fb, x0, y0, x1, y1, bits, phase):
+    """Draw the line (x0, y0)-(x1, y1) through a dash pattern, skipping the start pixel.
+
+    The start pixel belongs to the previous piece of the curve; phase counts
+    the pixels drawn so far so dashes run on across pieces. Returns the new phase.
+    """
+    steps = max(abs(x1 - x0), abs(y1 - y0))
+    period = len(bits)
+    for k in range(1, steps + 1):
+        if bits[phase % period]:
+            fb.pixel(x0 + (2 * k * (x1 - x0) + steps) // (2 * steps),
+                     y0 + (2 * k * (y1 - y0) + steps) // (2 * steps), 1)
+        phase += 1
+    return phase
+
+
+def plot_functions(fb, exp_strs, x_min, x_max, y_min, y_max, width, height, bottom_margin=None, cancelled=None):
+    """Overlay f1..f4 on one set of axes.
+
+    All functions share one coarse lattice per frame; each looks it up in
+    its own sample cache in a single batch, so a pan only evaluates the
+    columns that scrolled in. The frame's evaluation budget is split
+    evenly between them. Blank expressions are skipped, and function
+    i is drawn with FUNCTION_PATTERNS[i]. Drawing stops early once
+    cancelled() is true.
+    """
+    if bottom_margin is None:
+        bottom_margin = GRAPH_CONFIG['bottom_margin']
+    plot_height = height - bottom_margin
+    x_range = x_max - x_min
+    if width < 2 or plot_height < 2 or x_range == 0 or y_max == y_min:
         return
 
-    # Phase 2: Identify regions needing refinement
-    refine_regions = []
-    refine_threshold = 1 if zoom_level > 2 else 2  # Stricter at high zoom
-
-    for i in range(len(coarse_points) - 1):
-        x1, y1, valid1 = coarse_points[i]
-        x2, y2, valid2 = coarse_points[i + 1]
-
-        needs_refine = False
-
-        # Case 1: Transition from valid to invalid or vice versa (discontinuity)
-        if valid1 != valid2:
-            needs_refine = True
-
-        # Case 2: Large change in y value (pixel-based)
-        elif valid1 and valid2:
-            y_px1 = map_y(y1)
-            y_px2 = map_y(y2)
-            if y_px1 is not None and y_px2 is not None:
-                if abs(y_px2 - y_px1) > refine_threshold:
-                    needs_refine = True
-
-        # Case 3: Check for curvature (second derivative)
-        if not needs_refine and valid1 and valid2 and i > 0:
-            x0, y0, valid0 = coarse_points[i - 1]
-            if valid0:
-                # Estimate curvature using finite differences
-                dx1 = x1 - x0
-                dx2 = x2 - x1
-                if dx1 > 0 and dx2 > 0:
-                    slope1 = (y1 - y0) / dx1
-                    slope2 = (y2 - y1) / dx2
-                    curvature = abs(slope2 - slope1)
-                    # High curvature needs refinement
-                    if curvature > y_range / (width * 0.5):
-                        needs_refine = True
-
-        if needs_refine:
-            refine_regions.append((x1, x2))
-
-    # Phase 2.5: Binary search near asymptote/discontinuity boundaries
-    # This pushes the last visible point close to the screen edge so curves
-    # don't appear to "start" mid-screen at zoom-out levels.
-    boundary_points = []
-    for i in range(len(coarse_points) - 1):
-        s_curr = coarse_statuses[i]
-        s_next = coarse_statuses[i + 1]
-        x_curr = coarse_points[i][0]
-        x_next = coarse_points[i + 1][0]
-
-        # Defined → undefined: find last visible point before boundary
-        if s_curr != 'undefined' and s_next == 'undefined':
-            lo, hi = x_curr, x_next
-            for _ in range(15):
-                mid = (lo + hi) / 2
-                y_mid, s = eval_with_status(mid)
-                if s == 'undefined':
-                    hi = mid
-                else:
-                    lo = mid
-                    if s == 'valid':
-                        boundary_points.append((mid, y_mid))
-
-        # Undefined → defined: find first visible point after boundary
-        elif s_curr == 'undefined' and s_next != 'undefined':
-            lo, hi = x_curr, x_next
-            for _ in range(15):
-                mid = (lo + hi) / 2
-                y_mid, s = eval_with_status(mid)
-                if s == 'undefined':
-                    lo = mid
-                else:
-                    hi = mid
-                    if s == 'valid':
-                        boundary_points.append((mid, y_mid))
-
-        # Valid → out_of_bounds: find last visible point at screen edge
-        elif s_curr == 'valid' and s_next == 'out_of_bounds':
-            lo, hi = x_curr, x_next
-            for _ in range(12):
-                mid = (lo + hi) / 2
-                y_mid, s = eval_with_status(mid)
-                if s == 'valid':
-                    lo = mid
-                    boundary_points.append((mid, y_mid))
-                else:
-                    hi = mid
-
-        # Out_of_bounds → valid: find first visible point at screen edge
-        elif s_curr == 'out_of_bounds' and s_next == 'valid':
-            lo, hi = x_curr, x_next
-            for _ in range(12):
-                mid = (lo + hi) / 2
-                y_mid, s = eval_with_status(mid)
-                if s == 'valid':
-                    hi = mid
-                    boundary_points.append((mid, y_mid))
-                else:
-                    lo = mid
-
-    # Phase 3: Adaptive refinement in problematic regions
-    all_points = list(boundary_points)
-    refine_samples = GRAPH_CONFIG.get('refine_samples', 12)
-
-    # Scale refinement based on zoom using adaptive parameters
-    if zoom_level > 2:
-        # Use adaptive_increase to control refinement aggressiveness
-        zoom_refine_factor = min(zoom_level / 2, adaptive_increase / 2)
-        refine_samples = int(refine_samples * zoom_refine_factor)
-    elif zoom_level < 0.5:
-        # Reduce refinement when zoomed out
-        refine_samples = max(4, int(refine_samples / (adaptive_decrease / 2)))
-
-    for i in range(len(coarse_points)):
-        x_val, y_val, valid = coarse_points[i]
-        if valid:
-            all_points.append((x_val, y_val))
-
-        # Add refined samples in problematic regions
-        if i < len(coarse_points) - 1:
-            x_next, _, _ = coarse_points[i + 1]
-
-            # Check if this interval needs refinement
-            for region_start, region_end in refine_regions:
-                if region_start <= x_val < region_end:
-                    # Add intermediate samples
-                    for j in range(1, refine_samples):
-                        x_refined = x_val + (x_next - x_val) * j / refine_samples
-                        y_refined, status = eval_with_status(x_refined)
-                        # Only add valid points (not undefined, but can be out of bounds for segment detection later)
-                        if y_refined is not None and status != 'undefined':
-                            all_points.append((x_refined, y_refined))
-                    break
-
-    # Sort points by x coordinate
-    all_points.sort(key=lambda p: p[0])
+    draw_axes(fb, x_min, x_max, y_min, y_max, width, plot_height)
 
-    if len(all_points) < 2:
+    caches = [(i, get_sample_cache(compile_function(exp_str)))
+              for i, exp_str in enumerate(exp_strs) if exp_str.strip()]
+    if not caches:
+        return
+    coarse_step, coarse_xs = sampling_grid(x_min, x_max, width, caches[0][1])
+    budget = int(GRAPH_CONFIG.get('eval_budget_per_px', 8) * width) // len(caches)
+    for i, cache in caches:
+        if cancelled is not None and cancelled():
+            return
+        plot_function(fb, polynom1, cache.func.text, x_min, x_max, y_min, y_max, width, height,
+                      bottom_margin, pattern=FUNCTION_PATTERNS[i % len(FUNCTION_PATTERNS)],
+                      axes=False, coarse=(coarse_step, coarse_xs, cache.lookup(coarse_xs)),
+                      cancelled=cancelled, budget=budget)
+
+
+def plot_function(fb, func, exp_str, x_min, x_max, y_min, y_max, width, height, bottom_margin=None,
+                  pattern=None, axes=True, coarse=None, cancelled=None, budget=None):
+    """Plot one function with error-bounded adaptive sampling (see sample_curve).
+
+    pattern is a dash pattern string (see FUNCTION_PATTERNS), axes=False
+    leaves the axes to the caller, and coarse passes in the (step, xs,
+    samples) of a grid plot_functions already looked up. budget caps the
+    evaluations (default eval_budget_per_px per column). cancelled() is
+    checked between the subdivision levels; once it is true the plot is
+    abandoned.
+    """
+    if bottom_margin is None:
+        bottom_margin = GRAPH_CONFIG['bottom_margin']
+    plot_height = height - bottom_margin
+    if width < 2 or plot_height < 2:
         return
 
-    # Phase 4: Segment detection with zoom-aware discontinuity logic
-    max_jump_fraction = GRAPH_CONFIG.get('max_jump_fraction', 0.2)
-    # At high zoom, be more tolerant of pixel jumps (smooth curves can have steep slopes)
-    if zoom_level > 2:
-        max_jump_fraction = min(0.35, max_jump_fraction * (1 + zoom_level / 10))
-
-    max_jump = int(plot_height * max_jump_fraction)
-    min_segment_len = GRAPH_CONFIG.get('min_segment_length', 2)
-
-    segments = []
-    current_segment = [all_points[0]]
-
-    for i in range(1, len(all_points)):
-        x_val, y_val = all_points[i]
-        x_prev, y_prev = all_points[i - 1]
-
-        x_px = map_x(x_val)
-        y_px = map_y(y_val)
-        x_prev_px = map_x(x_prev)
-        y_prev_px = map_y(y_prev)
-
-        # Skip points that are out of visible bounds
-        if x_px is None or y_px is None or x_prev_px is None or y_prev_px is None:
-            # Out of bounds - start new segment
-            if len(current_segment) >= min_segment_len:
-                segments.append(current_segment)
-            current_segment = []
-            if x_px is not None and y_px is not None:
-                current_segment = [(x_val, y_val)]
-            continue
+    x_range = x_max - x_min
+    y_range = y_max - y_min
+    if x_range == 0 or y_range == 0:
+        return
 
-        # Multiple discontinuity checks
-        is_discontinuous = False
-
-        # Check 1: Pixel jump too large
-        pixel_jump = abs(y_px - y_prev_px)
-        if pixel_jump > max_jump:
-            # For high zoom, verify this is a real discontinuity
-            if zoom_level > 2:
-                # Sample midpoint to confirm
-                mid_x = (x_val + x_prev) / 2
-                mid_y, mid_status = eval_with_status(mid_x)
-                if mid_status == 'undefined':
-                    # True discontinuity - function is undefined between these points
-                    is_discontinuous = True
-                elif mid_status == 'valid':
-                    # Check if midpoint is roughly between the two values
-                    mid_y_px = map_y(mid_y)
-                    if mid_y_px is not None:
-                        # If midpoint is way off the line, it's discontinuous
-                        expected_mid = (y_px + y_prev_px) / 2
-                        if abs(mid_y_px - expected_mid) > max_jump / 2:
-                            is_discontinuous = True
-            else:
-                is_discontinuous = True
-
-        # Check 2: Gap in x domain (missed evaluations between points)
-        if not is_discontinuous:
-            x_gap = x_val - x_prev
-            expected_gap = x_range / (coarse_count - 1)
-            if x_gap > expected_gap * 2:
-                # Check if there are undefined points in between
-                mid_x = (x_val + x_prev) / 2
-                mid_y, mid_status = eval_with_status(mid_x)
-                if mid_status == 'undefined':
-                    is_discontinuous = True
-
-        # Check 3: Extreme slope changes (only at normal zoom)
-        if not is_discontinuous and zoom_level <= 2 and len(current_segment) >= 3:
-            x_prev2, y_prev2 = current_segment[-2]
-            slope1 = (y_prev - y_prev2) / (x_prev - x_prev2) if x_prev != x_prev2 else 0
-            slope2 = (y_val - y_prev) / (x_val - x_prev) if x_val != x_prev else 0
-
-            # Very large slope change indicates potential discontinuity
-            if abs(slope1) > 1e-6 and abs(slope2) > 1e-6:
-                slope_ratio = abs(slope2 / slope1)
-                if slope_ratio > 20 or slope_ratio < 0.05:
-                    # Double check with midpoint
-                    mid_x = (x_val + x_prev) / 2
-                    mid_y, mid_status = eval_with_status(mid_x)
-                    if mid_status == 'undefined':
-                        is_discontinuous = True
-
-        if is_discontinuous:
-            if len(current_segment) >= min_segment_len:
-                segments.append(current_segment)
-            current_segment = [(x_val, y_val)]
-        else:
-            current_segment.append((x_val, y_val))
+    x_scale = x_range / (width - 1)
+    y_scale = y_range / (plot_height - 1)
 
-    if len(current_segment) >= min_segment_len:
-        segments.append(current_segment)
+    def to_px(x_val):
+        return (x_val - x_min) / x_scale
 
-    # Phase 5: Draw segments with smart pixel management
-    for segment in segments:
-        if len(segment) < min_segment_len:
-            continue
+    def to_py(y_val):
+        """Screen row, clamped to one pixel beyond the plot area."""
+        py = (y_max - y_val) / y_scale
+        if py < -1:
+            return -1.0
+        if py > plot_height:
+            return float(plot_height)
+        return py
 
-        # Convert segment to pixel coordinates
-        pixel_coords = []
-        for x_val, y_val in segment:
-            x_px = map_x(x_val)
-            y_px = map_y(y_val)
-            if x_px is not None and y_px is not None:
-                pixel_coords.append((x_px, y_px))
-
-        if len(pixel_coords) < 2:
-            # Single point - just draw it
-            if len(pixel_coords) == 1:
-                fb.pixel(pixel_coords[0][0], pixel_coords[0][1], 1)
-            continue
+    if axes:
+        draw_axes(fb, x_min, x_max, y_min, y_max, width, plot_height)
+
+    # Samples of polynom1 expressions are cached across frames so pans and
+    # zooms only evaluate the x values the previous views did not cover.
+    cache = get_sample_cache(compile_function(exp_str)) if func is polynom1 else None
+
+    def lookup(x_vals):
+        """Return a (y, valid) pair per x."""
+        if cache is not None:
+            return cache.lookup(x_vals)
+        results = []
+        for x_val in x_vals:
+            y_val = safe_eval(func, exp_str, x_val)
+            results.append((y_val, y_val is not None))
+        return results
+
+    if coarse is not None:
+        _, grid_xs, grid_samples = coarse
+    else:
+        _, grid_xs = sampling_grid(x_min, x_max, width, cache)
+        grid_samples = None
+    if budget is None:
+        budget = int(GRAPH_CONFIG.get('eval_budget_per_px', 8) * width)
+
+    polylines, _ = sample_curve(lookup, grid_xs, to_px, to_py,
+                                max_error=GRAPH_CONFIG.get('max_error_px', 0.5),
+                                min_dx=GRAPH_CONFIG.get('min_step_px', 1 / 64),
+                                budget=budget, samples=grid_samples, cancelled=cancelled)
+    if cache is not None:
+        cache.evict(x_min, x_max)
+    if cancelled is not None and cancelled():
+        return
 
-        # Deduplicate consecutive identical pixels
-        unique_pixels = [pixel_coords[0]]
-        for i in range(1, len(pixel_coords)):
-            if pixel_coords[i] != pixel_coords[i-1]:
-                unique_pixels.append(pixel_coords[i])
+    # Draw the polylines, clipped to the plot area
+    bits = None if pattern is None else tuple(c == "1" for c in pattern)
+    phase = 0
 
-        # Draw lines between consecutive unique pixels
-        for i in range(len(unique_pixels)):
-            x_px, y_px = unique_pixels[i]
+    def draw_pixel(x_px, y_px):
+        nonlocal phase
+        if bits is None or bits[phase % len(bits)]:
+            fb.pixel(x_px, y_px, 1)
+        phase += 1
 
-            if i == 0:
-                # First pixel
-                fb.pixel(x_px, y_px, 1)
-            else:
-                x_prev_px, y_prev_px = unique_pixels[i-1]
+    def draw_line(x0, y0, x1, y1):
+        nonlocal phase
+        if bits is None:
+            fb.line(x0, y0, x1, y1, 1)
+        else:
+            phase = draw_patterned_line(fb, x0, y0, x1, y1, bits, phase)
 
-                # Check if jump is reasonable
-                dx = abs(x_px - x_prev_px)
-                dy = abs(y_px - y_prev_px)
+    def to_pixel(px, py):
+        return int(math.floor(px + 0.5)), min(plot_height - 1, int(math.floor(py + 0.5)))
 
-                if dy <= max_jump or (dx <= 2 and dy <= plot_height // 2):
-                    # Draw connecting line
-                    fb.line(x_prev_px, y_prev_px, x_px, y_px, 1)
-                else:
-                    # Too large jump - just draw pixel
-                    fb.pixel(x_px, y_px, 1)
+    for line in polylines:
+        last = None
+        for (x0, y0), (x1, y1) in zip(line, line[1:]):
+            clipped = clip_segment(x0, y0, x1, y1, -0.5, plot_height - 0.5)
+            if clipped is None:
+                last = None
+                continue
+            start = to_pixel(clipped[0], clipped[1])
+            end = to_pixel(clipped[2], clipped[3])
+            if start != last:
+                draw_pixel(*start)
+            if end != start:
+                draw_line(start[0], start[1], end[0], end[1])
+            last = end
 
 
 def polynom1(exp, x):
-    global eval_globals
-    # Add 'x' to the dictionary for evaluation
-    eval_globals["x"]=x
-    # Combine global and local dictionaries
-    # context = eval_globals + eval_locals
-    # Evaluate the expression
-    y = eval(exp, eval_globals)
-
-    return y
+    # Expressions are parsed and compiled once, then served from the cache
+    return compile_function(exp)(x)
@@ -1,4 +1,3 @@
-from mocking import utime as time  # type:ignore
 from data_modules.object_handler import display, nav, typer, keypad_state_manager, chrs
 from data_modules.object_handler import current_app, data_bucket, menu, menu_refresh
 from data_modules.object_handler import form, form_refresh, text, text_refresh, function_buffer
@@ -262,7 +261,6 @@ def _matrix_argument_write():
             form.update_buffer(inp)
 
         form_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _matrix_argument_picker():
@@ -301,7 +299,6 @@ def _matrix_argument_picker():
             return
 
         menu_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _matrix_toolkit(context="default"):
@@ -343,7 +340,6 @@ def _matrix_toolkit(context="default"):
             menu_refresh.refresh()
 
         menu_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _delete_matrix_popup(matrix_name):
@@ -378,7 +374,6 @@ def _delete_matrix_popup(matrix_name):
             return
 
         popup_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def matrix(db={}):
@@ -450,7 +445,6 @@ def matrix(db={}):
                 break  # Refresh menu after action
 
             menu_refresh.refresh(state=nav.current_state())
-            time.sleep(0.05)
 
 
 def _dimension_form(matrix_name):
@@ -504,7 +498,6 @@ def _dimension_form(matrix_name):
             form.update_buffer(inp)
 
         form_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _matrix_editor(matrix_name):
@@ -554,7 +547,6 @@ def _matrix_editor(matrix_name):
             continue
 
         matrix_uploader.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _matrix_cell_full_editor():
@@ -599,7 +591,6 @@ def _matrix_cell_full_editor():
             form.update_buffer(inp)
 
         form_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _matrix_cell_viewer_readonly(buffer):
@@ -630,7 +621,6 @@ def _matrix_cell_viewer_readonly(buffer):
             form.update_buffer(inp)
 
         form_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _add_matrix_dialog():
@@ -672,7 +662,6 @@ def _add_matrix_dialog():
             form.update_buffer(inp)
 
         form_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _calculation_editor():
@@ -743,7 +732,6 @@ def _calculation_editor():
             text.update_buffer(converted_inp)
 
         text_refresh.refresh(state=nav.current_state())
-        time.sleep(0.05)
 
 
 def _show_result_matrix(result_matrix):
@@ -791,7 +779,6 @@ def _show_result_matrix(result_matrix):
             temp_buffer.update_buffer(inp)
             matrix_uploader.refresh(state=nav.current_state())
 
-        time.sleep(0.05)
 
 
 def _show_error(message):
@@ -809,4 +796,3 @@ def _show_error(message):
             current_app[0] = "home"
             current_app[1] = "root"
             return
-        time.sleep(0.05)
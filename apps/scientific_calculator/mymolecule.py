@@ -2,7 +2,6 @@ from data_modules.object_handler import display, form, nav, form_refresh, typer,
 from data_modules.object_handler import current_app
 from mocking import urequests  # type: ignore
 import gc
-import time
 # def search(term):
 
 # url = "http://67e91d51e7f4f94a1ce3.appwrite.global/search_molecule"
@@ -52,4 +51,3 @@ def mymolecule(db={}):
             form.update_buffer(inp)
         form_refresh.refresh(state=nav.current_state())
     
-        time.sleep(0.1)
@@ -1,50 +1,163 @@
+"""
+Convert 128x64 page dumps to PNG/GIF screenshots.
+
+A dump is the ST7565 display RAM in MONO_VLSB page order: 8 pages of 128
+column bytes, bit n of a byte being row page*8 + n. Rendering works on whole
+arrays: the pages are unpacked into a 64x128 bitmap, every dot is expanded
+to a scale x scale block (plus gap) with np.kron and the image is written in
+one call.
+
+Usage:
+    python byte_to_image.py professor_panda.py --scale 10 --gap 0
+    python byte_to_image.py dumps/ -o shots/ --format gif --jobs 8
+
+Inputs are files or directories of raw dumps (any size that is a multiple
+of 1024 bytes, one frame after another), frame recordings (.csfr, see
+display/recorder.py) or Python files holding `name = bytearray([...])` page
+data such as professor_panda.py.
+"""
+
+import argparse
+import ast
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 from PIL import Image
-from professor_panda import professor_panda
+
+from display import recorder
+
 WIDTH = 128
 HEIGHT = 64
 PAGES = 8
+FRAME_SIZE = WIDTH * PAGES
+
+DUMP_EXTENSIONS = (".bin", ".raw", ".py", ".csfr")
+
+
+def unpack_pages(data):
+    """Return the page data as a (HEIGHT, WIDTH) bool array."""
+    if len(data) != FRAME_SIZE:
+        raise ValueError("Data must be exactly 1024 bytes")
+    pages = np.frombuffer(bytes(data), dtype=np.uint8).reshape(PAGES, WIDTH)
+    return np.unpackbits(pages, axis=0, bitorder="little").astype(bool)
+
+
+def bitmap_image(data, scale=6, gap=1, margin=20,
+                 pixel_color=(0, 0, 0),
+                 bg_color=(255, 255, 255)):
+    """Render one frame of page data to a PIL image."""
+    cell = np.zeros((scale + gap, scale + gap), dtype=bool)
+    cell[:scale, :scale] = True
+    lit = np.kron(unpack_pages(data), cell)
+    if gap:
+        lit = lit[:-gap, :-gap]
+    lit = np.pad(lit, margin)
+    rgb = np.where(lit[..., None], np.array(pixel_color, dtype=np.uint8), np.array(bg_color, dtype=np.uint8))
+    return Image.fromarray(rgb.astype(np.uint8), "RGB")
+
 
 def render_bitmap(data, filename="output.png",
                   scale=6, gap=1, margin=20,
                   pixel_color=(0, 0, 0),
                   bg_color=(255, 255, 255)):
-    
-    if len(data) != WIDTH * PAGES:
-        raise ValueError("Data must be exactly 1024 bytes")
+    bitmap_image(data, scale, gap, margin, pixel_color, bg_color).save(filename)
+    print(f"Saved as {filename}")
 
-    # Calculate final image size
-    pixel_block = scale
-    total_pixel_size = scale + gap
 
-    img_width = WIDTH * total_pixel_size - gap
-    img_height = HEIGHT * total_pixel_size - gap
+def render_gif(frames, filename="output.gif", duration=100, **options):
+    """Write a sequence of frames as an endlessly looping animated GIF."""
+    images = [bitmap_image(frame, **options) for frame in frames]
+    if not images:
+        raise ValueError("No frames to render")
+    images[0].save(filename, save_all=True, append_images=images[1:], duration=duration, loop=0)
+    print(f"Saved as {filename}")
 
-    final_width = img_width + 2 * margin
-    final_height = img_height + 2 * margin
 
-    img = Image.new("RGB", (final_width, final_height), bg_color)
-    pixels = img.load()
+def load_frames(path):
+    """Return the list of 1024-byte frames stored in a dump file."""
+    if path.endswith(".py"):
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        frames = []
+        for node in tree.body:
+            if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+                    and getattr(node.value.func, "id", None) in ("bytearray", "bytes") and node.value.args):
+                frames.append(bytes(ast.literal_eval(node.value.args[0])))
+        return frames
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(recorder.MAGIC):
+        return list(recorder.FramePlayer(path).frames())
+    if not data or len(data) % FRAME_SIZE:
+        raise ValueError(f"{path}: size {len(data)} is not a multiple of {FRAME_SIZE} bytes")
+    return [data[i:i + FRAME_SIZE] for i in range(0, len(data), FRAME_SIZE)]
 
-    index = 0
-    for page in range(PAGES):
-        for x in range(WIDTH):
-            byte = data[index]
-            index += 1
 
-            for bit in range(8):
-                y = page * 8 + bit
-                pixel_on = (byte >> bit) & 0x01
+def find_inputs(paths):
+    """Expand directories into the dump files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith(DUMP_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
 
-                if pixel_on:
-                    draw_x = margin + x * total_pixel_size
-                    draw_y = margin + y * total_pixel_size
 
-                    # Draw square block
-                    for dx in range(scale):
-                        for dy in range(scale):
-                            pixels[draw_x + dx, draw_y + dy] = pixel_color
+def _render_job(job):
+    kind, frames, filename, options = job
+    if kind == "gif":
+        render_gif(frames, filename, **options)
+    else:
+        render_bitmap(frames[0], filename, **options)
+    return filename
 
-    img.save(filename)
-    print(f"Saved as {filename}")
-# Render image
-render_bitmap(professor_panda, "professor_panda.png", scale=10, gap=0, margin=20)
+
+def plan_jobs(files, out_dir=None, image_format="png", duration=100, **options):
+    """One job per output file: a PNG per frame, or a GIF per multi-frame dump."""
+    jobs = []
+    for path in files:
+        frames = load_frames(path)
+        base = os.path.splitext(os.path.basename(path))[0]
+        target = out_dir or os.path.dirname(path)
+        if image_format == "gif" and len(frames) > 1:
+            jobs.append(("gif", frames, os.path.join(target, base + ".gif"), dict(options, duration=duration)))
+        elif len(frames) == 1:
+            jobs.append(("png", frames, os.path.join(target, base + ".png"), options))
+        else:
+            for i, frame in enumerate(frames):
+                jobs.append(("png", [frame], os.path.join(target, f"{base}_{i:04d}.png"), options))
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert CalSci 128x64 page dumps to PNG/GIF.")
+    parser.add_argument("inputs", nargs="+", help="dump files or directories")
+    parser.add_argument("-o", "--out-dir", help="output directory (default: next to each input)")
+    parser.add_argument("--format", choices=("png", "gif"), default="png", dest="image_format",
+                        help="gif turns multi-frame dumps into animations")
+    parser.add_argument("--scale", type=int, default=6)
+    parser.add_argument("--gap", type=int, default=1)
+    parser.add_argument("--margin", type=int, default=20)
+    parser.add_argument("--duration", type=int, default=100, help="GIF frame time in ms")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    jobs = plan_jobs(find_inputs(args.inputs), args.out_dir, args.image_format, args.duration,
+                     scale=args.scale, gap=args.gap, margin=args.margin)
+    if len(jobs) == 1 or args.jobs == 1:
+        for job in jobs:
+            _render_job(job)
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for _ in pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // 64)):
+                pass
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ from utility.keymap import Keypad
 
 from ui import Button, OtherButton
 from utility.constants import KeyButtons as KB, KeypadMode as KM
-from display.display import Display, WINDOWHEIGHT, page_col
+from display.display import Display, WINDOWHEIGHT
 
 clock = pygame.time.Clock()
 keypad = Keypad()
@@ -50,7 +50,8 @@ def play_click_sound():
     if sound:
         sound.play()
 
-from utility.typer import get_buttons, get_other_buttons
+from utility.typer import KeypadLayout
+from utility.input_queue import InputQueue
 
 # def draw_buttons():
 #     buttons = []
@@ -70,74 +71,67 @@ class Typer:
         self.keypad = keypad
         self.keypad_map = keypad_map
         self.screen = screen
-        self.buttons = get_buttons(screen)
-        self.buttons.extend(get_other_buttons(screen))
+        self.layout = KeypadLayout(screen)
+        self.layout.draw_all()
+        self.buttons = self.layout.buttons
         self.is_alpha = False
         self.is_beta = False
         self.is_caps = False
-        
+        self.input = InputQueue(keypad=self.keypad, hit_test=self.key_at, on_press=self._press_button, on_release=self._release_button, on_idle=rc.idle, on_resize=rc.resize_window)
+        rc.register_resize_hook(self.update_keypad)
+
+    def key_at(self, pos):
+        pos = rc.map_input_pos(pos)
+        if pos is None:
+            return None
+        button = self.layout.button_at(pos)
+        if button is None:
+            return None
+        return self._button_key(button), button
+
+    def _button_key(self, button):
+        key = button.get_text(self.keypad.state)
+        if key == "AC":
+            return key
+        val = KB.get_char(key)
+        if key in [KB.ONE, KB.ZERO, KB.TWO, KB.THREE, KB.FOUR, KB.FIVE, KB.SIX, KB.SEVEN, KB.EIGHT, KB.NINE, KB.MULTIPLY, KB.PLUS, KB.MINUS, KB.DIVIDE]:
+            val = key
+        return val
+
+    def _draw_button(self, button, pressed):
+        if isinstance(button, OtherButton):
+            button.draw(screen, state=self.keypad.state, pressed=pressed)
+        else:
+            button.draw(screen, pressed=pressed)
+        rc.present()
+
+    def _press_button(self, button):
+        play_click_sound()
+        self._draw_button(button, pressed=True)
+
+    def _release_button(self, button):
+        self._draw_button(button, pressed=False)
 
     def start_typing(self):
-        # event = pygame.event.wait()
-        waiting = True
-        while waiting:
-            global screen
-            event = pygame.event.wait()
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button != 1:
-                    continue
-                
-                pos = rc.map_input_pos(pygame.mouse.get_pos())
-                if pos is None:
-                    continue
-                for button in self.buttons:
-                    if button.is_clicked(pos):
-                        play_click_sound()
-                        if isinstance(button, OtherButton):
-                            button.draw(screen, state=self.keypad.state, pressed=True)
-                        else:
-                            button.draw(screen, pressed=True)
-                        rc.present()
-                        pygame.time.delay(70)
-                        if isinstance(button, OtherButton):
-                            button.draw(screen, state=self.keypad.state, pressed=False)
-                        else:
-                            button.draw(screen, pressed=False)
-                        rc.present()
-                        
-                        key = button.get_text(self.keypad.state)
-                        print("key pressed:", key)
-                        rc.present()
-                        if key == "AC":
-                            return key
-                        
-                        
-                        val = KB.get_char(key)
-                        print(key, "key")
-                        print(val, "val")
-                        if key in [KB.ONE, KB.ZERO, KB.TWO, KB.THREE, KB.FOUR, KB.FIVE, KB.SIX, KB.SEVEN, KB.EIGHT, KB.NINE, KB.MULTIPLY, KB.PLUS, KB.MINUS, KB.DIVIDE]:
-                            val = key
-
-                        if self.is_caps and val in [KB.A, KB.B, KB.C, KB.D, KB.E, KB.F, KB.G, KB.H, KB.I, KB.J, KB.K, KB.L, KB.M, KB.N, KB.O, KB.P, KB.Q, KB.R, KB.S, KB.T, KB.U, KB.V, KB.W, KB.X, KB.Y, KB.Z]:
-                            val = val.upper()
-
-                        if val == "caps":
-                            self.is_caps = not self.is_caps
-                            if self.is_caps:
-                                nav.state_change("a", caps=True)
-                            else:
-                                nav.state_change("a", caps=False)
-                            self.buttons=get_buttons(screen=screen, state=self.keypad.state, alpha=self.is_alpha, beta=self.is_beta, caps=self.is_caps)
-                            self.buttons.extend(get_other_buttons(screen=screen, state=self.keypad.state, alpha=self.is_alpha, beta=self.is_beta, caps=self.is_caps))
-                            val = ""
-
-
-                                                                  
-                        return val 
-        return ""
+        event = self.input.wait()
+        val = event.key
+        print("key pressed:", val)
+        if val == "AC":
+            return val
+
+        if self.is_caps and val in [KB.A, KB.B, KB.C, KB.D, KB.E, KB.F, KB.G, KB.H, KB.I, KB.J, KB.K, KB.L, KB.M, KB.N, KB.O, KB.P, KB.Q, KB.R, KB.S, KB.T, KB.U, KB.V, KB.W, KB.X, KB.Y, KB.Z]:
+            val = val.upper()
+
+        if val == "caps":
+            self.is_caps = not self.is_caps
+            if self.is_caps:
+                nav.state_change("a", caps=True)
+            else:
+                nav.state_change("a", caps=False)
+            self.update_keypad()
+            val = ""
+
+        return val
 
     def change_keymaps(self, key):
         if key == KB.ALPHA:
@@ -167,14 +161,23 @@ class Typer:
             self.is_alpha = False
             self.is_beta = False
             self.is_caps = False
-        self.buttons = get_buttons(screen=screen, state=self.keypad.state, alpha=self.is_alpha, beta=self.is_beta, caps=self.is_caps)
-        self.buttons.extend(get_other_buttons(screen=screen, state=self.keypad.state, alpha=self.is_alpha, beta=self.is_beta, caps=self.is_caps))
+        self.update_keypad()
+
+    def update_keypad(self):
+        """Redraw the key faces changed by the current alpha/beta/caps mode, or the whole keypad after a resize."""
+        if self.layout.is_stale():
+            self.layout = KeypadLayout(screen, alpha=self.is_alpha, beta=self.is_beta, caps=self.is_caps)
+            self.layout.draw_all(state=self.keypad.state)
+            self.buttons = self.layout.buttons
+        elif self.layout.set_mode(alpha=self.is_alpha, beta=self.is_beta, caps=self.is_caps, state=self.keypad.state):
+            rc.present()
 # from input_modules.keypad import Keypad
 # from data_modules.keypad_map import Keypad_5X8
 
 # from output_modules.st7565_spi import Display
 # import st7565 as display
-from display.display import Display
+from display.display import create_display
+from display.recorder import FrameRecorder
 from data_modules.characters import Characters
 from data_modules.constants import GPIOPins as pins
 
@@ -205,7 +208,10 @@ data_bucket={"ssid_g" : "", "connection_status_g" : False}
 # keymap = Keypad_5X8()
 # keyin = Keypad(rows=keypad_rows, cols=keypad_cols)
 keypad = Keypad()
-display = Display(screen=screen, chrs=Characters())
+display = create_display(screen=screen, chrs=Characters())
+if rc.RECORD_PATH:
+    recorder = FrameRecorder(display, rc.RECORD_PATH)
+    rc.register_present_hook(recorder.capture)
 typer = Typer(keypad=Keypad(), keypad_map=None)
 
 chrs=Characters()
@@ -109,4 +109,46 @@ class Characters:
     def invert_letter(cls,Chr):
         # Invert each byte and mask to keep it within 8 bits
         char_data = cls.data.get(Chr, cls.data["*"])
-        return [~byte & 0xFF for byte in char_data]
\ No newline at end of file
+        return [~byte & 0xFF for byte in char_data]
+
+    def glyph(cls, Chr, invert=False):
+        """Return the 6 column bytes of a character cell, cursor column included."""
+        table = INVERTED_GLYPHS if invert else GLYPHS
+        offset = GLYPH_INDEX.get(Chr, DEFAULT_OFFSET)
+        return table[offset:offset + GLYPH_WIDTH]
+
+    def row_bytes(cls, text, invert_cols=()):
+        """Return the column bytes of a row of characters as one bytes object.
+
+        invert_cols is a container of the column indexes drawn inverted, or
+        True to invert the whole row.
+        """
+        index = GLYPH_INDEX
+        if invert_cols is True:
+            table = INVERTED_GLYPHS
+            return b"".join([table[o:o + GLYPH_WIDTH] for o in [index.get(c, DEFAULT_OFFSET) for c in text]])
+        cells = []
+        for col, c in enumerate(text):
+            table = INVERTED_GLYPHS if col in invert_cols else GLYPHS
+            offset = index.get(c, DEFAULT_OFFSET)
+            cells.append(table[offset:offset + GLYPH_WIDTH])
+        return b"".join(cells)
+
+
+# Every glyph compiled once into contiguous tables: 5 font columns followed by
+# the cursor column (blank, or solid when inverted).
+GLYPH_WIDTH = 6
+
+GLYPH_INDEX = {}
+_normal = bytearray()
+_inverted = bytearray()
+for _chr, _columns in Characters.data.items():
+    GLYPH_INDEX[_chr] = len(_normal)
+    _normal.extend(_columns)
+    _normal.append(0x00)
+    _inverted.extend(~byte & 0xFF for byte in _columns)
+    _inverted.append(0xFF)
+GLYPHS = bytes(_normal)
+INVERTED_GLYPHS = bytes(_inverted)
+DEFAULT_OFFSET = GLYPH_INDEX["*"]
+del _chr, _columns, _normal, _inverted
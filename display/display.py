@@ -1,8 +1,14 @@
 import random, pygame, sys
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from pygame.locals import *
 
 from display.characters import Characters
-from ui import DISPLAY_TOP_MARGIN, DISPLAY_SIDE_PADDING, present, scale_value
+from display.st7565 import ST7565
+from mocking import framebuf
+from ui import DISPLAY_TOP_MARGIN, DISPLAY_SIDE_PADDING, HEADLESS, invalidate, present, register_present_hook, register_resize_hook, scale_value
 
 FPS = 60 # frames per second, the general speed of the program
 BASE_BOXSIZE = 3 # size of box height & width in pixels (base scale)
@@ -14,11 +20,57 @@ WINDOWHEIGHT = BOARDHEIGHT*(BASE_BOXSIZE+BASE_GAPSIZE) # base window height in p
 
 PIXELON=(20, 30, 36)
 PIXELOFF=(180, 210, 222)
+PAGES = BOARDHEIGHT // 8 # 8 pixel rows per ST7565 page
+_MASK_KEY = (255, 0, 255)
 
 FPSCLOCK = pygame.time.Clock()
 
-page_col={"PAGE":0,
-          "COL":0}
+# One translate table per bit: maps a page byte to the palette index (0/1)
+# of the pixel row it holds, so a whole page row unpacks in a single call.
+_BIT_ROWS = [bytes((v >> bit) & 1 for v in range(256)) for bit in range(8)]
+
+def unpack_vlsb(buffer, width, height):
+    """Unpack a MONO_VLSB buffer into a (BOARDHEIGHT, BOARDWIDTH) boolean plane."""
+    pages = (height + 7) // 8
+    data = np.frombuffer(buffer, dtype=np.uint8, count=pages * width).reshape(pages, width)
+    bits = np.unpackbits(data[:, :, None], axis=2, bitorder="little")
+    plane = bits.transpose(0, 2, 1).reshape(pages * 8, width).astype(bool)
+    out = np.zeros((BOARDHEIGHT, BOARDWIDTH), dtype=bool)
+    h = min(height, BOARDHEIGHT)
+    w = min(width, BOARDWIDTH)
+    out[:h, :w] = plane[:h, :w]
+    return out
+
+def pack_vlsb(plane):
+    """Pack a (BOARDHEIGHT, BOARDWIDTH) boolean plane back into ST7565 page bytes."""
+    pages = plane.reshape(PAGES, 8, BOARDWIDTH).transpose(0, 2, 1)
+    return np.packbits(pages, axis=2, bitorder="little").tobytes()
+
+def contrast_color(contrast):
+    """Colour of a lit pixel at an ST7565 contrast setting (PIXELON at the default 0x20)."""
+    level = contrast / 0x20
+    if level <= 1:
+        return tuple(round(off + (on - off) * level) for on, off in zip(PIXELON, PIXELOFF))
+    return tuple(round(on * (2 - level)) for on in PIXELON)
+
+_gap_masks = {}
+
+
+def get_gap_mask(boxsize, gapsize):
+    """Return the cached pixel-gap grid for the whole panel: gaps in PIXELOFF, the rest transparent."""
+    mask = _gap_masks.get((boxsize, gapsize))
+    if mask is None:
+        pitch = boxsize + gapsize
+        mask = pygame.Surface((BOARDWIDTH * pitch, BOARDHEIGHT * pitch))
+        mask.fill(_MASK_KEY)
+        mask.set_colorkey(_MASK_KEY)
+        for x in range(BOARDWIDTH):
+            mask.fill(PIXELOFF, (x * pitch + boxsize, 0, gapsize, mask.get_height()))
+        for y in range(BOARDHEIGHT):
+            mask.fill(PIXELOFF, (0, y * pitch + boxsize, mask.get_width(), gapsize))
+        _gap_masks[(boxsize, gapsize)] = mask
+    return mask
+
 
 def get_display_metrics(screen):
     box = scale_value(BASE_BOXSIZE, screen, min_value=1)
@@ -32,7 +84,17 @@ class Display:
     def __init__(self, screen, chrs):
         self.screen = screen
         self.chrs = chrs
+        # Shadow of the ST7565 display RAM: 8 pages x 128 columns, MONO_VLSB.
+        self.pages = bytearray(BOARDWIDTH * PAGES)
+        self._native = pygame.Surface((BOARDWIDTH, BOARDHEIGHT), depth=8)
+        self._native.set_palette_at(0, PIXELOFF)
+        self._native.set_palette_at(1, PIXELON)
+        self._dirty = [None] * PAGES
+        self._contrast = None
+        self.lcd = ST7565(self.pages, self.mark_dirty)
         self.update_layout()
+        register_present_hook(self.flush)
+        register_resize_hook(self.update_layout)
 
     def update_layout(self):
         self.boxsize, self.gapsize, display_w, display_h = get_display_metrics(self.screen)
@@ -40,109 +102,236 @@ class Display:
         top_margin = scale_value(DISPLAY_TOP_MARGIN, self.screen, min_value=0)
         self.xmargin = max((self.screen.get_width() - display_w) // 2, side_padding)
         self.ymargin = top_margin
+        self.mark_dirty()
+
+    def mark_dirty(self, page=None, col_start=0, col_end=BOARDWIDTH - 1):
+        """Flag a column span of one page (or the whole panel) for the next flush."""
+        pages = range(PAGES) if page is None else (page,)
+        for p in pages:
+            span = self._dirty[p]
+            if span is None:
+                self._dirty[p] = (col_start, col_end)
+            else:
+                self._dirty[p] = (min(span[0], col_start), max(span[1], col_end))
+
+    def flush(self):
+        """Composite dirty pages from the page buffer and blit them in one go.
+
+        Returns the screen rect that was redrawn, or None.
+        """
+        if self.lcd.contrast != self._contrast:
+            self._contrast = self.lcd.contrast
+            self._native.set_palette_at(1, contrast_color(self._contrast))
+        if not self.lcd.plain and any(span is not None for span in self._dirty):
+            # Start line, COM direction and the like move or recolour everything.
+            self._dirty = [(0, BOARDWIDTH - 1)] * PAGES
+        dirty = [(p, span) for p, span in enumerate(self._dirty) if span is not None]
+        if not dirty:
+            return
+        self._dirty = [None] * PAGES
+
+        frame = self.pages if self.lcd.plain else self.lcd.visible()
+        buf = self._native.get_buffer()
+        pitch = self._native.get_pitch()
+        for p, _ in dirty:
+            page = bytes(frame[p * BOARDWIDTH:(p + 1) * BOARDWIDTH])
+            for bit in range(8):
+                buf.write(page.translate(_BIT_ROWS[bit]), (p * 8 + bit) * pitch)
+        del buf
+
+        col_start = min(span[0] for _, span in dirty)
+        col_end = max(span[1] for _, span in dirty)
+        page_start = dirty[0][0]
+        page_end = dirty[-1][0]
+        region = pygame.Rect(col_start, page_start * 8, col_end - col_start + 1, (page_end - page_start + 1) * 8)
+        pitch_px = self.boxsize + self.gapsize
+        scaled = pygame.transform.scale(
+            self._native.subsurface(region),
+            (region.width * pitch_px, region.height * pitch_px),
+        )
+        pos = self.get_pos(region.x, region.y)
+        rect = self.screen.blit(scaled, pos)
+        if self.gapsize:
+            mask = get_gap_mask(self.boxsize, self.gapsize)
+            self.screen.blit(mask, pos, pygame.Rect(region.x * pitch_px, region.y * pitch_px, rect.width, rect.height))
+        return rect
+
+    def frame(self):
+        """Return the current 1024-byte MONO_VLSB frame (the controller RAM)."""
+        return bytes(self.pages)
 
-    
     def draw_pixel(self,posx, posy, size, color):
-        pygame.draw.rect(self.screen, color, (posx, posy, size, size))
+        invalidate(pygame.draw.rect(self.screen, color, (posx, posy, size, size)))
 
     def clear_display(self):
         self.turn_off_all_pixels()
         present()
 
     def turn_off_all_pixels(self):
-        for i in range(BOARDWIDTH):
-            for j in range(BOARDHEIGHT):
-                self.draw_pixel(
-                    posx=i * (self.boxsize + self.gapsize) + self.xmargin,
-                    posy=j * (self.boxsize + self.gapsize) + self.ymargin,
-                    size=self.boxsize,
-                    color=PIXELOFF,
-                )
-                # print("drawing pixel: ", (i,j))
-        
+        self.pages[:] = bytes(len(self.pages))
+        self.mark_dirty()
         present()
 
     def turn_on_all_pixels(self):
-        for i in range(BOARDWIDTH):
-            for j in range(BOARDHEIGHT):
-                self.draw_pixel(
-                    posx=i * (self.boxsize + self.gapsize) + self.xmargin,
-                    posy=j * (self.boxsize + self.gapsize) + self.ymargin,
-                    size=self.boxsize,
-                    color=PIXELON,
-                )
-                # print("drawing pixel: ", (i,j))
+        self.pages[:] = b"\xff" * len(self.pages)
+        self.mark_dirty()
 
     def turn_on_pixel(self,x, y):
-        self.draw_pixel(
-            posx=x * (self.boxsize + self.gapsize) + self.xmargin,
-            posy=y * (self.boxsize + self.gapsize) + self.ymargin,
-            size=self.boxsize,
-            color=PIXELON,
-        )
+        if 0 <= x < BOARDWIDTH and 0 <= y < BOARDHEIGHT:
+            self.pages[(y // 8) * BOARDWIDTH + x] |= 1 << (y % 8)
+            self.mark_dirty(y // 8, x, x)
 
 
     def turn_off_pixel(self,x, y):
-        self.draw_pixel(
-            posx=x * (self.boxsize + self.gapsize) + self.xmargin,
-            posy=y * (self.boxsize + self.gapsize) + self.ymargin,
-            size=self.boxsize,
-            color=PIXELOFF,
-        )
+        if 0 <= x < BOARDWIDTH and 0 <= y < BOARDHEIGHT:
+            self.pages[(y // 8) * BOARDWIDTH + x] &= ~(1 << (y % 8)) & 0xFF
+            self.mark_dirty(y // 8, x, x)
 
     def get_pos(self,x,y):
         return (x * (self.boxsize + self.gapsize) + self.xmargin, y * (self.boxsize + self.gapsize) + self.ymargin)
 
-    def write_data(self,data):
-        if page_col["PAGE"] >= 8:
-            return
-        # data_queue.put((data, self.get_pos(page_col["COL"], page_col["PAGE"]*8)))
-        surface = pygame.Surface((1 * self.boxsize, 8 * self.boxsize))
-        for i in range(8):
-            if data & 1<<i == 1<<i:
-                surface.fill(PIXELON, rect=(0, i * self.boxsize, self.boxsize, self.boxsize))
-            else:
-                surface.fill(PIXELOFF, rect=(0, i * self.boxsize, self.boxsize, self.boxsize))
-        page_col["COL"]+=1
-        self.screen.blit(surface, self.get_pos(page_col["COL"], page_col["PAGE"]*8))
-        if page_col["COL"]+2 == BOARDWIDTH:
-            page_col["PAGE"]+=1
-            page_col["COL"]=0
-        if page_col["PAGE"] >= 8:
-            return
+    def write_instruction(self, cmd):
+        """Send one command byte (or a bytes run of them) to the ST7565."""
+        self.lcd.command(cmd)
 
-    def reset_cursor(self):
-        page_col["PAGE"] = 0
-        page_col["COL"] = 0
+    def write_data(self, data):
+        """Send one display data byte (or a bytes run) to the ST7565."""
+        self.lcd.write(data)
 
+    def write_run(self, data):
+        """Write a run of column bytes at the cursor, the same as write_data(data)."""
+        self.lcd.write(data)
+
+    def update_run(self, page, col, data):
+        """Write data at page/col like write_run(), touching only the span that differs.
+
+        Returns True if any byte changed. The cursor is left where write_run()
+        would leave it.
+        """
+        if not 0 <= page < PAGES or not 0 <= col or col + len(data) > BOARDWIDTH or self.lcd.adc_reverse:
+            self.set_page_address(page)
+            self.set_column_address(col)
+            self.write_run(data)
+            return True
+        start = page * BOARDWIDTH + col
+        changed = self.pages[start:start + len(data)] != data
+        if changed:
+            old = self.pages[start:start + len(data)]
+            first = 0
+            while old[first] == data[first]:
+                first += 1
+            last = len(data)
+            while old[last - 1] == data[last - 1]:
+                last -= 1
+            self.pages[start + first:start + last] = data[first:last]
+            self.mark_dirty(page, col + first, col + last - 1)
+        self.lcd.page = page
+        self.lcd.column = col + len(data)
+        return changed
+
+    def reset_cursor(self):
+        self.lcd.page = 0
+        self.lcd.column = 0
 
     def set_page_address(self, page):
-        page_col["PAGE"] = page 
+        self.lcd.set_page(page)
 
     def set_column_address(self, col):
-        page_col["COL"] = col
+        self.lcd.set_column(col)
 
     def graphics(self, framebuffer):
         """Display a framebuffer on the screen."""
         if not hasattr(framebuffer, 'buffer') or not hasattr(framebuffer, 'width') or not hasattr(framebuffer, 'height'):
             return
 
-        # Clear the display first
-        self.turn_off_all_pixels()
+        mono_vlsb = getattr(framebuffer, 'format', framebuf.MONO_VLSB) == framebuf.MONO_VLSB
+        if mono_vlsb and framebuffer.width == BOARDWIDTH and framebuffer.height >= BOARDHEIGHT:
+            # Same layout as the display RAM: a straight copy.
+            self.pages[:] = bytes(framebuffer.buffer[:len(self.pages)])
+            self.mark_dirty()
+            present()
+            return
+        if mono_vlsb and np is not None:
+            self.pages[:] = pack_vlsb(unpack_vlsb(framebuffer.buffer, framebuffer.width, framebuffer.height))
+            self.mark_dirty()
+            present()
+            return
+
+        # Clear the page buffer first
+        self.pages[:] = bytes(len(self.pages))
+        self.mark_dirty()
 
         # Convert framebuffer to display
         width = framebuffer.width
         height = framebuffer.height
 
-        # Display each pixel from the framebuffer
+        # Copy each pixel from the framebuffer
         for x in range(min(width, BOARDWIDTH)):
             for y in range(min(height, BOARDHEIGHT)):
                 # Get pixel state from framebuffer
                 try:
                     pixel_state = framebuffer.pixel(x, y)
                     if pixel_state:
-                        self.turn_on_pixel(x, y)
+                        self.pages[(y // 8) * BOARDWIDTH + x] |= 1 << (y % 8)
                 except:
                     pass
 
         present()
+
+
+class HeadlessDisplay(Display):
+    """Display backend without a window.
+
+    Keeps only the page buffer: nothing is scaled or composited, presents
+    are free and the frame is read back with frame().
+    """
+
+    def __init__(self, screen=None, chrs=None):
+        self.screen = screen
+        self.chrs = chrs
+        self.pages = bytearray(BOARDWIDTH * PAGES)
+        self.lcd = ST7565(self.pages)
+
+    def update_layout(self):
+        pass
+
+    def mark_dirty(self, page=None, col_start=0, col_end=BOARDWIDTH - 1):
+        pass
+
+    def flush(self):
+        pass
+
+    def draw_pixel(self, posx, posy, size, color):
+        pass
+
+    def graphics(self, framebuffer):
+        """Copy a framebuffer into the page buffer."""
+        if not hasattr(framebuffer, 'buffer') or not hasattr(framebuffer, 'width') or not hasattr(framebuffer, 'height'):
+            return
+        mono_vlsb = getattr(framebuffer, 'format', framebuf.MONO_VLSB) == framebuf.MONO_VLSB
+        if mono_vlsb and framebuffer.width == BOARDWIDTH and framebuffer.height >= BOARDHEIGHT:
+            self.pages[:] = bytes(framebuffer.buffer[:len(self.pages)])
+        elif mono_vlsb and np is not None:
+            self.pages[:] = pack_vlsb(unpack_vlsb(framebuffer.buffer, framebuffer.width, framebuffer.height))
+        else:
+            self.pages[:] = bytes(len(self.pages))
+            for x in range(min(framebuffer.width, BOARDWIDTH)):
+                for y in range(min(framebuffer.height, BOARDHEIGHT)):
+                    try:
+                        if framebuffer.pixel(x, y):
+                            self.pages[(y // 8) * BOARDWIDTH + x] |= 1 << (y % 8)
+                    except:
+                        pass
+
+
+BACKENDS = {
+    "window": Display,
+    "headless": HeadlessDisplay,
+}
+
+
+def create_display(screen, chrs, backend=None):
+    """Create the Display for a backend name (default: the one chosen in ui)."""
+    if backend is None:
+        backend = "headless" if HEADLESS else "window"
+    return BACKENDS[backend](screen=screen, chrs=chrs)
@@ -0,0 +1,227 @@
+"""
+Frame recorder and player for the LCD page buffer.
+
+FrameRecorder is registered as a present hook and appends every presented
+frame that differs from the previous one to a binary log. A record stores
+the time since the previous record and the frame XORed with the previous
+frame, run-length encoded as (zero run, literal run) pairs, so a key press
+that changes one row costs a few dozen bytes. Every KEYFRAME_INTERVAL
+records the frame is stored XORed with an empty frame instead, which lets
+FramePlayer seek without replaying the whole session.
+
+Log layout (integers are unsigned LEB128 varints unless noted):
+    header:  b"CSFR", version (u8), width (u16 LE), pages (u8)
+    record:  flags (u8, bit 0 = keyframe), dt_ms, payload length, payload
+    payload: repeated zero_run, literal_len, literal bytes (trailing zeros dropped)
+
+Usage:
+    CALSCI_RECORD=session.csfr python main.py
+    python -m display.recorder session.csfr --time 5000 -o shot.png
+"""
+
+import argparse
+import bisect
+import re
+import struct
+import time
+
+MAGIC = b"CSFR"
+VERSION = 1
+HEADER = struct.Struct("<4sBHB")
+WIDTH = 128
+PAGES = 8
+FRAME_SIZE = WIDTH * PAGES
+KEYFRAME_INTERVAL = 256
+FLAG_KEYFRAME = 0x01
+MIN_ZERO_RUN = 3  # shorter zero gaps are cheaper to keep inside a literal run
+
+_NONZERO = re.compile(rb"[^\x00]+")
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Return (value, next position); raises IndexError on truncated data."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def xor_frames(a, b):
+    size = len(a)
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(size, "little")
+
+
+def encode_delta(delta):
+    """Run-length encode a XOR delta as (zero run, literal run) pairs."""
+    runs = []
+    for match in _NONZERO.finditer(delta):
+        start, end = match.span()
+        if runs and start - runs[-1][1] < MIN_ZERO_RUN:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+    out = bytearray()
+    pos = 0
+    for start, end in runs:
+        write_varint(out, start - pos)
+        write_varint(out, end - start)
+        out += delta[start:end]
+        pos = end
+    return bytes(out)
+
+
+def apply_delta(frame, payload):
+    """XOR an encoded delta into frame (a bytearray) in place."""
+    pos = offset = 0
+    while pos < len(payload):
+        zeros, pos = read_varint(payload, pos)
+        length, pos = read_varint(payload, pos)
+        offset += zeros
+        literal = payload[pos:pos + length]
+        frame[offset:offset + length] = xor_frames(frame[offset:offset + length], literal)
+        offset += length
+        pos += length
+
+
+class FrameRecorder:
+    """Streams the frames a Display presents to a log file.
+
+    Register capture() with ui.register_present_hook; it returns None so
+    the window update is unaffected.
+    """
+
+    def __init__(self, display, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.display = display
+        self.keyframe_interval = keyframe_interval
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, WIDTH, PAGES))
+        self.file.flush()
+        self.previous = bytes(FRAME_SIZE)
+        self.records = 0
+        self.last_time = time.monotonic()
+
+    def capture(self):
+        frame = bytes(self.display.pages)
+        if frame == self.previous and self.records:
+            return
+        now = time.monotonic()
+        keyframe = self.records % self.keyframe_interval == 0
+        base = bytes(FRAME_SIZE) if keyframe else self.previous
+        payload = encode_delta(xor_frames(frame, base))
+        record = bytearray((FLAG_KEYFRAME if keyframe else 0,))
+        write_varint(record, round((now - self.last_time) * 1000))
+        write_varint(record, len(payload))
+        record += payload
+        self.file.write(record)
+        self.file.flush()
+        self.previous = frame
+        self.records += 1
+        self.last_time = now
+
+    def close(self):
+        self.file.close()
+
+
+class FramePlayer:
+    """Random access to the frames of a recorded log.
+
+    The log is indexed once on open; frame(i) replays from the nearest
+    keyframe, or continues from the last decoded frame when seeking forward.
+    A truncated last record (a session still being written) is ignored.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, version, width, pages = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION or width * pages != FRAME_SIZE:
+            raise ValueError(f"{path}: not a frame recording")
+        self.times = []     # ms since the start of the recording
+        self.records = []   # (payload offset, payload length)
+        self.keyframes = []
+        pos = HEADER.size
+        elapsed = 0
+        try:
+            while pos < len(self.data):
+                flags = self.data[pos]
+                dt, pos = read_varint(self.data, pos + 1)
+                length, pos = read_varint(self.data, pos)
+                if pos + length > len(self.data):
+                    break
+                elapsed += dt
+                if flags & FLAG_KEYFRAME:
+                    self.keyframes.append(len(self.records))
+                self.times.append(elapsed)
+                self.records.append((pos, length))
+                pos += length
+        except IndexError:
+            pass
+        self._keyframe_set = set(self.keyframes)
+        self._index = -1
+        self._frame = bytearray(FRAME_SIZE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        return self.times[-1] if self.times else 0
+
+    def index_at(self, ms):
+        """Index of the frame on screen ms milliseconds into the recording."""
+        return max(0, bisect.bisect_right(self.times, ms) - 1)
+
+    def frame(self, index):
+        """Return frame index as 1024 bytes."""
+        if not 0 <= index < len(self.records):
+            raise IndexError("frame index out of range")
+        key = self.keyframes[bisect.bisect_right(self.keyframes, index) - 1]
+        if not key <= self._index <= index:
+            self._frame = bytearray(FRAME_SIZE)
+            self._index = key - 1
+        for i in range(self._index + 1, index + 1):
+            if i in self._keyframe_set:
+                self._frame = bytearray(FRAME_SIZE)
+            offset, length = self.records[i]
+            apply_delta(self._frame, self.data[offset:offset + length])
+        self._index = index
+        return bytes(self._frame)
+
+    def frame_at(self, ms):
+        return self.frame(self.index_at(ms))
+
+    def frames(self):
+        for i in range(len(self.records)):
+            yield self.frame(i)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a CalSci frame recording.")
+    parser.add_argument("log")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--frame", type=int, help="frame index")
+    target.add_argument("--time", type=int, help="milliseconds into the recording")
+    parser.add_argument("-o", "--output", help="write the frame as PNG")
+    args = parser.parse_args(argv)
+
+    player = FramePlayer(args.log)
+    print(f"{len(player)} frames, {player.duration / 1000:.1f} s, {len(player.data)} bytes")
+    if args.output:
+        from byte_to_image import render_bitmap
+        index = player.index_at(args.time) if args.time is not None else (args.frame or 0)
+        render_bitmap(player.frame(index), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+ST7565 LCD controller emulator.
+
+Decodes the command and data bytes the firmware sends to the controller
+(A0 low = command, A0 high = display data) and applies them to the 128x64
+page buffer the Display composites from. Addressing follows the datasheet:
+data goes to the current page/column, the column address increments after
+every write and stops at the last RAM column (131); pages never wrap.
+
+The controller RAM is 132 columns wide. With ADC normal the panel shows
+columns 0-127, with ADC reverse (0xA1) RAM column n appears at x = 131 - n.
+Writes to columns that are not on the panel are dropped.
+
+Start line, COM direction, reverse/all-on, display on/off, power control
+and contrast do not touch the RAM; the Display applies them when it
+composites a frame (see visible()). The simulator starts with the panel
+initialised: display on and all power circuits on.
+"""
+
+WIDTH = 128
+HEIGHT = 64
+PAGES = HEIGHT // 8
+COLUMNS = 132
+LAST_COLUMN = COLUMNS - 1
+LINES = 64
+
+POWER_ALL = 0x07  # booster, regulator and follower on
+DEFAULT_CONTRAST = 0x20
+
+# Commands taking a second byte: electronic volume, static indicator, booster ratio.
+SET_CONTRAST = 0x81
+STATIC_INDICATOR_OFF = 0xAC
+STATIC_INDICATOR_ON = 0xAD
+SET_BOOSTER = 0xF8
+
+_INVERT = bytes(v ^ 0xFF for v in range(256))
+_BIT_REVERSE = bytes(int(f"{v:08b}"[::-1], 2) for v in range(256))
+
+
+class ST7565:
+    """Command/data interface of one ST7565 driving a page buffer.
+
+    on_change(page=None, col_start=0, col_end=WIDTH - 1) is called with the
+    area of the page buffer a write touched, or with no arguments when a
+    command changes how the whole panel looks.
+    """
+
+    def __init__(self, ram, on_change=None):
+        self.ram = ram
+        self.on_change = on_change
+        self.display_on = True
+        self.power = POWER_ALL
+        self.reset()
+
+    def reset(self):
+        """Internal reset (0xE2): addressing and display modes; RAM is kept."""
+        self.page = 0
+        self.column = 0
+        self.start_line = 0
+        self.adc_reverse = False
+        self.com_reverse = False
+        self.inverse = False
+        self.all_on = False
+        self.contrast = DEFAULT_CONTRAST
+        self.bias = 0
+        self.regulator = 0
+        self.booster = 0
+        self.static_indicator = 0
+        self.rmw_column = None
+        self._argument_for = None
+        self._changed()
+
+    def _changed(self, *area):
+        if self.on_change:
+            self.on_change(*area)
+
+    @property
+    def plain(self):
+        """True when the panel shows the RAM as is."""
+        return (self.display_on and self.power == POWER_ALL and not self.inverse
+                and not self.all_on and not self.start_line and not self.com_reverse)
+
+    # -------------------------------------------------------------------------
+    # Commands
+    # -------------------------------------------------------------------------
+
+    def command(self, data):
+        """Execute one command byte or a bytes-like run of them."""
+        if isinstance(data, int):
+            data = (data,)
+        for byte in data:
+            self._command(byte & 0xFF)
+
+    def _command(self, cmd):
+        pending = self._argument_for
+        if pending is not None:
+            self._argument_for = None
+            if pending == SET_CONTRAST:
+                self.contrast = cmd & 0x3F
+                self._changed()
+            elif pending == SET_BOOSTER:
+                self.booster = cmd & 0x03
+            else:
+                self.static_indicator = cmd & 0x03 if pending == STATIC_INDICATOR_ON else 0
+            return
+
+        if cmd in (SET_CONTRAST, STATIC_INDICATOR_OFF, STATIC_INDICATOR_ON, SET_BOOSTER):
+            self._argument_for = cmd
+        elif cmd & 0xF0 == 0xB0:
+            self.page = cmd & 0x0F
+        elif cmd & 0xF0 == 0x10:
+            self.column = ((cmd & 0x0F) << 4) | (self.column & 0x0F)
+        elif cmd & 0xF0 == 0x00:
+            self.column = (self.column & 0xF0) | cmd
+        elif cmd & 0xC0 == 0x40:
+            self.start_line = cmd & 0x3F
+            self._changed()
+        elif cmd in (0xAE, 0xAF):
+            self.display_on = cmd == 0xAF
+            self._changed()
+        elif cmd in (0xA0, 0xA1):
+            # Only the segment mapping changes; data written from now on lands mirrored.
+            self.adc_reverse = cmd == 0xA1
+        elif cmd in (0xA6, 0xA7):
+            self.inverse = cmd == 0xA7
+            self._changed()
+        elif cmd in (0xA4, 0xA5):
+            self.all_on = cmd == 0xA5
+            self._changed()
+        elif cmd in (0xA2, 0xA3):
+            self.bias = cmd & 0x01
+        elif cmd & 0xF0 == 0xC0:
+            self.com_reverse = bool(cmd & 0x08)
+            self._changed()
+        elif cmd & 0xF8 == 0x28:
+            self.power = cmd & 0x07
+            self._changed()
+        elif cmd & 0xF8 == 0x20:
+            self.regulator = cmd & 0x07
+        elif cmd == 0xE0:
+            self.rmw_column = self.column
+        elif cmd == 0xEE:
+            if self.rmw_column is not None:
+                self.column = self.rmw_column
+                self.rmw_column = None
+        elif cmd == 0xE2:
+            self.reset()
+        # 0xE3 (NOP) and anything unknown are ignored, as on the chip.
+
+    def set_page(self, page):
+        self.command(0xB0 | (page & 0x0F))
+
+    def set_column(self, col):
+        self.command((0x10 | ((col >> 4) & 0x0F), col & 0x0F))
+
+    # -------------------------------------------------------------------------
+    # Display data
+    # -------------------------------------------------------------------------
+
+    def write(self, data):
+        """Write one data byte or a bytes-like run at the cursor and advance it."""
+        if isinstance(data, int):
+            data = bytes((data & 0xFF,))
+        count = len(data)
+        if not count:
+            return
+        col = self.column
+        if col > LAST_COLUMN:
+            return
+        self.column = min(col + count, LAST_COLUMN)
+        if self.page >= PAGES:
+            return  # the icon page (8) is not on the panel
+        if col + count > COLUMNS:
+            # The cursor sticks at the last column; the final byte is the one left there.
+            data = bytes(data[:LAST_COLUMN - col]) + bytes(data[-1:])
+            count = len(data)
+        base = self.page * WIDTH
+        if self.adc_reverse:
+            first = max(col, COLUMNS - WIDTH)
+            if first >= col + count:
+                return
+            x_start = LAST_COLUMN - (col + count - 1)
+            x_end = LAST_COLUMN - first
+            self.ram[base + x_start:base + x_end + 1] = bytes(data[first - col:])[::-1]
+        else:
+            if col >= WIDTH:
+                return
+            x_start = col
+            x_end = min(col + count, WIDTH) - 1
+            self.ram[base + x_start:base + x_end + 1] = data[:x_end - x_start + 1]
+        self._changed(self.page, x_start, x_end)
+
+    def read(self):
+        """Read the byte at the cursor; the column only advances outside read-modify-write."""
+        col = self.column
+        x = LAST_COLUMN - col if self.adc_reverse else col
+        value = self.ram[self.page * WIDTH + x] if self.page < PAGES and 0 <= x < WIDTH else 0
+        if self.rmw_column is None:
+            self.column = min(col + 1, LAST_COLUMN)
+        return value
+
+    def replay(self, trace):
+        """Feed a bus trace: an iterable of (a0, payload) with a0 true for display data."""
+        for a0, payload in trace:
+            if a0:
+                self.write(payload)
+            else:
+                self.command(payload)
+
+    # -------------------------------------------------------------------------
+    # What the panel shows
+    # -------------------------------------------------------------------------
+
+    def visible(self):
+        """Return the 1024 page bytes the panel shows after the display modes."""
+        size = len(self.ram)
+        if not self.display_on or self.power != POWER_ALL:
+            return bytes(size)
+        if self.all_on:
+            return b"\xff" * size
+        frame = bytes(self.ram)
+        if self.start_line:
+            # Row y shows RAM line (y + start_line) % 64: rotate each column.
+            out = bytearray(size)
+            shift = self.start_line
+            mask = (1 << LINES) - 1
+            for x in range(WIDTH):
+                column = int.from_bytes(frame[x::WIDTH], "little")
+                column = ((column >> shift) | (column << (LINES - shift))) & mask
+                out[x::WIDTH] = column.to_bytes(PAGES, "little")
+            frame = bytes(out)
+        if self.com_reverse:
+            frame = b"".join(frame[p * WIDTH:(p + 1) * WIDTH] for p in reversed(range(PAGES))).translate(_BIT_REVERSE)
+        if self.inverse:
+            frame = frame.translate(_INVERT)
+        return frame
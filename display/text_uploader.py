@@ -10,28 +10,13 @@ class BaseUploader:
 
     
     def _print_character(self, chtr, invert=False):
-        chtr_byte_data = self.chrs.Chr2bytes(chtr)
-        cursor_line = 0b00000000
-        if invert:
-            chtr_byte_data=self.chrs.invert_letter(chtr)
-            cursor_line = 0b11111111
-        for k in chtr_byte_data:
-            self.disp_out.write_data(k)
-        self.disp_out.write_data(cursor_line)
+        self.disp_out.write_run(self.chrs.glyph(chtr, invert))
     
     def _display_bar(self, state):
         self.disp_out.set_page_address(7)
         self.disp_out.set_column_address(0)
         state = state+" "*(len("default")-len(state))
-        j_counter=0
-        for j in state:
-            chtr=j
-            chtr_byte_data=self.chrs.invert_letter(chtr)
-            cursor_line=0b11111111
-            for k in chtr_byte_data:
-                self.disp_out.write_data(k)
-            self.disp_out.write_data(cursor_line)
-            j_counter+=1
+        self.disp_out.write_run(self.chrs.row_bytes(state, True))
     
     def _clear_row_display(self, row):
         self.disp_out.set_page_address(row)
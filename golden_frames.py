@@ -0,0 +1,216 @@
+"""
+Golden-frame regression check for the apps.
+
+Each scenario starts one app on the headless page buffer and feeds it a
+scripted key sequence. The 1024-byte frame on the LCD is taken every time
+the app asks for the next key, and the frames are compared with the
+golden recording in golden/<scenario>.bin. Background plot jobs are
+waited for and their last frame shown before each capture, so pans and
+zooms rendered on the plot worker are recorded in their final state.
+Frames are compared by hash first; for each mismatch, the XOR of the two
+frames is reduced to bounding boxes of the differing pixels.
+
+Scenarios run in parallel, one fresh process each, so app state never
+leaks from one scenario into the next.
+
+Usage:
+    python golden_frames.py                 # check all scenarios
+    python golden_frames.py graph matrix    # check some
+    python golden_frames.py --update        # re-record the golden frames
+    python golden_frames.py --out failed/   # also dump failing frames for byte_to_image.py
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+os.environ["CALSCI_BACKEND"] = "headless"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+WIDTH = 128
+PAGES = 8
+FRAME_SIZE = WIDTH * PAGES
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# name -> (app group, app name, keys)
+SCENARIOS = {
+    "home": ("root", "home", ["nav_d", "nav_d", "nav_d", "nav_u"]),
+    "scientific_calculator": ("root", "scientific_calculator", ["nav_d", "nav_d", "nav_u"]),
+    "calculate": ("root", "calculate", ["1", "+", "2", "*", "3", "ans", "AC", "7", "/", "2", "ans"]),
+    # Keypad vocabulary: implicit multiplication, the sqrt template filled in, ln and ^
+    "calculate_keypad": ("root", "calculate", ["2", "pi", "ans", "AC",
+                                               "pow( ,0.5)", "nav_l", "nav_l", "nav_l", "nav_l", "nav_l", "9", "ans", "AC",
+                                               "ln", "(", "1", ")", "ans", "AC",
+                                               "2", "^", "1", "0", "ans"]),
+    # Python typed on the alpha/beta layers must be refused with "Invalid Input"
+    "calculate_sandbox": ("root", "calculate", ["alpha", *"__import__", "beta", "(", "'", "alpha", "o", "s",
+                                                "beta", "'", ")", "ans"]),
+    "calculate_alpha": ("root", "calculate", ["alpha", "a", "b", "alpha", "nav_l", "nav_l", "nav_r"]),
+    "graph": ("scientific_calculator", "graph", ["ok"]),
+    "graph_form": ("scientific_calculator", "graph", ["nav_d", "nav_d", "nav_d"]),
+    # Pans and zooms animate on the plot worker; the cursor pan replots
+    "graph_pan_zoom": ("scientific_calculator", "graph", ["ok", "nav_r", "plus", "minus", "nav_u", "a", "nav_r", "nav_r"]),
+    # Table of values: default start/step, then row and page scrolling both ways
+    "graph_table": ("scientific_calculator", "graph", ["ok", "9", "ok", "nav_d", "nav_r", "nav_u", "nav_l"]),
+    # A peak narrower than the first sampling pass must still be drawn to its top
+    "graph_peak": ("scientific_calculator", "graph", ["nav_d", "AC", *"8*exp(-100*(x-3.3)^2)", "ok"]),
+    "constants": ("scientific_calculator", "constants", ["nav_d", "nav_d", "nav_d", "nav_u"]),
+    "matrix": ("scientific_calculator", "matrix", ["nav_d", "nav_d", "nav_u"]),
+}
+
+_NONZERO = re.compile(rb"[^\x00]+")
+
+
+class ScenarioDone(BaseException):
+    """Raised from start_typing once the script is used up; apps catch Exception only."""
+
+
+def run_scenario(name):
+    """Run one scenario and return (name, frames, error)."""
+    group, app_name, keys = SCENARIOS[name]
+    with contextlib.redirect_stdout(io.StringIO()):
+        import data_modules.object_handler as oh
+        import ui
+        from process_modules.plot_worker import wait_all
+
+        frames = []
+        pending = list(keys)
+        start_typing = oh.typer.start_typing
+
+        def scripted_typing():
+            # Let background renders finish and put their last frame on the display
+            wait_all()
+            ui.idle()
+            frames.append(oh.display.frame())
+            if not pending:
+                raise ScenarioDone
+            oh.typer.input.inject(pending.pop(0))
+            return start_typing()
+
+        oh.typer.start_typing = scripted_typing
+        try:
+            app = getattr(importlib.import_module(f"apps.{group}.{app_name}"), app_name)
+            app()
+        except ScenarioDone:
+            pass
+        except Exception as e:
+            return name, frames, f"{type(e).__name__}: {e}"
+    return name, frames, None
+
+
+def frame_hash(frame):
+    return hashlib.blake2b(frame, digest_size=8).hexdigest()
+
+
+def diff_regions(expected, actual):
+    """Return (pixel count, [(x0, y0, x1, y1), ...]) of the pixels that differ."""
+    delta = (int.from_bytes(expected, "little") ^ int.from_bytes(actual, "little")).to_bytes(FRAME_SIZE, "little")
+    count = bin(int.from_bytes(delta, "little")).count("1")
+    rects = []
+    for page in range(PAGES):
+        row = delta[page * WIDTH:(page + 1) * WIDTH]
+        for match in _NONZERO.finditer(row):
+            bits = 0
+            for byte in match.group():
+                bits |= byte
+            y0 = page * 8 + (bits & -bits).bit_length() - 1
+            y1 = page * 8 + bits.bit_length() - 1
+            rects.append([match.start(), y0, match.end() - 1, y1])
+    merged = True
+    while merged:
+        merged = False
+        for i, a in enumerate(rects):
+            for b in rects[i + 1:]:
+                if a[0] <= b[2] + 1 and b[0] <= a[2] + 1 and a[1] <= b[3] + 1 and b[1] <= a[3] + 1:
+                    a[:] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    rects.remove(b)
+                    merged = True
+                    break
+            if merged:
+                break
+    return count, [tuple(rect) for rect in rects]
+
+
+def golden_path(name):
+    return os.path.join(GOLDEN_DIR, name + ".bin")
+
+
+def load_golden(name):
+    path = golden_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    return [data[i:i + FRAME_SIZE] for i in range(0, len(data), FRAME_SIZE)]
+
+
+def compare(name, frames):
+    """Return a list of failure messages for one scenario (empty when it matches)."""
+    golden = load_golden(name)
+    if golden is None:
+        return ["no golden frames, run with --update"]
+    failures = []
+    if len(golden) != len(frames):
+        failures.append(f"{len(frames)} frames, golden has {len(golden)}")
+    for i, (expected, actual) in enumerate(zip(golden, frames)):
+        if frame_hash(expected) != frame_hash(actual):
+            count, rects = diff_regions(expected, actual)
+            regions = ", ".join(f"({x0},{y0})-({x1},{y1})" for x0, y0, x1, y1 in rects)
+            failures.append(f"frame {i}: {count} px differ in {regions}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check app rendering against golden frames.")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--update", action="store_true", help="record the current frames as golden")
+    parser.add_argument("--out", help="write the frames of failing scenarios to this directory")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.jobs, maxtasksperchild=1) as pool:
+        results = pool.map(run_scenario, names, chunksize=1)
+
+    failed = 0
+    for name, frames, error in results:
+        if error is not None:
+            failed += 1
+            print(f"FAIL {name}\n    crashed after {len(frames)} frames: {error}")
+            continue
+        if args.update:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(golden_path(name), "wb") as f:
+                f.write(b"".join(frames))
+            print(f"UPDATED {name} ({len(frames)} frames)")
+            continue
+        failures = compare(name, frames)
+        if not failures:
+            print(f"PASS {name} ({len(frames)} frames)")
+            continue
+        failed += 1
+        print(f"FAIL {name}")
+        for message in failures:
+            print(f"    {message}")
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            with open(os.path.join(args.out, name + ".bin"), "wb") as f:
+                f.write(b"".join(frames))
+    print(f"{len(results)} scenarios, {failed} failed in {time.perf_counter() - start:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
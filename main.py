@@ -6,7 +6,7 @@ import ui as rc
 from ui import Button
 from utility.keymap import Keypad
 from utility.constants import KeyButtons as KB, KeypadMode as KM
-from display.display import Display, WINDOWHEIGHT, page_col
+from display.display import Display, WINDOWHEIGHT
 from display.characters import Characters 
 from display.text_buffer import TextBuffer
 from display.text_uploader import TextUploader
@@ -61,7 +61,6 @@ while True:
 
 
             # text_uploader.refresh() 
-    rc.present()
     keypad_state_manager_reset()
     app_runner()
 
@@ -93,6 +92,7 @@ while True:
 
 
     rc.present()
+    rc.flush_frame()
 
     clock.tick(60)
     
@@ -2,103 +2,491 @@
 Mock framebuf module for simulator.
 Provides a FrameBuffer class that mimics MicroPython's framebuf module
 for desktop Python simulation.
+
+Drawing follows MicroPython's modframebuf.c pixel for pixel, but works on
+whole byte spans where it can: fills are slice assignments, partial bytes
+are updated through translate tables and lines are clipped before they are
+walked, so there are no per-pixel bounds checks.
 """
 
+from display.characters import Characters
+
 # Format constants
 MONO_VLSB = 0  # Monochrome, vertical LSB format
 MONO_HLSB = 1
 MONO_HMSB = 2
 RGB565 = 3
+MVLSB = MONO_VLSB
+
+FONT_ADVANCE = 8  # text() steps 8 pixels per character, like MicroPython
+
+
+_or_tables = {}
+_and_tables = {}
+
+
+def _or_table(mask):
+    table = _or_tables.get(mask)
+    if table is None:
+        table = _or_tables[mask] = bytes(v | mask for v in range(256))
+    return table
+
+
+def _and_table(mask):
+    table = _and_tables.get(mask)
+    if table is None:
+        table = _and_tables[mask] = bytes(v & mask for v in range(256))
+    return table
+
+
+def _apply_mask(buf, start, end, mask, color):
+    """Set (color truthy) or clear the mask bits in buf[start:end]."""
+    if mask == 0xFF:
+        buf[start:end] = (b"\xff" if color else b"\x00") * (end - start)
+    elif color:
+        buf[start:end] = bytes(buf[start:end]).translate(_or_table(mask))
+    else:
+        buf[start:end] = bytes(buf[start:end]).translate(_and_table(~mask & 0xFF))
+
+
+def _cdiv(a, b):
+    """Integer division truncating toward zero, like C."""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+# -----------------------------------------------------------------------------
+# Pixel formats: unchecked setpixel/getpixel and an already clipped fill_rect
+# -----------------------------------------------------------------------------
+
+class _MonoVLSB:
+    @staticmethod
+    def setpixel(fb, x, y, color):
+        index = (y >> 3) * fb.stride + x
+        if color:
+            fb.buffer[index] |= 1 << (y & 7)
+        else:
+            fb.buffer[index] &= ~(1 << (y & 7)) & 0xFF
+
+    @staticmethod
+    def getpixel(fb, x, y):
+        return (fb.buffer[(y >> 3) * fb.stride + x] >> (y & 7)) & 1
+
+    @staticmethod
+    def fill_rect(fb, x, y, w, h, color):
+        buf = fb.buffer
+        stride = fb.stride
+        yend = y + h
+        while y < yend:
+            top = y & 7
+            bottom = min(8, top + yend - y)
+            mask = (0xFF << top) & (0xFF >> (8 - bottom))
+            start = (y >> 3) * stride + x
+            _apply_mask(buf, start, start + w, mask, color)
+            y += bottom - top
+
+
+class _MonoHLSB:
+    msb_first = True
+
+    @classmethod
+    def _bit(cls, x):
+        return 0x80 >> (x & 7) if cls.msb_first else 1 << (x & 7)
+
+    @classmethod
+    def _span(cls, first, last):
+        """Mask of bit positions first..last (x & 7) within one byte."""
+        if cls.msb_first:
+            return (0xFF >> first) & (0xFF << (7 - last)) & 0xFF
+        return (0xFF << first) & (0xFF >> (7 - last)) & 0xFF
+
+    @classmethod
+    def setpixel(cls, fb, x, y, color):
+        index = (x + y * fb.stride) >> 3
+        if color:
+            fb.buffer[index] |= cls._bit(x)
+        else:
+            fb.buffer[index] &= ~cls._bit(x) & 0xFF
+
+    @classmethod
+    def getpixel(cls, fb, x, y):
+        return 1 if fb.buffer[(x + y * fb.stride) >> 3] & cls._bit(x) else 0
+
+    @classmethod
+    def fill_rect(cls, fb, x, y, w, h, color):
+        buf = fb.buffer
+        first = x >> 3
+        last = (x + w - 1) >> 3
+        if first == last:
+            spans = [(first, first + 1, cls._span(x & 7, (x + w - 1) & 7))]
+        else:
+            spans = [(first, first + 1, cls._span(x & 7, 7))]
+            if last > first + 1:
+                spans.append((first + 1, last, 0xFF))
+            spans.append((last, last + 1, cls._span(0, (x + w - 1) & 7)))
+        for row in range(y, y + h):
+            base = (row * fb.stride) >> 3
+            for start, end, mask in spans:
+                _apply_mask(buf, base + start, base + end, mask, color)
+
+
+class _MonoHMSB(_MonoHLSB):
+    msb_first = False
+
+
+class _RGB565:
+    @staticmethod
+    def setpixel(fb, x, y, color):
+        index = (x + y * fb.stride) * 2
+        fb.buffer[index] = color & 0xFF
+        fb.buffer[index + 1] = (color >> 8) & 0xFF
+
+    @staticmethod
+    def getpixel(fb, x, y):
+        index = (x + y * fb.stride) * 2
+        return fb.buffer[index] | (fb.buffer[index + 1] << 8)
+
+    @staticmethod
+    def fill_rect(fb, x, y, w, h, color):
+        run = bytes((color & 0xFF, (color >> 8) & 0xFF)) * w
+        for row in range(y, y + h):
+            start = (x + row * fb.stride) * 2
+            fb.buffer[start:start + 2 * w] = run
+
+
+_FORMATS = {
+    MONO_VLSB: _MonoVLSB,
+    MONO_HLSB: _MonoHLSB,
+    MONO_HMSB: _MonoHMSB,
+    RGB565: _RGB565,
+}
+
+ELLIPSE_MASK_FILL = 0x10
+ELLIPSE_MASK_ALL = 0x0F
+ELLIPSE_MASK_Q1 = 0x01
+ELLIPSE_MASK_Q2 = 0x02
+ELLIPSE_MASK_Q3 = 0x04
+ELLIPSE_MASK_Q4 = 0x08
 
 
 class FrameBuffer:
     """Mock FrameBuffer class for simulator."""
 
-    def __init__(self, buffer, width, height, format):
+    def __init__(self, buffer, width, height, format, stride=None):
         """Initialize framebuffer with buffer, dimensions, and format."""
+        if format not in _FORMATS:
+            raise ValueError("invalid format")
         self.buffer = buffer
         self.width = width
         self.height = height
         self.format = format
+        self.stride = width if stride is None else stride
+        if format in (MONO_HLSB, MONO_HMSB):
+            self.stride = (self.stride + 7) & ~7
+        self._fmt = _FORMATS[format]
+
+    def _setpixel_checked(self, x, y, color, mask=True):
+        if mask and 0 <= x < self.width and 0 <= y < self.height:
+            self._fmt.setpixel(self, x, y, color)
 
     def pixel(self, x, y, color=None):
         """Get or set a pixel."""
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
-            return
-
-        if self.format == MONO_VLSB:
-            # Vertical LSB: 8 pixels per byte, organized vertically
-            byte_index = (x + (y // 8) * self.width)
-            bit_index = y % 8
-            if color is None:
-                # Get pixel
-                return (self.buffer[byte_index] >> bit_index) & 1
-            else:
-                # Set pixel
-                if color:
-                    self.buffer[byte_index] |= (1 << bit_index)
-                else:
-                    self.buffer[byte_index] &= ~(1 << bit_index)
+            return None
+        if color is None:
+            return self._fmt.getpixel(self, x, y)
+        self._fmt.setpixel(self, x, y, color)
 
     def fill(self, color):
         """Fill entire framebuffer with a color."""
-        if color:
-            for i in range(len(self.buffer)):
-                self.buffer[i] = 0xFF
-        else:
-            for i in range(len(self.buffer)):
-                self.buffer[i] = 0x00
+        self._fmt.fill_rect(self, 0, 0, self.width, self.height, color)
+
+    def fill_rect(self, x, y, width, height, color):
+        """Fill a rectangle, clipped to the framebuffer."""
+        if height < 1 or width < 1 or x + width <= 0 or y + height <= 0 or y >= self.height or x >= self.width:
+            return
+        xend = min(self.width, x + width)
+        yend = min(self.height, y + height)
+        x = max(x, 0)
+        y = max(y, 0)
+        self._fmt.fill_rect(self, x, y, xend - x, yend - y, color)
 
     def hline(self, x, y, width, color):
         """Draw a horizontal line."""
-        for i in range(width):
-            if 0 <= x + i < self.width:
-                self.pixel(x + i, y, color)
+        self.fill_rect(x, y, width, 1, color)
 
     def vline(self, x, y, height, color):
         """Draw a vertical line."""
-        for i in range(height):
-            if 0 <= y + i < self.height:
-                self.pixel(x, y + i, color)
-
-    def line(self, x0, y0, x1, y1, color):
-        """Draw a line using Bresenham algorithm."""
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x1 > x0 else -1
-        sy = 1 if y1 > y0 else -1
-        err = dx - dy
-
-        x, y = x0, y0
-        while True:
-            self.pixel(x, y, color)
-            if x == x1 and y == y1:
-                break
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
+        self.fill_rect(x, y, 1, height, color)
 
     def rect(self, x, y, width, height, color, fill=False):
         """Draw a rectangle."""
         if fill:
-            for i in range(height):
-                self.hline(x, y + i, width, color)
+            self.fill_rect(x, y, width, height, color)
+        else:
+            self.fill_rect(x, y, width, 1, color)
+            self.fill_rect(x, y + height - 1, width, 1, color)
+            self.fill_rect(x, y, 1, height, color)
+            self.fill_rect(x + width - 1, y, 1, height, color)
+
+    def line(self, x0, y0, x1, y1, color):
+        """Draw a line using Bresenham algorithm.
+
+        The steps that land on the framebuffer are worked out before walking
+        the line, so only visible pixels are visited.
+        """
+        dx = x1 - x0
+        sx = 1 if dx > 0 else -1
+        dx = abs(dx)
+        dy = y1 - y0
+        sy = 1 if dy > 0 else -1
+        dy = abs(dy)
+        steep = dy > dx
+        if steep:
+            a, b, n, d, sa, sb = y0, x0, dy, dx, sy, sx
+            major_size, minor_size = self.height, self.width
+        else:
+            a, b, n, d, sa, sb = x0, y0, dx, dy, sx, sy
+            major_size, minor_size = self.width, self.height
+
+        # Step k plots major a + sa*k and minor b + sb*((2*d*k + n) // (2*n)).
+        if sa > 0:
+            k_lo, k_hi = max(0, -a), min(n, major_size - a)
+        else:
+            k_lo, k_hi = max(0, a - major_size + 1), min(n, a + 1)
+        if d:
+            if sb > 0:
+                m_lo, m_hi = -b, minor_size - 1 - b
+            else:
+                m_lo, m_hi = b - minor_size + 1, b
+            k_lo = max(k_lo, -((n - 2 * n * m_lo) // (2 * d)))
+            k_hi = min(k_hi, -((n - 2 * n * (m_hi + 1)) // (2 * d)))
+        elif not 0 <= b < minor_size:
+            k_hi = k_lo
+
+        setpixel = self._fmt.setpixel
+        two_d, two_n = 2 * d, 2 * n
+        for k in range(k_lo, k_hi):
+            minor = b + sb * ((two_d * k + n) // two_n)
+            if steep:
+                setpixel(self, minor, a + sa * k, color)
+            else:
+                setpixel(self, a + sa * k, minor, color)
+        self._setpixel_checked(x1, y1, color)
+
+    def _ellipse_points(self, cx, cy, x, y, color, mask):
+        if mask & ELLIPSE_MASK_FILL:
+            if mask & ELLIPSE_MASK_Q1:
+                self.fill_rect(cx, cy - y, x + 1, 1, color)
+            if mask & ELLIPSE_MASK_Q2:
+                self.fill_rect(cx - x, cy - y, x + 1, 1, color)
+            if mask & ELLIPSE_MASK_Q3:
+                self.fill_rect(cx - x, cy + y, x + 1, 1, color)
+            if mask & ELLIPSE_MASK_Q4:
+                self.fill_rect(cx, cy + y, x + 1, 1, color)
         else:
-            self.hline(x, y, width, color)
-            self.hline(x, y + height - 1, width, color)
-            self.vline(x, y, height, color)
-            self.vline(x + width - 1, y, height, color)
+            self._setpixel_checked(cx + x, cy - y, color, mask & ELLIPSE_MASK_Q1)
+            self._setpixel_checked(cx - x, cy - y, color, mask & ELLIPSE_MASK_Q2)
+            self._setpixel_checked(cx - x, cy + y, color, mask & ELLIPSE_MASK_Q3)
+            self._setpixel_checked(cx + x, cy + y, color, mask & ELLIPSE_MASK_Q4)
 
-    def text(self, text, x, y, color):
-        """Draw text (basic implementation - no actual font rendering)."""
-        # For simulator, we just skip text rendering or log it
-        # In real MicroPython with font, this would render text
-        pass
+    def ellipse(self, x, y, xr, yr, color, fill=False, m=ELLIPSE_MASK_ALL):
+        """Draw an ellipse; m selects quadrants (bit 0 = top right, counter-clockwise)."""
+        mask = (ELLIPSE_MASK_FILL if fill else 0) | (m & ELLIPSE_MASK_ALL)
+        if xr == 0 and yr == 0:
+            if mask & ELLIPSE_MASK_ALL:
+                self._setpixel_checked(x, y, color)
+            return
+        two_asquare = 2 * xr * xr
+        two_bsquare = 2 * yr * yr
+        px, py = xr, 0
+        xchange = yr * yr * (1 - 2 * xr)
+        ychange = xr * xr
+        error = 0
+        stoppingx = two_bsquare * xr
+        stoppingy = 0
+        while stoppingx >= stoppingy:
+            self._ellipse_points(x, y, px, py, color, mask)
+            py += 1
+            stoppingy += two_asquare
+            error += ychange
+            ychange += two_asquare
+            if 2 * error + xchange > 0:
+                px -= 1
+                stoppingx -= two_bsquare
+                error += xchange
+                xchange += two_bsquare
+        px, py = 0, yr
+        xchange = yr * yr
+        ychange = xr * xr * (1 - 2 * yr)
+        error = 0
+        stoppingx = 0
+        stoppingy = two_asquare * yr
+        while stoppingx <= stoppingy:
+            self._ellipse_points(x, y, px, py, color, mask)
+            px += 1
+            stoppingx += two_bsquare
+            error += xchange
+            xchange += two_bsquare
+            if 2 * error + ychange > 0:
+                py -= 1
+                stoppingy -= two_asquare
+                error += ychange
+                ychange += two_asquare
+
+    def poly(self, x, y, coords, color, fill=False):
+        """Draw a closed polygon from a flat sequence of x, y offsets."""
+        points = len(coords) // 2
+        if points == 0:
+            return
+        if not fill:
+            px1, py1 = coords[0], coords[1]
+            i = points * 2 - 1
+            while i >= 0:
+                py2, px2 = coords[i], coords[i - 1]
+                i -= 2
+                self.line(x + px1, y + py1, x + px2, y + py2, color)
+                px1, py1 = px2, py2
+            return
+
+        ys = coords[1:points * 2:2]
+        for row in range(min(ys), max(ys) + 1):
+            nodes = []
+            px1, py1 = coords[0], coords[1]
+            i = points * 2 - 1
+            while i >= 0:
+                py2, px2 = coords[i], coords[i - 1]
+                i -= 2
+                # Skip the bottom pixel of each edge so shared vertices are not counted twice.
+                if py1 != py2 and ((py1 > row >= py2) or (py1 <= row < py2)):
+                    nodes.append(_cdiv(32 * px1 + _cdiv(32 * (px2 - px1) * (row - py1), py2 - py1) + 16, 32))
+                elif row == max(py1, py2):
+                    # Fill in local minima, which the scanline misses.
+                    if py1 < py2:
+                        self._setpixel_checked(x + px2, y + py2, color)
+                    elif py2 < py1:
+                        self._setpixel_checked(x + px1, y + py1, color)
+                    else:
+                        self.line(x + px1, y + py1, x + px2, y + py2, color)
+                px1, py1 = px2, py2
+            nodes.sort()
+            for j in range(0, len(nodes) - 1, 2):
+                self.fill_rect(x + nodes[j], y + row, nodes[j + 1] - nodes[j] + 1, 1, color)
+
+    def text(self, text, x, y, color=1):
+        """Draw text with the device 5x8 font; only set font pixels are drawn."""
+        data = Characters.data
+        default = data["*"]
+        aligned = self.format == MONO_VLSB and y % 8 == 0 and 0 <= y and y + 8 <= self.height
+        for ch in text:
+            glyph = data.get(ch, default)
+            for col, line in enumerate(glyph):
+                cx = x + col
+                if not 0 <= cx < self.width:
+                    continue
+                if aligned:
+                    index = (y >> 3) * self.stride + cx
+                    if color:
+                        self.buffer[index] |= line
+                    else:
+                        self.buffer[index] &= ~line & 0xFF
+                    continue
+                row = y
+                while line:
+                    if line & 1:
+                        self._setpixel_checked(cx, row, color)
+                    line >>= 1
+                    row += 1
+            x += FONT_ADVANCE
 
     def blit(self, source, x, y, key=-1, palette=None):
-        """Blit another framebuffer onto this one."""
-        pass
+        """Blit another framebuffer onto this one.
+
+        Source pixels equal to key are skipped; with a palette each source
+        colour is looked up as palette.pixel(color, 0) first.
+        """
+        if isinstance(source, tuple):
+            source = FrameBuffer(*source)
+        if isinstance(palette, tuple):
+            palette = FrameBuffer(*palette)
+        if x >= self.width or y >= self.height or -x >= source.width or -y >= source.height:
+            return
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = max(0, -x), max(0, -y)
+        x0end = min(self.width, x + source.width)
+        y0end = min(self.height, y + source.height)
+        width = x0end - x0
+
+        if key == -1 and palette is None and source.format == self.format:
+            if self.format == RGB565:
+                for row in range(y0end - y0):
+                    src = (x1 + (y1 + row) * source.stride) * 2
+                    dst = (x0 + (y0 + row) * self.stride) * 2
+                    self.buffer[dst:dst + 2 * width] = source.buffer[src:src + 2 * width]
+                return
+            if self.format == MONO_VLSB and y0 % 8 == 0 and y1 % 8 == 0:
+                rows = y0end - y0
+                for page in range(rows // 8):
+                    src = ((y1 >> 3) + page) * source.stride + x1
+                    dst = ((y0 >> 3) + page) * self.stride + x0
+                    self.buffer[dst:dst + width] = source.buffer[src:src + width]
+                if rows % 8:
+                    mask = (1 << (rows % 8)) - 1
+                    page = rows // 8
+                    src = ((y1 >> 3) + page) * source.stride + x1
+                    dst = ((y0 >> 3) + page) * self.stride + x0
+                    for i in range(width):
+                        self.buffer[dst + i] = (self.buffer[dst + i] & ~mask) | (source.buffer[src + i] & mask)
+                return
+
+        getpixel = source._fmt.getpixel
+        setpixel = self._fmt.setpixel
+        lookup = palette._fmt.getpixel if palette is not None else None
+        for row in range(y0end - y0):
+            for col in range(width):
+                c = getpixel(source, x1 + col, y1 + row)
+                if lookup is not None:
+                    c = lookup(palette, c, 0)
+                if c != key:
+                    setpixel(self, x0 + col, y0 + row, c)
+
+    def scroll(self, xstep, ystep):
+        """Shift the contents by xstep, ystep; the uncovered area is left as it was."""
+        if xstep < 0:
+            xs = range(0, self.width + xstep)
+        else:
+            xs = range(xstep, self.width)
+        if ystep < 0:
+            ys = range(0, self.height + ystep)
+        else:
+            ys = range(ystep, self.height)
+        if not xs or not ys:
+            return
+
+        if self.format == MONO_VLSB:
+            # Each column is one integer of height bits, shifted in one go.
+            pages = (self.height + 7) >> 3
+            span = pages * self.stride
+            src = bytes(self.buffer)
+            rows = ((1 << len(ys)) - 1) << ys.start
+            for cx in xs:
+                column = int.from_bytes(src[cx - xstep:cx - xstep + span:self.stride], "little")
+                column = column << ystep if ystep >= 0 else column >> -ystep
+                old = int.from_bytes(src[cx:cx + span:self.stride], "little")
+                self.buffer[cx:cx + span:self.stride] = ((old & ~rows) | (column & rows)).to_bytes(pages, "little")
+            return
+
+        if self.format == RGB565:
+            src = bytes(self.buffer)
+            for cy in ys:
+                dst = (xs.start + cy * self.stride) * 2
+                start = (xs.start - xstep + (cy - ystep) * self.stride) * 2
+                self.buffer[dst:dst + 2 * len(xs)] = src[start:start + 2 * len(xs)]
+            return
+
+        snapshot = FrameBuffer(bytes(self.buffer), self.width, self.height, self.format, self.stride)
+        getpixel = self._fmt.getpixel
+        setpixel = self._fmt.setpixel
+        for cy in ys:
+            for cx in xs:
+                setpixel(self, cx, cy, getpixel(snapshot, cx - xstep, cy - ystep))
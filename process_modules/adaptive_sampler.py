@@ -0,0 +1,110 @@
+"""
+Error-bounded adaptive sampling of y = f(x) for plotting.
+
+The curve is first sampled on a coarse grid (a few pixels apart), then
+every interval is split at its midpoint until the midpoint lands within
+max_error pixels of the straight line between the interval's ends, i.e.
+until the line drawn through the samples is off by less than a pixel.
+Splitting works level by level, so the midpoints of one level are
+evaluated in a single batch.
+
+Screen y is clamped to one pixel beyond the plot, so parts of the curve
+that are off screen on the same side are straight lines and cost
+nothing. Intervals whose ends differ in validity are bisected down to
+min_dx to find where the curve starts or stops, and an interval that is
+still more than a pixel tall at min_dx is a jump, not a steep slope.
+
+A budget caps the evaluations per call. When a level needs more
+midpoints than remain, the intervals with the largest error are split
+first and the rest are drawn as they are, so pathological functions
+such as sin(1/x) cost bounded time.
+"""
+
+# Interval states
+_UNTESTED = 0   # needs its midpoint evaluated
+_LINE = 1       # drawn as a straight line
+_BREAK = 2      # not connected: undefined or a jump
+
+
+def sample_curve(lookup, xs, to_px, to_py, max_error=0.5, min_dx=1 / 64, budget=1024, samples=None,
+                 cancelled=None):
+    """Sample a curve adaptively.
+
+    lookup(xs) returns a (y, valid) pair per x. xs is the sorted starting
+    grid. to_px(x) maps x to a (float) pixel column, to_py(y) maps y to a
+    clamped (float) pixel row. min_dx is in pixels, budget counts the
+    samples requested beyond the grid. samples is lookup(xs) when the
+    caller already has it.
+
+    Returns (polylines, evaluations): lists of (px, py) pixel points and
+    the number of samples requested, grid included.
+    """
+    if samples is None:
+        samples = lookup(xs)
+    points = [(x, to_px(x), to_py(y) if ok else None) for x, (y, ok) in zip(xs, samples)]
+    evaluations = len(points)
+    intervals = [[points[i], points[i + 1], _UNTESTED, 0.0] for i in range(len(points) - 1)]
+    done = []
+
+    while intervals:
+        if cancelled is not None and cancelled():
+            return [], evaluations
+        todo = []
+        for interval in intervals:
+            a, b, state, _ = interval
+            if state != _UNTESTED:
+                done.append(interval)
+            elif a[2] is None and b[2] is None:
+                interval[2] = _BREAK
+                done.append(interval)
+            elif b[1] - a[1] <= min_dx:
+                # As fine as it gets: a validity edge or a jump
+                if a[2] is None or b[2] is None or abs(b[2] - a[2]) > 1:
+                    interval[2] = _BREAK
+                else:
+                    interval[2] = _LINE
+                done.append(interval)
+            else:
+                todo.append(interval)
+        if not todo:
+            break
+
+        if len(todo) > budget:
+            # Out of budget: split the worst intervals, draw the rest as they are
+            todo.sort(key=lambda interval: -interval[3])
+            for interval in todo[budget:]:
+                a, b = interval[0], interval[1]
+                interval[2] = _LINE if a[2] is not None and b[2] is not None else _BREAK
+                done.append(interval)
+            todo = todo[:budget]
+        if not todo:
+            break
+
+        mids = [(interval[0][0] + interval[1][0]) / 2 for interval in todo]
+        budget -= len(mids)
+        evaluations += len(mids)
+        intervals = []
+        for interval, x, (y, ok) in zip(todo, mids, lookup(mids)):
+            a, b = interval[0], interval[1]
+            m = (x, to_px(x), to_py(y) if ok else None)
+            if a[2] is not None and b[2] is not None and m[2] is not None:
+                error = abs(m[2] - (a[2] + b[2]) / 2)
+                state = _LINE if error <= max_error else _UNTESTED
+            else:
+                error = float('inf')
+                state = _UNTESTED
+            intervals.append([a, m, state, error])
+            intervals.append([m, b, state, error])
+
+    done.sort(key=lambda interval: interval[0][0])
+    polylines = []
+    line = None
+    for a, b, state, _ in done:
+        if state != _LINE:
+            line = None
+            continue
+        if line is None or line[-1] is not a:
+            line = [a]
+            polylines.append(line)
+        line.append(b)
+    return [[(p[1], p[2]) for p in line] for line in polylines], evaluations
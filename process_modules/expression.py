@@ -0,0 +1,401 @@
+"""
+Compile-once expression engine for user entered functions of x.
+
+An expression is parsed and validated once, compiled to a code object and
+cached by its text. The resulting CompiledFunction can be called with a
+single x value or evaluated over a whole NumPy array of x values at once.
+
+Text is taken as typed on the keypad: normalize() rewrites the keypad
+vocabulary (^, π, ², √ as a prefix root as in √9 or √(x+1), implicit
+multiplication as in 2pi or 3(x+1)) to Python source first. Only arithmetic, the names below and calls to them
+get past validation, and constant subexpressions are folded at compile
+time. evaluate_expression() evaluates expressions without a variable, as
+the calculate app does, and memoizes their results.
+"""
+
+import ast
+import math
+import re
+import threading
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_VALUE = 1e10  # Values beyond this are treated as undefined when plotting
+CACHE_SIZE = 32
+RESULT_CACHE_SIZE = 64
+MAX_INT_BITS = 1024  # Integer powers beyond this size are computed in floats
+
+SCALAR_NAMES = {
+    # Functions
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'atan2': math.atan2,
+    'ceil': math.ceil,
+    'copysign': math.copysign,
+    'degrees': math.degrees,
+    'exp': math.exp,
+    'fabs': math.fabs,
+    'floor': math.floor,
+    'fmod': math.fmod,
+    'frexp': math.frexp,
+    'ldexp': math.ldexp,
+    'log': math.log,
+    'ln': math.log,
+    'log10': math.log10,
+    'modf': math.modf,
+    'pow': math.pow,
+    'radians': math.radians,
+    'sqrt': math.sqrt,
+    'trunc': math.trunc,
+    'abs': abs,
+
+    # Constants
+    'pi': math.pi,
+    'e': math.e,
+}
+
+
+def _np_log(x, base=None):
+    if base is None:
+        return np.log(x)
+    return np.log(x) / np.log(base)
+
+
+if np is not None:
+    # Element-wise equivalents; names missing here fall back to scalar evaluation.
+    VECTOR_NAMES = {
+        'sin': np.sin,
+        'cos': np.cos,
+        'tan': np.tan,
+        'asin': np.arcsin,
+        'acos': np.arccos,
+        'atan': np.arctan,
+        'atan2': np.arctan2,
+        'ceil': np.ceil,
+        'copysign': np.copysign,
+        'degrees': np.degrees,
+        'exp': np.exp,
+        'fabs': np.fabs,
+        'floor': np.floor,
+        'fmod': np.fmod,
+        'log': _np_log,
+        'ln': np.log,
+        'log10': np.log10,
+        'pow': np.power,
+        'radians': np.radians,
+        'sqrt': np.sqrt,
+        'trunc': np.trunc,
+        'abs': np.abs,
+        'pi': math.pi,
+        'e': math.e,
+    }
+else:
+    VECTOR_NAMES = {}
+
+# Keypad symbols and the Python they stand for (√ is rewritten by normalize())
+KEYPAD_SYMBOLS = {
+    '^': '**',
+    '×': '*',
+    '÷': '/',
+    '²': '**2',
+    'π': 'pi',
+}
+
+# Names and numbers are ASCII only, so symbols such as ² never end up inside a name
+_TOKEN = re.compile(r"\s*(?:([0-9]+\.?[0-9]*(?:[eE][+-]?[0-9]+)?|\.[0-9]+(?:[eE][+-]?[0-9]+)?)"
+                    r"|([A-Za-z_][A-Za-z0-9_]*)|(\*\*|//|[-+*/%(),^×÷²√π]))")
+
+
+def tokenize(text):
+    """Split keypad text into (kind, value) tokens, kind being 'num', 'name' or 'op'."""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError("unexpected character: " + text[pos:].lstrip()[:1])
+        number, name, op = match.groups()
+        if number is not None:
+            tokens.append(('num', number))
+        elif name is not None:
+            tokens.append(('name', name))
+        else:
+            symbol = KEYPAD_SYMBOLS.get(op, op)
+            tokens.append(('name' if symbol.isalpha() else 'op', symbol))
+        pos = match.end()
+    return tokens
+
+
+def _operand_end(tokens, i):
+    """Index just past the operand of a √ whose operand starts at tokens[i]."""
+    if i >= len(tokens):
+        raise ValueError("√ needs an operand")
+    kind, value = tokens[i]
+    if value == '√':
+        return _operand_end(tokens, i + 1)
+    if kind == 'name' and i + 1 < len(tokens) and tokens[i + 1][1] == '(':
+        i += 1  # a call: the operand runs to its closing parenthesis
+        value = '('
+    if value == '(':
+        depth = 0
+        for j in range(i, len(tokens)):
+            if tokens[j][1] == '(':
+                depth += 1
+            elif tokens[j][1] == ')':
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+        return len(tokens)  # Unbalanced; the parser reports it
+    if kind in ('num', 'name'):
+        return i + 1
+    raise ValueError("√ needs an operand")
+
+
+def _expand_roots(tokens):
+    """Rewrite √ operand as a sqrt call: √9 -> sqrt(9), √(x+1) -> sqrt(x+1)."""
+    out = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i][1] == '√':
+            end = _operand_end(tokens, i + 1)
+            operand = _expand_roots(tokens[i + 1:end])
+            out.append(('name', 'sqrt'))
+            if tokens[i + 1][1] == '(':
+                out.extend(operand)  # √(9) is already parenthesized
+            else:
+                out.append(('op', '('))
+                out.extend(operand)
+                out.append(('op', ')'))
+            i = end
+        else:
+            out.append(tokens[i])
+            i += 1
+    return out
+
+
+def normalize(text):
+    """Rewrite keypad text as canonical Python source.
+
+    A number, ")" or ² directly followed by a number, a name or "(" gets
+    an explicit "*", and whitespace is dropped, so differently typed
+    forms of one expression share their cache entries.
+    """
+    out = []
+    previous = None
+    for kind, value in _expand_roots(tokenize(text)):
+        if previous is not None and previous[0] == 'num' and kind == 'num':
+            raise ValueError("missing operator between numbers")
+        if previous is not None and (previous[0] == 'num' or previous[1] in (')', '**2')) and (kind != 'op' or value == '('):
+            out.append('*')
+        out.append(value)
+        previous = (kind, value)
+    return ''.join(out)
+
+
+def _safe_pow(base, exponent):
+    """base ** exponent, switching to floats before an integer power gets huge."""
+    if isinstance(base, int) and isinstance(exponent, int) and exponent * base.bit_length() > MAX_INT_BITS:
+        return float(base) ** exponent
+    return base ** exponent
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Replaces subexpressions that do not depend on the variable with their value."""
+
+    def __init__(self, var):
+        self.var = var
+        self.ns = dict(SCALAR_NAMES)
+        self.ns["_safe_pow"] = _safe_pow
+        self.ns["__builtins__"] = {}
+
+    def _fold(self, node):
+        try:
+            value = eval(compile(ast.Expression(node), "<fold>", "eval"), self.ns)
+        except Exception:
+            return node  # Left for evaluation time, where the error is reported
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return node
+        if isinstance(value, float) and not math.isfinite(value):
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_Name(self, node):
+        if node.id != self.var and isinstance(SCALAR_NAMES.get(node.id), float):
+            return ast.copy_location(ast.Constant(SCALAR_NAMES[node.id]), node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant):
+            return self._fold(node)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            # Powers go through _safe_pow, so neither folding nor evaluating 9**9**9 hangs
+            node = ast.copy_location(ast.Call(func=ast.Name(id='_safe_pow', ctx=ast.Load()),
+                                              args=[node.left, node.right], keywords=[]), node)
+            if isinstance(node.args[0], ast.Constant) and isinstance(node.args[1], ast.Constant):
+                return self._fold(node)
+            return node
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            return self._fold(node)
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if node.func.id != self.var and all(isinstance(arg, ast.Constant) for arg in node.args):
+            return self._fold(node)
+        return node
+
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub,
+)
+
+
+class CompiledFunction:
+    """A validated, compiled f(x) that evaluates single values or NumPy arrays."""
+
+    def __init__(self, text, var="x"):
+        self.text = text
+        self.var = var
+        tree = ast.parse(normalize(text), mode="eval")
+        self._validate(tree)
+        tree = ast.fix_missing_locations(_ConstantFolder(var).visit(tree))
+        self.code = compile(tree, "<f(" + (var or "") + ")>", "eval")
+        self._scalar_ns = dict(SCALAR_NAMES)
+        self._scalar_ns["_safe_pow"] = _safe_pow
+        self._scalar_ns["__builtins__"] = {}
+        self._vector_ns = dict(VECTOR_NAMES)
+        self._vector_ns["_safe_pow"] = _safe_pow
+        self._vector_ns["__builtins__"] = {}
+
+    def _validate(self, tree):
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValueError("unsupported syntax: " + type(node).__name__)
+            if isinstance(node, ast.Name) and node.id != self.var and node.id not in SCALAR_NAMES:
+                raise ValueError("unknown name: " + node.id)
+            if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.keywords):
+                raise ValueError("unsupported call")
+            if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+                raise ValueError("unsupported constant")
+
+    def __call__(self, x):
+        # x goes into a per-call locals mapping: the namespaces are shared by every thread
+        return eval(self.code, self._scalar_ns, {self.var: x})
+
+    def value(self):
+        """Evaluate an expression without a variable."""
+        return eval(self.code, self._scalar_ns)
+
+    def evaluate(self, xs):
+        """Evaluate f over many x values.
+
+        Returns (ys, valid) where valid masks out NaN, inf, complex and values
+        beyond MAX_VALUE. With NumPy both are float/bool arrays, otherwise lists.
+        """
+        if np is None:
+            return self._evaluate_scalar(xs)
+        xs = np.asarray(xs, dtype=float)
+        try:
+            with np.errstate(all="ignore"):
+                ys = eval(self.code, self._vector_ns, {self.var: xs})
+            ys = np.asarray(ys)
+            if ys.dtype.kind not in "biuf":
+                raise TypeError("non-real result")
+            ys = np.broadcast_to(ys.astype(float), xs.shape)
+        except Exception:
+            ys, valid = self._evaluate_scalar(xs.tolist())
+            return np.array(ys, dtype=float), np.array(valid, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(ys) & (np.abs(ys) <= MAX_VALUE)
+        return ys, valid
+
+    def _evaluate_scalar(self, xs):
+        ys = []
+        valid = []
+        for x in xs:
+            try:
+                y = float(self(x))
+                ok = y == y and abs(y) <= MAX_VALUE
+            except Exception:
+                y, ok = float("nan"), False
+            ys.append(y)
+            valid.append(ok)
+        return ys, valid
+
+
+_cache = {}
+_lock = threading.RLock()  # The compile and result caches are shared with the plot worker
+
+
+def compile_function(text, var="x"):
+    """Return the cached CompiledFunction for text, compiling it on first use.
+
+    Texts that normalize to the same source share one CompiledFunction.
+    """
+    key = (text.strip(), var)
+    with _lock:
+        func = _cache.get(key)
+        if func is None:
+            source_key = (normalize(text), var)
+            func = _cache.get(source_key)
+            if func is None:
+                func = CompiledFunction(text, var)
+            for k in (source_key, key):
+                if k not in _cache and len(_cache) >= CACHE_SIZE:
+                    _cache.pop(next(iter(_cache)))
+                _cache[k] = func
+        return func
+
+
+_results = {}
+
+
+def evaluate_expression(text):
+    """Evaluate a keypad expression without a variable, memoized by its normalized form.
+
+    Raises ValueError or SyntaxError for input that is not a valid
+    expression and the evaluation error (ZeroDivisionError, ...) otherwise.
+    """
+    key = text.strip()
+    with _lock:
+        if key in _results:
+            return _results[key]
+        source = normalize(text)
+        if source in _results:
+            value = _results[source]
+        else:
+            value = compile_function(source, var=None).value()
+        for k in (source, key):
+            if k not in _results and len(_results) >= RESULT_CACHE_SIZE:
+                _results.pop(next(iter(_results)))
+            _results[k] = value
+        return value
+
+
+if __name__ == "__main__":
+    # Quick self-check of the keypad vocabulary: python -m process_modules.expression
+    assert normalize("x²+1") == "x**2+1" and compile_function("x²+1")(3) == 10
+    assert normalize("2x²") == "2*x**2" and compile_function("2x²")(3) == 18
+    assert normalize("√9") == "sqrt(9)" and evaluate_expression("√9") == 3.0
+    assert normalize("√(x+1)") == "sqrt(x+1)" and normalize("2√√16") == "2*sqrt(sqrt(16))"
+    assert normalize("2pi") == "2*pi" and normalize("(1+1)(2+2)") == "(1+1)*(2+2)"
+    for bad in ("√", "√+1", "2 3", "__import__('os')", "().__class__", "x²y²"):
+        try:
+            evaluate_expression(bad)
+        except (ValueError, SyntaxError):
+            continue
+        raise AssertionError("accepted " + bad)
+    print("expression: ok")
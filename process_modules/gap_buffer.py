@@ -0,0 +1,74 @@
+"""
+Gap buffer for editable text.
+
+Characters live in one list with a hole (the gap) kept at the last edit
+position. Inserting or deleting at the cursor only moves the gap by the
+distance the cursor travelled, so typing is O(1) amortized instead of
+rebuilding the whole string on every keystroke.
+"""
+
+MIN_GAP = 64
+
+
+class GapBuffer:
+    """A list of characters with a movable gap at the edit position."""
+
+    def __init__(self, text=""):
+        self.set(text)
+
+    def set(self, text):
+        self.chars = list(text) + [""] * MIN_GAP
+        self.gap_start = len(text)
+        self.gap_end = len(self.chars)
+
+    def __len__(self):
+        return len(self.chars) - (self.gap_end - self.gap_start)
+
+    def __str__(self):
+        return self.slice(0, len(self))
+
+    def _move_gap(self, index):
+        chars = self.chars
+        if index < self.gap_start:
+            count = self.gap_start - index
+            chars[self.gap_end - count:self.gap_end] = chars[index:self.gap_start]
+            self.gap_start -= count
+            self.gap_end -= count
+        elif index > self.gap_start:
+            count = index - self.gap_start
+            chars[self.gap_start:index] = chars[self.gap_end:self.gap_end + count]
+            self.gap_start += count
+            self.gap_end += count
+
+    def insert(self, index, text):
+        """Insert text before index."""
+        if not text:
+            return
+        self._move_gap(max(0, min(index, len(self))))
+        if self.gap_end - self.gap_start < len(text):
+            grow = max(len(text), len(self.chars) // 2, MIN_GAP)
+            self.chars[self.gap_end:self.gap_end] = [""] * grow
+            self.gap_end += grow
+        self.chars[self.gap_start:self.gap_start + len(text)] = text
+        self.gap_start += len(text)
+
+    def delete(self, index, count=1):
+        """Delete count characters starting at index."""
+        if not 0 <= index < len(self):
+            return
+        self._move_gap(index)
+        self.gap_end = min(self.gap_end + count, len(self.chars))
+
+    def slice(self, start, end):
+        """Return the text between start and end (clamped) as a string."""
+        start = max(0, start)
+        end = min(end, len(self))
+        if start >= end:
+            return ""
+        gap_start = self.gap_start
+        gap = self.gap_end - gap_start
+        if end <= gap_start:
+            return "".join(self.chars[start:end])
+        if start >= gap_start:
+            return "".join(self.chars[start + gap:end + gap])
+        return "".join(self.chars[start:gap_start]) + "".join(self.chars[self.gap_end:end + gap])
@@ -11,15 +11,8 @@ class MenuUploader(BaseUploader):
         ref_rows = self.buffer_klass.ref_ar()
 
         for i in range(ref_rows[0], ref_rows[1]):
-            self._clear_row_display(i)
-
-            buf[i]+=" "*(self.buffer_klass.cols-len(buf[i]))
-
-            for j in buf[i]:
-                if i == self.buffer_klass.cursor():
-                    self._print_character(j, invert=True)
-                else:
-                    self._print_character(j, invert=False)
+            row = buf[i].ljust(self.buffer_klass.cols)
+            self._update_row(i, row, True if i == self.buffer_klass.cursor() else ())
         
         present()
 
@@ -0,0 +1,124 @@
+"""
+Background renderer for plots.
+
+Jobs run on one worker thread that draws into its own off-screen
+framebuffer, so the UI thread keeps polling keys while a frame is being
+sampled. Every submit() starts a new generation: the running job sees
+that it is stale at its next cancelled() check and gives up, and queued
+jobs that were never started are simply replaced. Only frames of the
+current generation are kept, and the UI picks up the latest finished one
+with take(), usually from an idle hook. wake() is called after each frame
+so a UI thread blocked on input gets to run that hook. close() ends the
+thread once its job is over; a later submit() starts a new one.
+
+wait_all() blocks until every live worker is idle, so scripted runs (the
+golden-frame check) can capture frames deterministically.
+"""
+
+import threading
+import weakref
+
+_workers = weakref.WeakSet()
+
+
+def wait_all(timeout=None):
+    """Block until no live PlotWorker has a job queued or running."""
+    for worker in list(_workers):
+        worker.wait(timeout)
+
+
+class PlotWorker:
+    """Runs render(job, cancelled) on a worker thread.
+
+    render is a generator yielding finished frames (bytes); cancelled() is
+    true once a newer job was submitted or cancel() was called.
+    """
+
+    def __init__(self, render, wake=None):
+        self.render = render
+        self.wake = wake
+        self.generation = 0
+        self.frames = 0
+        self._job = None
+        self._running = None
+        self._frame = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        _workers.add(self)
+
+    def submit(self, job):
+        """Queue job, superseding the queued and the running one. Returns its generation."""
+        with self._cond:
+            self.generation += 1
+            self._job = (self.generation, job)
+            self._cond.notify_all()
+            generation = self.generation
+        if self._thread is None:
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="plot-worker", daemon=True)
+            self._thread.start()
+        return generation
+
+    def cancel(self):
+        """Drop the queued job, stop the running one and forget any unshown frame."""
+        with self._cond:
+            self.generation += 1
+            self._job = None
+            self._frame = None
+
+    def close(self):
+        """Cancel any work and end the worker thread, waiting until it has exited."""
+        with self._cond:
+            self.generation += 1
+            self._job = None
+            self._frame = None
+            self._closed = True
+            self._cond.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def take(self):
+        """Return the latest finished frame not shown yet, or None."""
+        with self._cond:
+            frame, self._frame = self._frame, None
+        return frame
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._job is not None or self._running is not None
+
+    def wait(self, timeout=None):
+        """Block until no job is queued or running; returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._job is None and self._running is None, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._job is not None or self._closed)
+                if self._closed:
+                    return
+                generation, job = self._job
+                self._job = None
+                self._running = generation
+
+            def cancelled():
+                return self.generation != generation
+
+            try:
+                for frame in self.render(job, cancelled):
+                    with self._cond:
+                        if cancelled():
+                            break
+                        self._frame = frame
+                        self.frames += 1
+                    if self.wake:
+                        self.wake()
+            except Exception as e:
+                print("plot job failed:", e)
+            with self._cond:
+                self._running = None
+                self._cond.notify_all()
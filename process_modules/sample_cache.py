@@ -0,0 +1,94 @@
+"""
+Per-expression cache of f(x) samples for incremental re-plotting.
+
+Coarse samples are taken on power-of-two x lattices (x = k * 2**n). Those
+values are exact floats, so after a pan the overlapping part of the view
+finds its samples again, and a zoom only evaluates the points its finer
+lattice adds. Every evaluated x is remembered together with its validity.
+
+Caches are shared between the UI thread and the plot worker, so every
+access to the samples and to the cache table goes through a lock.
+"""
+
+import math
+import threading
+
+MAX_SAMPLES = 20000
+CACHE_SIZE = 8
+
+
+class SampleCache:
+    """Remembers (y, valid) for each evaluated x of one compiled expression."""
+
+    def __init__(self, func, max_samples=MAX_SAMPLES):
+        self.func = func
+        self.max_samples = max_samples
+        self.samples = {}
+        self.evaluations = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def lattice_step(spacing):
+        """Largest power of two not above spacing."""
+        return 2.0 ** math.floor(math.log2(abs(spacing)))
+
+    def lattice(self, x_lo, x_hi, spacing):
+        """Return (step, xs) for the lattice points covering [x_lo, x_hi]."""
+        step = self.lattice_step(spacing)
+        if x_lo > x_hi:
+            x_lo, x_hi = x_hi, x_lo
+        first = math.ceil(x_lo / step)
+        last = math.floor(x_hi / step)
+        return step, [k * step for k in range(first, last + 1)]
+
+    def lookup(self, xs):
+        """Return a (y, valid) pair per x, evaluating only the missing ones in one batch."""
+        with self._lock:
+            samples = self.samples
+            missing = [x for x in xs if x not in samples]
+            if missing:
+                ys, valid = self.func.evaluate(missing)
+                if hasattr(ys, 'tolist'):
+                    ys, valid = ys.tolist(), valid.tolist()
+                for x, y, ok in zip(missing, ys, valid):
+                    samples[x] = (y, ok)
+                self.evaluations += len(missing)
+            return [samples[x] for x in xs]
+
+    def get(self, x):
+        return self.lookup((x,))[0]
+
+    def snapshot(self):
+        """Return a copy of the x -> (y, valid) samples."""
+        with self._lock:
+            return dict(self.samples)
+
+    def evict(self, x_min, x_max):
+        """Once over the limit, keep only the half of the samples nearest to the view."""
+        with self._lock:
+            if len(self.samples) <= self.max_samples:
+                return
+            center = (x_min + x_max) / 2
+            keep = sorted(self.samples, key=lambda x: abs(x - center))[:self.max_samples // 2]
+            self.samples = {x: self.samples[x] for x in keep}
+
+    def clear(self):
+        with self._lock:
+            self.samples = {}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_sample_cache(func):
+    """Return the sample cache for a compiled expression, creating it on first use."""
+    key = func.text.strip()
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SampleCache(func)
+            if len(_caches) >= CACHE_SIZE:
+                _caches.pop(next(iter(_caches)))
+            _caches[key] = cache
+        return cache
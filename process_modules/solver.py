@@ -0,0 +1,130 @@
+"""
+Bracketed one-dimensional solvers for the graph cursor.
+
+The brackets come from samples the plotter already has:
+- sign_changes() finds consecutive samples whose y changes sign (roots),
+- turning_points() finds three consecutive samples where the slope
+  changes sign (minima and maxima).
+
+The brackets are then refined on the function itself:
+- brent_root() uses Brent's method, i.e. inverse quadratic interpolation
+  and secant steps with a bisection fallback;
+- golden_section_min() uses golden-section search.
+
+Each needs a few dozen evaluations at most. f(x) returns a float, or
+None where the function is undefined; the solvers then give up and
+return None.
+"""
+
+import math
+
+EPS = 2.220446049250313e-16
+INV_PHI = (math.sqrt(5) - 1) / 2
+
+
+def sign_changes(samples):
+    """Return (a, b, fa, fb) for consecutive (x, y) samples whose y changes sign.
+
+    A sample is (x, None) where f is undefined; brackets never span one.
+    """
+    brackets = []
+    for (a, fa), (b, fb) in zip(samples, samples[1:]):
+        if fa is None or fb is None:
+            continue
+        if fa == 0 or (fa < 0) != (fb < 0):
+            brackets.append((a, b, fa, fb))
+    return brackets
+
+
+def turning_points(samples):
+    """Return (a, b, kind) brackets around local minima ('min') and maxima ('max')."""
+    brackets = []
+    for (a, fa), (_, fm), (b, fb) in zip(samples, samples[1:], samples[2:]):
+        if fa is None or fm is None or fb is None:
+            continue
+        if fm < fa and fm <= fb:
+            brackets.append((a, b, 'min'))
+        elif fm > fa and fm >= fb:
+            brackets.append((a, b, 'max'))
+    return brackets
+
+
+def brent_root(f, a, b, fa=None, fb=None, xtol=1e-12, maxiter=60):
+    """Find a zero of f in [a, b], where f(a) and f(b) differ in sign."""
+    if fa is None:
+        fa = f(a)
+    if fb is None:
+        fb = f(b)
+    if fa is None or fb is None or (fa > 0 and fb > 0) or (fa < 0 and fb < 0):
+        return None
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(maxiter):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * EPS * abs(b) + xtol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol or fb == 0:
+            return b
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Interpolate: secant when only two points are known, else inverse quadratic
+            s = fb / fa
+            if a == c:
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = f(b)
+        if fb is None:
+            return None
+    return b
+
+
+def golden_section_min(f, a, b, xtol=1e-12, maxiter=80):
+    """Return (x, f(x)) at a minimum of f inside [a, b], or None."""
+    c = b - INV_PHI * (b - a)
+    d = a + INV_PHI * (b - a)
+    fc = f(c)
+    fd = f(d)
+    for _ in range(maxiter):
+        if fc is None or fd is None:
+            return None
+        if abs(b - a) <= xtol + 2 * EPS * abs(c):
+            break
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - INV_PHI * (b - a)
+            fc = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + INV_PHI * (b - a)
+            fd = f(d)
+    x = (a + b) / 2
+    fx = f(x)
+    if fx is None:
+        return None
+    return x, fx
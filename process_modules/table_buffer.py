@@ -0,0 +1,138 @@
+"""
+Scrolling table of x / f(x) values.
+
+table_rows() is a lazy generator over a compiled expression: row i is
+x = start + i * step (rows before start have negative i), and rows are
+evaluated in batches as they are consumed. TableBuffer has the Menu
+interface (buffer, cursor, ref_ar), so a MenuUploader draws it. It only
+pulls the rows of the visible window from the generator and keeps the
+formatted rows in a small LRU, so scrolling back is free and jumping far
+ahead costs one window of evaluations.
+"""
+
+from collections import OrderedDict
+
+ROW_CACHE_SIZE = 64
+X_WIDTH = 9
+
+
+def table_rows(func, start, step, first=0, batch=7):
+    """Yield (i, x, y, valid) for rows first, first + 1, ..., evaluating batch rows at a time."""
+    i = first
+    while True:
+        xs = [start + (i + k) * step for k in range(batch)]
+        ys, valid = func.evaluate(xs)
+        if hasattr(ys, 'tolist'):
+            ys, valid = ys.tolist(), valid.tolist()
+        for k in range(batch):
+            yield i + k, xs[k], ys[k], valid[k]
+        i += batch
+
+
+def format_number(value, width):
+    """Shortest %g form of value that fits in width characters."""
+    for digits in range(min(width, 10), 0, -1):
+        s = "%.*g" % (digits, value)
+        if len(s) <= width:
+            return s
+    return "#" * width
+
+
+class TableBuffer:
+    """Menu-like window of rows over an unbounded x / f(x) table."""
+
+    def __init__(self, func, start=0.0, step=1.0, rows=7, cols=21, cache_size=ROW_CACHE_SIZE):
+        self.func = func
+        self.rows = rows
+        self.cols = cols
+        self.cache_size = cache_size
+        self.evaluations = 0
+        self.configure(start, step)
+
+    def configure(self, start, step):
+        """Restart the table at start with the given step; cursor on the first row."""
+        if step == 0:
+            raise ValueError("step must not be zero")
+        self.start = start
+        self.step = step
+        self.row_cache = OrderedDict()
+        self.menu_cursor = 0
+        self.menu_display_position = 0
+        self._update_display_buffer()
+        self.refresh_rows = (0, self.rows)
+
+    def x_at(self, i):
+        return self.start + i * self.step
+
+    def format_row(self, x, y, valid):
+        y_text = format_number(y, self.cols - X_WIDTH - 1) if valid else "undef"
+        return format_number(x, X_WIDTH).rjust(X_WIDTH) + "|" + y_text.rjust(self.cols - X_WIDTH - 1)
+
+    def _materialize(self, first, count):
+        """Return the formatted rows first .. first + count - 1, evaluating only uncached ones."""
+        cache = self.row_cache
+        missing = [i for i in range(first, first + count) if i not in cache]
+        if missing:
+            lo = missing[0]
+            rows = table_rows(self.func, self.start, self.step, lo, missing[-1] - lo + 1)
+            for _ in range(missing[-1] - lo + 1):
+                i, x, y, valid = next(rows)
+                cache[i] = self.format_row(x, y, valid)
+            self.evaluations += missing[-1] - lo + 1
+        window = []
+        for i in range(first, first + count):
+            cache.move_to_end(i)
+            window.append(cache[i])
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return window
+
+    def _update_display_buffer(self):
+        self.display_buffer = self._materialize(self.menu_display_position, self.rows)
+        self.display_cursor = self.menu_cursor - self.menu_display_position
+
+    def update_buffer(self, text):
+        previous = self.display_cursor
+        position = self.menu_display_position
+        if text == "nav_d":
+            self.menu_cursor += 1
+        elif text == "nav_u":
+            self.menu_cursor -= 1
+        elif text == "nav_r":
+            # Page down: the window and the cursor move by a whole window
+            self.menu_cursor += self.rows
+            self.menu_display_position += self.rows
+        elif text == "nav_l":
+            self.menu_cursor -= self.rows
+            self.menu_display_position -= self.rows
+
+        if self.menu_cursor < self.menu_display_position:
+            self.menu_display_position = self.menu_cursor
+        elif self.menu_cursor >= self.menu_display_position + self.rows:
+            self.menu_display_position = self.menu_cursor - self.rows + 1
+
+        self._update_display_buffer()
+        if self.menu_display_position != position:
+            self.refresh_rows = (0, self.rows)
+        else:
+            lo = min(previous, self.display_cursor)
+            hi = max(previous, self.display_cursor)
+            self.refresh_rows = (lo, hi + 1)
+
+    def selected_x(self):
+        return self.x_at(self.menu_cursor)
+
+    def buffer(self):
+        return self.display_buffer
+
+    def cursor(self):
+        return self.display_cursor
+
+    def ref_ar(self):
+        return self.refresh_rows
+
+    def update(self):
+        self.menu_cursor = 0
+        self.menu_display_position = 0
+        self._update_display_buffer()
+        self.refresh_rows = (0, self.rows)
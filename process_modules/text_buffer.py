@@ -1,76 +1,76 @@
+from process_modules.gap_buffer import GapBuffer
+
+END_MARKER = "𖤓"
+
+
 class Textbuffer:
     def __init__(self, text_buffer="𖤓", rows=7, cols=21):
-        if text_buffer != "𖤓":
-            text_buffer += "𖤓"
-        self.text_buffer = text_buffer
-        self.menu_buffer_size = len(self.text_buffer)
-        self.menu_buffer = list(range(self.menu_buffer_size))
+        if text_buffer.endswith(END_MARKER):
+            text_buffer = text_buffer[:-len(END_MARKER)]
+        self.storage = GapBuffer(text_buffer)
         self.menu_buffer_cursor = 0
         self.rows = rows
         self.cols = cols
         self.display_buffer_position = 0
-        self.display_buffer = self.menu_buffer[
-            self.display_buffer_position : self.display_buffer_position
-            + self.rows * self.cols
-        ]
-        self.no_last_spaces = 0
-        self.buffer_length = self.menu_buffer_size
-        self.text_buffer_with_spaces = self.menu_buffer_size
-        self.extra_spaces = 0
-        self.text_buffer_nospace = 0
         self.refresh_area = (0, self.rows * self.cols)
         self.buffer()
         self.update_buffer("")
 
-    def buffer(self):
+    @property
+    def text_buffer(self):
+        """The text followed by the end marker."""
+        return str(self.storage) + END_MARKER
+
+    @property
+    def text_buffer_nospace(self):
+        return len(self.storage)
 
-        # Calculate the number of spaces needed to make the buffer length a multiple of cols
-        self.buffer_length = len(self.text_buffer)
-        self.text_buffer_nospace = len(self.text_buffer) - 1
+    def _layout(self):
+        # The text plus end marker is padded with spaces to whole rows and at
+        # least one screen; the padding is virtual, only visible rows are built.
+        self.buffer_length = len(self.storage) + 1
         remaining_spaces = (
             self.cols - (self.buffer_length % self.cols)
             if self.buffer_length % self.cols != 0
             else 0
         )
         self.no_last_spaces = remaining_spaces
-
-        # Append all necessary spaces at once to avoid repeated string concatenation
-        if remaining_spaces > 0:
-            self.text_buffer += " " * remaining_spaces
-        # Calculate the menu_buffer only once
         self.menu_buffer_size = self.buffer_length + remaining_spaces
-        # self.menu_buffer = list(range(self.menu_buffer_size))
-        # Ensure text_buffer has enough characters to fill display buffer
         total_buffer_size = self.rows * self.cols
         if self.menu_buffer_size < total_buffer_size:
             self.extra_spaces = total_buffer_size - self.menu_buffer_size
-            self.text_buffer += " " * self.extra_spaces
-            self.menu_buffer_size = self.menu_buffer_size + self.extra_spaces
+            self.menu_buffer_size = total_buffer_size
         else:
             self.extra_spaces = 0
-        self.menu_buffer = list(range(self.menu_buffer_size))
-
-        # Slicing menu_buffer to create the display buffer
+        self.menu_buffer = range(self.menu_buffer_size)
         self.display_buffer = self.menu_buffer[
             self.display_buffer_position : self.display_buffer_position
             + total_buffer_size
         ]
-        new_rows_list = []
 
+    def _row(self, start, end):
+        """Characters start..end of the padded text, materialized on demand."""
+        length = len(self.storage)
+        row = self.storage.slice(start, end)
+        if end > length:
+            if start <= length:
+                row += END_MARKER
+            row += " " * (end - start - len(row))
+        return row
+
+    def buffer(self):
+        self._layout()
+        new_rows_list = []
         for i in range(self.rows):
-            rownew = self.text_buffer[
-                self.display_buffer[self.cols * i] : self.display_buffer[
-                    self.cols * i + self.cols - 1
-                ]
-                + 1
-            ]
-            new_rows_list.append(rownew)
+            row_start = self.display_buffer_position + self.cols * i
+            new_rows_list.append(self._row(row_start, row_start + self.cols))
         return new_rows_list
 
     def update_buffer(self, text):
+        self._layout()
         self.refresh_area = (0, self.rows * self.cols)
         past_buffer_cursor = self.menu_buffer_cursor
-        txt_buf_size = self.menu_buffer[-1] + 1
+        txt_buf_size = self.menu_buffer_size
         if text == "nav_d" or text == "nav_r":
             if text == "nav_d":
                 self.menu_buffer_cursor += self.cols
@@ -141,26 +141,13 @@ class Textbuffer:
                 ) >= self.rows * self.cols:
                     self.display_buffer_position -= self.cols
                     self.refresh_area = (0, self.rows * self.cols)
-                self.text_buffer = (
-                    self.text_buffer[: self.menu_buffer_cursor]
-                    + self.text_buffer[self.menu_buffer_cursor + 1 :]
-                )
                 if going_bottom == False:
-                    self.text_buffer_nospace -= 1
-                    if self.text_buffer_nospace < 0:
-                        self.text_buffer_nospace = 0
+                    self.storage.delete(self.menu_buffer_cursor)
         elif text == "AC":
             self.all_clear()
         else:
             past_buffer_cursor = self.menu_buffer_cursor
-            self.text_buffer = (
-                self.text_buffer[0 : self.menu_buffer_cursor]
-                + text
-                + self.text_buffer[self.menu_buffer_cursor : txt_buf_size]
-            )
-            self.text_buffer_nospace += len(text)
-            self.menu_buffer_size += len(text)
-            self.menu_buffer = list(range(self.menu_buffer_size))
+            self.storage.insert(self.menu_buffer_cursor, text)
             self.menu_buffer_cursor += len(text)
             self.refresh_area = (
                 (past_buffer_cursor - self.display_buffer_position) % self.cols
@@ -176,17 +163,12 @@ class Textbuffer:
                     - ((self.rows - 1) * self.cols)
                 )
                 self.refresh_area = (0, self.rows * self.cols)
-        self.text_buffer = self.text_buffer[0 : self.text_buffer_nospace] + "𖤓"
 
     def all_clear(self):
         self.refresh_area = (0, self.rows * self.cols)
-        self.text_buffer = "𖤓"
-        self.text_buffer_nospace = 0
-        self.menu_buffer_size = 1
-        self.menu_buffer = list(range(self.menu_buffer_size))
+        self.storage.set("")
         self.menu_buffer_cursor = 0
         self.display_buffer_position = 0
-        self.no_last_spaces = 0
 
     def ref_ar(self):
         return self.refresh_area
@@ -211,14 +193,9 @@ class Textbuffer:
     def set_text(self, new_text, cursor=None):
         if new_text is None:
             new_text = ""
-        self.text_buffer = new_text + "𖤓"
-        self.text_buffer_nospace = len(new_text)
-        self.menu_buffer_size = len(self.text_buffer)
-        self.menu_buffer = list(range(self.menu_buffer_size))
+        self.storage.set(new_text)
         self.menu_buffer_cursor = 0
         self.display_buffer_position = 0
-        self.no_last_spaces = 0
-        self.extra_spaces = 0
         if cursor is None:
             cursor = self.text_buffer_nospace
         self.set_cursor(cursor)
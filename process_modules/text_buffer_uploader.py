@@ -20,18 +20,14 @@ class TextUploader(BaseUploader):
         sel_start = selection[0] if selection else None
         sel_end = selection[1] if selection else None
         for i in range(start_row, end_row):
-            self._clear_row_display(i)
             if buf[i].strip()!="" or self.buffer_klass.cursor()//self.buffer_klass.cols==i:
-                j_counter=0
-                for j in buf[i]:
-                    idx = j_counter + i * self.buffer_klass.cols
-                    invert = idx == self.buffer_klass.cursor()
-                    if selection and sel_start <= idx < sel_end:
-                        invert = True
-                    self._print_character(j, invert=invert)
-                    j_counter+=1
+                row_start = i * self.buffer_klass.cols
+                invert_cols = {self.buffer_klass.cursor() - row_start}
+                if selection:
+                    invert_cols.update(range(max(sel_start - row_start, 0), min(sel_end - row_start, self.buffer_klass.cols)))
+                self._update_row(i, buf[i], invert_cols)
             else:
-                self._print_character(" ", invert=False)
+                self._update_row(i, " ")
 
         self._display_bar(state)
         present()
@@ -2,6 +2,7 @@ class BaseUploader:
     def __init__(self, disp_out, chrs):
         self.disp_out=disp_out
         self.chrs=chrs
+        self.rendered_rows={}  # page -> (text, inverted columns, row bytes) last rendered there
         self.disp_out.clear_display()
     def update(self, buffer):
         raise NotImplementedError("To be overridden!")
@@ -10,27 +11,23 @@ class BaseUploader:
 
     
     def _print_character(self, chtr, invert=False):
-        chtr_byte_data = self.chrs.Chr2bytes(chtr)
-        cursor_line = 0b00000000
-        if invert:
-            chtr_byte_data=self.chrs.invert_letter(chtr)
-            cursor_line = 0b11111111
-        for k in chtr_byte_data:
-            self.disp_out.write_data(k)
-        self.disp_out.write_data(cursor_line)
+        self.disp_out.write_run(self.chrs.glyph(chtr, invert))
+
+    def _update_row(self, row, text, invert_cols=()):
+        """Render a row into a page, writing only the columns that changed on screen."""
+        key = invert_cols if invert_cols is True else frozenset(invert_cols)
+        last = self.rendered_rows.get(row)
+        if last is not None and last[0] == text and last[1] == key:
+            data = last[2]
+        else:
+            data = self.chrs.row_bytes(text, invert_cols)
+            self.rendered_rows[row] = (text, key, data)
+        return self.disp_out.update_run(row, 0, data)
     
     def _display_bar(self, state):
         self.disp_out.set_page_address(7)
         self.disp_out.set_column_address(0)
-        j_counter=0
-        for j in state:
-            chtr=j
-            chtr_byte_data=self.chrs.invert_letter(chtr)
-            cursor_line=0b11111111
-            for k in chtr_byte_data:
-                self.disp_out.write_data(k)
-            self.disp_out.write_data(cursor_line)
-            j_counter+=1
+        self.disp_out.write_run(self.chrs.row_bytes(state, True))
     
     def _clear_row_display(self, row):
         self.disp_out.set_page_address(row)
@@ -5,6 +5,8 @@ Single modular UI file for the CalSci simulator.
 Organized into sections for easy maintenance.
 """
 
+from collections import OrderedDict
+import os
 import pygame
 
 # =============================================================================
@@ -58,26 +60,170 @@ def scale_value(value, screen, min_value=0):
 # =============================================================================
 
 BASE_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
-WINDOW_FLAGS = 0
-
-window = pygame.display.set_mode(BASE_SIZE, WINDOW_FLAGS)
+WINDOW_FLAGS = pygame.RESIZABLE
+
+# Initial window scale, e.g. CALSCI_SCALE=2 on HiDPI screens. The whole UI is
+# laid out for the window size, so any scale stays crisp.
+try:
+    WINDOW_SCALE = max(0.25, float(os.environ.get("CALSCI_SCALE", "1")))
+except ValueError:
+    WINDOW_SCALE = 1.0
+WINDOW_SIZE = (int(round(SCREEN_WIDTH * WINDOW_SCALE)), int(round(SCREEN_HEIGHT * WINDOW_SCALE)))
+
+# Display backend, chosen once at startup: "window" (default) opens the pygame
+# window, "headless" renders into an off-screen surface and never updates a
+# window, for scripted batch/CI runs on machines without a display.
+BACKEND = os.environ.get("CALSCI_BACKEND", "window")
+HEADLESS = BACKEND == "headless"
+
+# Record every presented LCD frame to this file (see display/recorder.py).
+RECORD_PATH = os.environ.get("CALSCI_RECORD")
+
+if HEADLESS:
+    # The event queue and timers still need SDL's video subsystem.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    window = pygame.Surface(WINDOW_SIZE)
+else:
+    window = pygame.display.set_mode(WINDOW_SIZE, WINDOW_FLAGS)
 screen = window
 
+FRAME_INTERVAL_MS = 16 # at most one window update per frame (60 Hz)
+
+_present_hooks = []
+_dirty_rects = []
+_full_update = False
+_frame_pending = False
+_last_frame = None
+
+
+def register_present_hook(hook):
+    """Register a callable run right before every window update (e.g. LCD compositing).
+
+    A hook may return the screen rect it redrew so only that area is updated.
+    """
+    if hook not in _present_hooks:
+        _present_hooks.append(hook)
+
+
+def invalidate(rect=None):
+    """Mark a screen area (or, with no rect, the whole window) as changed."""
+    global _full_update
+    if rect is None:
+        _full_update = True
+    else:
+        _dirty_rects.append(pygame.Rect(rect))
+
 
 def present():
-    """Update the display."""
-    pygame.display.update()
+    """Request a frame; requests are coalesced into one update per frame interval.
+
+    A request that arrives within FRAME_INTERVAL_MS of the last update stays
+    pending until the next request after the interval or flush_frame().
+    """
+    global _frame_pending
+    _frame_pending = True
+    now = pygame.time.get_ticks()
+    if _last_frame is None or now - _last_frame >= FRAME_INTERVAL_MS:
+        flush_frame()
+
+
+def flush_frame():
+    """Run the present hooks and update the changed parts of the window, if a frame is pending."""
+    global _frame_pending, _full_update, _last_frame
+    if not _frame_pending:
+        return
+    _frame_pending = False
+    _last_frame = pygame.time.get_ticks()
+    for hook in _present_hooks:
+        rect = hook()
+        if rect is not None:
+            _dirty_rects.append(rect)
+    if not HEADLESS:
+        if _full_update:
+            pygame.display.update()
+        elif _dirty_rects:
+            pygame.display.update(_dirty_rects)
+    _dirty_rects.clear()
+    _full_update = False
+
+
+_resize_hooks = []
+_idle_hooks = []
+
+# Posted by wake(); the input loop treats it like any other non-key event.
+WAKE_EVENT = pygame.event.custom_type()
+
+
+def register_resize_hook(hook):
+    """Register a callable run after the window has been resized."""
+    if hook not in _resize_hooks:
+        _resize_hooks.append(hook)
+
+
+def register_idle_hook(hook):
+    """Register a callable run on the UI thread whenever it is about to wait for input."""
+    if hook not in _idle_hooks:
+        _idle_hooks.append(hook)
+
+
+def unregister_idle_hook(hook):
+    if hook in _idle_hooks:
+        _idle_hooks.remove(hook)
+
+
+def idle():
+    """Run the idle hooks, then flush a pending frame."""
+    for hook in list(_idle_hooks):
+        hook()
+    flush_frame()
+
+
+def wake():
+    """Wake the UI thread from a worker thread so the idle hooks run soon.
+
+    pygame.event.post is safe to call from any thread.
+    """
+    pygame.event.post(pygame.event.Event(WAKE_EVENT))
+
+
+def resize_window(size):
+    """Resize the window (the screen surface stays the same object) and re-layout."""
+    if HEADLESS or tuple(size) == screen.get_size():
+        return
+    pygame.display.set_mode(size, WINDOW_FLAGS)
+    for hook in _resize_hooks:
+        hook()
+    invalidate()
+    present()
 
 
 def map_input_pos(pos):
-    """Map input position (for future scaling support)."""
-    return pos
+    """Map a window position (mouse event) to screen surface pixels.
+
+    They differ on HiDPI displays, where the window is measured in points.
+    """
+    if HEADLESS:
+        return pos
+    win_w, win_h = pygame.display.get_window_size()
+    width, height = screen.get_size()
+    if (win_w, win_h) == (width, height) or win_w <= 0 or win_h <= 0:
+        return pos
+    return (pos[0] * width // win_w, pos[1] * height // win_h)
 
 
 # =============================================================================
 # FONTS
 # =============================================================================
 
+FONT_PATH = "assets/DejaVuSans.ttf"
+SYMBOL_FONT_PATH = "assets/notosymbols2.ttf"
+EMOJI_FONT_PATH = "assets/notoemoji.ttf"
+
+GLYPH_CACHE_SIZE = 512
+FACE_CACHE_SIZE = 256
+
 main_font = None
 label_font = None
 tiny_label_font = None
@@ -85,15 +231,54 @@ fallback_font = None
 emoji_font = None
 _last_scale = None
 
+_fonts = {}  # (path, size) -> Font, every size is loaded from disk only once
+
+
+class SurfaceCache:
+    """Small LRU cache of rendered surfaces."""
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        surface = self.items.get(key)
+        if surface is not None:
+            self.items.move_to_end(key)
+        return surface
+
+    def put(self, key, surface):
+        self.items[key] = surface
+        self.items.move_to_end(key)
+        if len(self.items) > self.size:
+            self.items.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.items.clear()
+
+
+glyph_cache = SurfaceCache(GLYPH_CACHE_SIZE)  # rendered labels
+face_cache = SurfaceCache(FACE_CACHE_SIZE)    # complete key faces
+
+
+def load_font(path, size):
+    """Return the Font for path at size, loading it on first use."""
+    font = _fonts.get((path, size))
+    if font is None:
+        font = pygame.font.Font(path, size)
+        _fonts[(path, size)] = font
+    return font
+
 
 def init_fonts():
     """Initialize fonts (call after pygame.font.init())."""
     global main_font, label_font, tiny_label_font, fallback_font, emoji_font
-    main_font = pygame.font.Font("assets/DejaVuSans.ttf", 14)
-    label_font = pygame.font.Font("assets/DejaVuSans.ttf", 12)
-    tiny_label_font = pygame.font.Font("assets/DejaVuSans.ttf", 9)
-    fallback_font = pygame.font.Font("assets/notosymbols2.ttf", 14)
-    emoji_font = pygame.font.Font("assets/notoemoji.ttf", 14)
+    main_font = load_font(FONT_PATH, 14)
+    label_font = load_font(FONT_PATH, 12)
+    tiny_label_font = load_font(FONT_PATH, 9)
+    fallback_font = load_font(SYMBOL_FONT_PATH, 14)
+    emoji_font = load_font(EMOJI_FONT_PATH, 14)
 
 
 def _ensure_fonts(scale):
@@ -104,14 +289,49 @@ def _ensure_fonts(scale):
     main_size = max(8, int(round(14 * scale)))
     label_size = max(7, int(round(12 * scale)))
     tiny_size = max(6, int(round(9 * scale)))
-    main_font = pygame.font.Font("assets/DejaVuSans.ttf", main_size)
-    label_font = pygame.font.Font("assets/DejaVuSans.ttf", label_size)
-    tiny_label_font = pygame.font.Font("assets/DejaVuSans.ttf", tiny_size)
-    fallback_font = pygame.font.Font("assets/notosymbols2.ttf", main_size)
-    emoji_font = pygame.font.Font("assets/notoemoji.ttf", main_size)
+    main_font = load_font(FONT_PATH, main_size)
+    label_font = load_font(FONT_PATH, label_size)
+    tiny_label_font = load_font(FONT_PATH, tiny_size)
+    fallback_font = load_font(SYMBOL_FONT_PATH, main_size)
+    emoji_font = load_font(EMOJI_FONT_PATH, main_size)
     _last_scale = scale
 
 
+EMOJI_CHARS = ["🗐", "📋", "🧰", "📶", "🔆", "🅱"]
+
+
+def _font_for(text, role):
+    """Resolve a font role ("main", "label" or "tiny") for text, with glyph fallbacks."""
+    if role == "tiny":
+        font = tiny_label_font
+    elif role == "label":
+        font = label_font
+    else:
+        font = main_font
+
+    metrics = font.metrics(text)
+    if metrics is None or any(m is None for m in metrics):
+        font = fallback_font
+
+    if text in EMOJI_CHARS:
+        font = emoji_font
+    return font
+
+
+def render_text(text, role, color, bg_color=None):
+    """Render text in a font role, cached by (text, role, colour, scale)."""
+    key = (text, role, color, bg_color, _last_scale)
+    surface = glyph_cache.get(key)
+    if surface is None:
+        font = _font_for(text, role)
+        if bg_color is None:
+            surface = font.render(text, True, color)
+        else:
+            surface = font.render(text, True, color, bg_color)
+        glyph_cache.put(key, surface)
+    return surface
+
+
 # =============================================================================
 # SHELL / SKIN
 # =============================================================================
@@ -133,6 +353,7 @@ def draw_shell(screen):
         h = screen.get_height()
 
     screen.fill(CASE_DARK)
+    invalidate()
 
     case_padding = scale_value(CASE_PADDING, screen, min_value=0)
     case_radius = scale_value(CASE_RADIUS, screen, min_value=0)
@@ -152,7 +373,7 @@ def draw_shell(screen):
     label_y = case_padding + scale_value(8, screen, min_value=0)
     label_radius = scale_value(6, screen, min_value=0)
     pygame.draw.rect(screen, LABEL_BG, (label_x, label_y, label_w, label_h), border_radius=label_radius)
-    lbl_font = pygame.font.Font("assets/DejaVuSans.ttf", max(8, scale_value(LABEL_FONT_SIZE, screen, min_value=1)))
+    lbl_font = load_font(FONT_PATH, max(8, scale_value(LABEL_FONT_SIZE, screen, min_value=1)))
     text = lbl_font.render("CalSci", True, LABEL_TEXT)
     screen.blit(text, text.get_rect(center=(label_x + label_w // 2, label_y + label_h // 2)))
 
@@ -176,6 +397,8 @@ def draw_shell(screen):
 class Button:
     """Basic button component."""
 
+    SHADOW = 2  # the unpressed shadow hangs this far below the key
+
     def __init__(self, text, width=60, height=60, pos_x=0, pos_y=0, enabled=False, shape="rect"):
         self.text = text
         self.width = width
@@ -183,19 +406,33 @@ class Button:
         self.font = main_font
         self.fallback_font = fallback_font
         self.emoji_font = emoji_font
-        self.rect = None
+        self.rect = pygame.Rect(pos_x, pos_y, width, height)
         self.pos_x = pos_x
         self.pos_y = pos_y
         self.enabled = enabled
         self.shape = shape
 
     def draw(self, screen, pressed=False):
-        _ensure_fonts(get_scale(screen))
-        self.font = main_font
-        self.fallback_font = fallback_font
-        self.emoji_font = emoji_font
-        position_x = self.pos_x
-        position_y = self.pos_y
+        scale = get_scale(screen)
+        _ensure_fonts(scale)
+        self.rect = pygame.Rect(self.pos_x, self.pos_y, self.width, self.height)
+        screen.blit(self.get_face(scale, pressed), self.rect)
+        invalidate((self.pos_x, self.pos_y, self.width, self.height + self.SHADOW))
+
+    def face_key(self, scale, pressed):
+        return ("button", self.text, self.width, self.height, self.shape, self.enabled, pressed, scale)
+
+    def get_face(self, scale, pressed=False):
+        """Return the pre-rendered key face (shadow, body and labels) for a state."""
+        key = self.face_key(scale, pressed)
+        face = face_cache.get(key)
+        if face is None:
+            face = pygame.Surface((self.width, self.height + self.SHADOW), pygame.SRCALPHA)
+            self.draw_face(face, scale, pressed)
+            face_cache.put(key, face)
+        return face
+
+    def draw_face(self, surface, scale, pressed):
         if self.shape == "circle":
             radius = min(self.width, self.height) // 2
         else:
@@ -207,29 +444,29 @@ class Button:
             base_color = (205, 205, 205)
         shadow_color = (140, 140, 140)
         border_color = (85, 85, 85)
-        shadow_offset = 2
+        shadow_offset = self.SHADOW
         text_offset = 0
         if pressed:
             shadow_color = (95, 95, 95)
             border_color = (55, 55, 55)
             shadow_offset = 0
-            text_offset = max(1, int(round(2 * get_scale(screen))))
+            text_offset = max(1, int(round(2 * scale)))
 
-        shadow = pygame.Rect(position_x, position_y + shadow_offset, self.width, self.height)
-        pygame.draw.rect(screen, shadow_color, shadow, border_radius=radius)
+        shadow = pygame.Rect(0, shadow_offset, self.width, self.height)
+        pygame.draw.rect(surface, shadow_color, shadow, border_radius=radius)
 
-        self.rect = pygame.Rect(position_x, position_y, self.width, self.height)
-        pygame.draw.rect(screen, base_color, self.rect, border_radius=radius)
-        pygame.draw.rect(screen, border_color, self.rect, width=1, border_radius=radius)
+        body = pygame.Rect(0, 0, self.width, self.height)
+        pygame.draw.rect(surface, base_color, body, border_radius=radius)
+        pygame.draw.rect(surface, border_color, body, width=1, border_radius=radius)
 
         text = self.get_text_font(self.text, (0, 0, 0), None)
 
         rect = text.get_rect()
         rect.topleft = (
-            position_x + self.width // 2 - text.get_width() // 2,
-            position_y + self.height // 2 - text.get_height() // 2 + text_offset,
+            self.width // 2 - text.get_width() // 2,
+            self.height // 2 - text.get_height() // 2 + text_offset,
         )
-        screen.blit(text, rect)
+        surface.blit(text, rect)
 
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
@@ -239,21 +476,10 @@ class Button:
 
     def get_text_font(self, text, text_color, bg_color=None, small=False, tiny=False):
         if tiny:
-            font = tiny_label_font
+            role = "tiny"
         else:
-            font = label_font if small else self.font
-
-        metrics = font.metrics(text)
-        if metrics is None or any(m is None for m in metrics):
-            font = self.fallback_font
-
-        emoji_chars = ["🗐", "📋", "🧰", "📶", "🔆", "🅱"]
-        if text in emoji_chars:
-            font = self.emoji_font
-
-        if bg_color is None:
-            return font.render(text, True, text_color)
-        return font.render(text, True, text_color, bg_color)
+            role = "label" if small else "main"
+        return render_text(text, role, text_color, bg_color)
 
 
 class OtherButton(Button):
@@ -268,23 +494,25 @@ class OtherButton(Button):
         self.font = main_font
         self.fallback_font = fallback_font
         self.emoji_font = emoji_font
-        self.rect = None
+        self.rect = pygame.Rect(pos_x, pos_y, width, height)
         self.pos_x = pos_x
         self.pos_y = pos_y
 
     def draw(self, screen, state, pressed=False):
-        _ensure_fonts(get_scale(screen))
-        self.font = main_font
-        self.fallback_font = fallback_font
-        self.emoji_font = emoji_font
-        pad = max(2, int(round(4 * get_scale(screen))))
-        text_offset = max(1, int(round(2 * get_scale(screen)))) if pressed else 0
+        Button.draw(self, screen, pressed=pressed)
+
+    def face_key(self, scale, pressed):
+        return ("other", self.text, self.alpha_text, self.beta_text, self.width, self.height, pressed, scale)
+
+    def draw_face(self, surface, scale, pressed):
+        pad = max(2, int(round(4 * scale)))
+        text_offset = max(1, int(round(2 * scale))) if pressed else 0
         alpha_color = (0, 0, 0)
         beta_color = (0, 0, 0)
 
-        self.rect = pygame.Rect(self.pos_x, self.pos_y, self.width, self.height)
+        body = pygame.Rect(0, 0, self.width, self.height)
         radius = max(4, min(10, self.height // 5))
-        shadow_offset = 2
+        shadow_offset = self.SHADOW
         shadow_color = (140, 140, 140)
         border_color = (85, 85, 85)
         base_color = (230, 230, 230)
@@ -293,10 +521,10 @@ class OtherButton(Button):
             shadow_color = (95, 95, 95)
             border_color = (55, 55, 55)
             base_color = (200, 200, 200)
-        shadow = self.rect.move(0, shadow_offset)
-        pygame.draw.rect(screen, shadow_color, shadow, border_radius=radius)
-        pygame.draw.rect(screen, base_color, self.rect, border_radius=radius)
-        pygame.draw.rect(screen, border_color, self.rect, width=1, border_radius=radius)
+        shadow = body.move(0, shadow_offset)
+        pygame.draw.rect(surface, shadow_color, shadow, border_radius=radius)
+        pygame.draw.rect(surface, base_color, body, border_radius=radius)
+        pygame.draw.rect(surface, border_color, body, width=1, border_radius=radius)
 
         if self.alpha_text:
             alpha_is_tiny = self.alpha_text.lower() in {"caps", "undo"}
@@ -304,10 +532,10 @@ class OtherButton(Button):
             text = self.get_text_font(self.alpha_text, alpha_color, None, small=True, tiny=alpha_is_tiny)
             rect_text = text.get_rect()
             rect_text.topleft = (
-                self.pos_x + pad - (1 if alpha_is_caps else 0),
-                self.pos_y + pad + (1 if alpha_is_tiny else 0) + text_offset,
+                pad - (1 if alpha_is_caps else 0),
+                pad + (1 if alpha_is_tiny else 0) + text_offset,
             )
-            screen.blit(text, rect_text)
+            surface.blit(text, rect_text)
 
         if self.beta_text:
             beta_is_tiny = self.beta_text.lower() in {"caps", "undo"}
@@ -315,15 +543,15 @@ class OtherButton(Button):
             text = self.get_text_font(self.beta_text, beta_color, None, small=True, tiny=beta_is_tiny)
             rect_text = text.get_rect()
             rect_text.topright = (
-                self.pos_x + self.width - pad + (1 if beta_is_undo else 0),
-                self.pos_y + pad + (1 if beta_is_tiny else 0) + text_offset,
+                self.width - pad + (1 if beta_is_undo else 0),
+                pad + (1 if beta_is_tiny else 0) + text_offset,
             )
-            screen.blit(text, rect_text)
+            surface.blit(text, rect_text)
 
         text = self.get_text_font(self.text, (0, 0, 0), None)
         rect_text = text.get_rect()
-        rect_text.midbottom = (self.pos_x + self.width // 2, self.pos_y + self.height - pad + text_offset)
-        screen.blit(text, rect_text)
+        rect_text.midbottom = (self.width // 2, self.height - pad + text_offset)
+        surface.blit(text, rect_text)
 
     def get_text(self, state="d"):
         if state == "a" and self.alpha_text:
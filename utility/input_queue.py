@@ -0,0 +1,200 @@
+"""
+Queued, non-blocking keypad input for the simulator.
+
+Mouse clicks on the on-screen keypad, physical keyboard shortcuts and
+scripted keys all become KeyEvent objects in one FIFO queue. Button press
+animations and key repeat run on timers that are serviced while the queue
+is polled, so nothing sleeps between a key press and the app seeing it.
+"""
+
+from collections import deque
+import pygame
+
+PRESS_ANIMATION_MS = 70
+REPEAT_DELAY_MS = 400
+REPEAT_INTERVAL_MS = 80
+FRAME_MS = 16
+
+# Keys that auto-repeat while held (mouse or keyboard).
+REPEAT_KEYS = {"nav_u", "nav_d", "nav_l", "nav_r", "nav_b"}
+
+# Physical keyboard shortcuts -> (col, row) on the utility.keymap.Keypad
+# matrix, so a shortcut behaves like the physical key in the active layer.
+KEYBOARD_SHORTCUTS = {
+    pygame.K_F1: (1, 0),          # alpha
+    pygame.K_F2: (2, 0),          # beta
+    pygame.K_HOME: (3, 0),
+    pygame.K_ESCAPE: (1, 1),      # back
+    pygame.K_LEFT: (0, 2),
+    pygame.K_DOWN: (1, 2),
+    pygame.K_RIGHT: (2, 2),
+    pygame.K_RETURN: (3, 2),      # ok
+    pygame.K_UP: (4, 2),
+    pygame.K_7: (0, 6), pygame.K_KP7: (0, 6),
+    pygame.K_8: (1, 6), pygame.K_KP8: (1, 6),
+    pygame.K_9: (2, 6), pygame.K_KP9: (2, 6),
+    pygame.K_BACKSPACE: (3, 6),
+    pygame.K_DELETE: (4, 6),      # AC
+    pygame.K_4: (0, 7), pygame.K_KP4: (0, 7),
+    pygame.K_5: (1, 7), pygame.K_KP5: (1, 7),
+    pygame.K_6: (2, 7), pygame.K_KP6: (2, 7),
+    pygame.K_ASTERISK: (3, 7), pygame.K_KP_MULTIPLY: (3, 7),
+    pygame.K_SLASH: (4, 7), pygame.K_KP_DIVIDE: (4, 7),
+    pygame.K_1: (0, 8), pygame.K_KP1: (0, 8),
+    pygame.K_2: (1, 8), pygame.K_KP2: (1, 8),
+    pygame.K_3: (2, 8), pygame.K_KP3: (2, 8),
+    pygame.K_PLUS: (3, 8), pygame.K_KP_PLUS: (3, 8),
+    pygame.K_MINUS: (4, 8), pygame.K_KP_MINUS: (4, 8),
+    pygame.K_PERIOD: (0, 9), pygame.K_KP_PERIOD: (0, 9),
+    pygame.K_0: (1, 9), pygame.K_KP0: (1, 9),
+    pygame.K_COMMA: (2, 9),
+    pygame.K_KP_ENTER: (4, 9),    # exe
+}
+
+# Shifted characters are matched on the typed text before the key code.
+TEXT_SHORTCUTS = {
+    "*": (3, 7),
+    "/": (4, 7),
+    "+": (3, 8),
+    "-": (4, 8),
+}
+
+
+class KeyEvent:
+    """One key press: the resolved key value, when it happened and where it came from."""
+
+    def __init__(self, key, time, source="script", repeat=False, button=None):
+        self.key = key
+        self.time = time
+        self.source = source  # "mouse", "keyboard" or "script"
+        self.repeat = repeat
+        self.button = button
+
+    def __repr__(self):
+        return f"KeyEvent({self.key!r}, {self.time}, {self.source}{', repeat' if self.repeat else ''})"
+
+
+class InputQueue:
+    """FIFO of KeyEvents fed from pygame events, key repeat and injected scripts.
+
+    hit_test(pos) returns (key, button) for a click on the keypad or None.
+    on_press/on_release(button) draw the pressed and released key faces; the
+    release is scheduled PRESS_ANIMATION_MS later instead of sleeping.
+    on_idle() runs before waiting for events, e.g. to flush a pending frame,
+    and on_resize(size) when the window is resized.
+    """
+
+    def __init__(self, keypad, hit_test=None, on_press=None, on_release=None, on_idle=None, on_resize=None):
+        self.keypad = keypad
+        self.hit_test = hit_test
+        self.on_press = on_press
+        self.on_release = on_release
+        self.on_idle = on_idle
+        self.on_resize = on_resize
+        self.events = deque()
+        self.releases = []  # [(release_at_ms, button)]
+        self.held = None    # [source, ident, key, button, next_repeat_ms]
+
+    def now(self):
+        return pygame.time.get_ticks()
+
+    def inject(self, *keys):
+        """Queue scripted keys; they are delivered without animation or delay."""
+        now = self.now()
+        for key in keys:
+            self.events.append(KeyEvent(key, now, source="script"))
+
+    def pending(self):
+        return len(self.events)
+
+    def clear(self):
+        self.events.clear()
+
+    def get(self):
+        """Return the next KeyEvent or None, without blocking."""
+        if not self.events:
+            self.poll()
+        if self.events:
+            return self.events.popleft()
+        return None
+
+    def wait(self):
+        """Return the next KeyEvent, sleeping in pygame until one arrives."""
+        while True:
+            event = self.get()
+            if event is not None:
+                return event
+            if self.on_idle:
+                self.on_idle()
+            if self.releases or self.held:
+                self.handle(pygame.event.wait(FRAME_MS))
+            else:
+                self.handle(pygame.event.wait())
+
+    def poll(self):
+        """Move pending pygame events into the queue and service timers."""
+        for event in pygame.event.get():
+            self.handle(event)
+        self.service_timers()
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            quit()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            hit = self.hit_test(event.pos) if self.hit_test else None
+            if hit is not None:
+                key, button = hit
+                self.press(key, "mouse", button, button)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.release_held("mouse")
+        elif event.type == pygame.KEYDOWN:
+            key = self.key_for(event)
+            if key is not None:
+                self.press(key, "keyboard", event.key, None)
+        elif event.type == pygame.KEYUP:
+            if self.held and self.held[1] == event.key:
+                self.held = None
+        elif event.type == pygame.VIDEORESIZE:
+            if self.on_resize:
+                self.on_resize(event.size)
+        self.service_timers()
+
+    def key_for(self, event):
+        """Resolve a keyboard event through the keypad layout, or to a typed letter."""
+        position = TEXT_SHORTCUTS.get(event.unicode) or KEYBOARD_SHORTCUTS.get(event.key)
+        if position is not None:
+            return self.keypad.key_out(*position)
+        if len(event.unicode) == 1 and event.unicode.isascii() and event.unicode.isalpha():
+            return event.unicode
+        return None
+
+    def press(self, key, source, ident, button):
+        now = self.now()
+        self.events.append(KeyEvent(key, now, source=source, button=button))
+        if button is not None:
+            if self.on_press:
+                self.on_press(button)
+            self.releases.append((now + PRESS_ANIMATION_MS, button))
+        if key in REPEAT_KEYS:
+            self.held = [source, ident, key, button, now + REPEAT_DELAY_MS]
+        else:
+            self.held = None
+
+    def release_held(self, source):
+        if self.held and self.held[0] == source:
+            self.held = None
+
+    def service_timers(self):
+        now = self.now()
+        if self.releases:
+            due = [button for at, button in self.releases if at <= now]
+            if due:
+                self.releases = [(at, button) for at, button in self.releases if at > now]
+                if self.on_release:
+                    for button in due:
+                        self.on_release(button)
+        if self.held and self.held[4] <= now:
+            source, ident, key, button, _ = self.held
+            self.events.append(KeyEvent(key, now, source=source, repeat=True, button=button))
+            self.held[4] = now + REPEAT_INTERVAL_MS
@@ -21,9 +21,40 @@ MAIN_KEY = 50
 MAIN_GAP_X = 5
 MAIN_GAP_Y = 16
 
+LETTER_KEYS = [KB.A, KB.B, KB.C, KB.D, KB.E, KB.F, KB.G, KB.H, KB.I, KB.J, KB.K, KB.L, KB.M, KB.N, KB.O, KB.P, KB.Q, KB.R, KB.S, KB.T, KB.U, KB.V, KB.W, KB.X, KB.Y, KB.Z]
+
+HIT_CELL = 16 # side of a hit-test grid cell in screen pixels
+
+
+def _system_face(kb, alpha=False, beta=False, caps=False):
+    """Return (label, enabled) of a system/nav key in the given keypad mode."""
+    enabled = (kb==KB.ALPHA and alpha) or (kb==KB.BETA and beta) or (kb==KB.CAPS and caps)
+    value = KB.get_symbol(kb)
+    if caps and kb in LETTER_KEYS:
+        value = KB.get_symbol(kb).capitalize()
+    return value, enabled
+
+
+def _alpha_label(kb, caps=False):
+    alpha = KB.get_symbol(kb)
+    if caps:
+        alpha = KB.get_symbol(alpha).capitalize()
+    return alpha
+
+
 def get_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
     draw_shell(screen)
+    buttons = build_buttons(screen, alpha=alpha, beta=beta, caps=caps)
+
+    # --- Draw all buttons ---
+    for button in buttons:
+        button.draw(screen)
+
+    return buttons
+
 
+def build_buttons(screen, alpha=False, beta=False, caps=False):
+    """Create the system and navigation buttons without drawing them."""
     HEIGHT = scale_value(SYSTEM_KEY, screen, min_value=1)
     WIDTH = HEIGHT
     GAP_X = scale_value(SYSTEM_GAP_X, screen, min_value=1)
@@ -41,16 +72,11 @@ def get_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
         """Helper: creates buttons in a row with given gap."""
         buttons = []
         for i, kb in enumerate(row):
-            enabled = False
-            
-            value = KB.get_symbol(kb)
-            if (kb==KB.ALPHA and alpha) or (kb==KB.BETA and beta) or (kb==KB.CAPS and caps):
-                enabled = True 
-            if caps and kb in [KB.A, KB.B, KB.C, KB.D, KB.E, KB.F, KB.G, KB.H, KB.I, KB.J, KB.K, KB.L, KB.M, KB.N, KB.O, KB.P, KB.Q, KB.R, KB.S, KB.T, KB.U, KB.V, KB.W, KB.X, KB.Y, KB.Z]:
-                value = KB.get_symbol(kb).capitalize()
-            
+            value, enabled = _system_face(kb, alpha, beta, caps)
             shape = "circle" if kb in (KB.RST, KB.BT) else "rect"
-            buttons.append(Button(value, HEIGHT, WIDTH, start_x + i * (WIDTH + gap_x), start_y, enabled, shape=shape))
+            button = Button(value, HEIGHT, WIDTH, start_x + i * (WIDTH + gap_x), start_y, enabled, shape=shape)
+            button.kb = kb
+            buttons.append(button)
 
 
         return buttons
@@ -88,6 +114,8 @@ def get_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
         Button(KB.get_symbol(KB.NAV_L), nav_lr_w, nav_lr_h, nav_left_edge, nav_lr_y),
         Button(KB.get_symbol(KB.NAV_R), nav_lr_w, nav_lr_h, nav_left_edge + nav_lr_w + nav_gap + nav_ok_size + nav_gap, nav_lr_y),
     ]
+    for button, kb in zip(nav_buttons, (KB.OK, KB.NAV_U, KB.NAV_D, KB.NAV_L, KB.NAV_R)):
+        button.kb = kb
     buttons.extend(nav_buttons)
 
     # --- System Buttons (top-left small grid) ---
@@ -101,17 +129,20 @@ def get_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
         y = system_y_start + (HEIGHT + GAP_Y) * i
         buttons.extend(create_row(row, system_start_x, y, GAP_X))
 
-    # --- Keyboard Layouts ---
-    
+    return buttons
 
-    # --- Draw all buttons ---
-    for button in buttons:
-        button.draw(screen)
 
+def get_other_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
+    buttons = build_other_buttons(screen, alpha=alpha, beta=beta, caps=caps)
+
+    for button in buttons:
+        button.draw(screen, state=state)
+    
     return buttons
 
 
-def get_other_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
+def build_other_buttons(screen, alpha=False, beta=False, caps=False):
+    """Create the main keypad buttons without drawing them."""
     HEIGHT = scale_value(MAIN_KEY, screen, min_value=1)
     WIDTH = HEIGHT
     GAP_X = scale_value(MAIN_GAP_X, screen, min_value=1)
@@ -177,19 +208,10 @@ def get_other_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
 
         buttons = []
         for i, kb in enumerate(row):
-            enabled = False
-            # print(kb)
             default, alpha, beta = kb
-            default = KB.get_symbol(default)
-            alpha = KB.get_symbol(alpha)
-            beta = KB.get_symbol(beta)
-            
-            if (kb==KB.ALPHA and alpha) or (kb==KB.BETA and beta) or (kb==KB.CAPS and caps):
-                enabled = True 
-            if caps:
-                alpha = KB.get_symbol(alpha).capitalize()
-            
-            buttons.append(OtherButton(text=default, alpha_text=alpha, beta_text=beta, height=HEIGHT, width=WIDTH, pos_x=start_x + i * (WIDTH + gap_x), pos_y=start_y, enabled=enabled))
+            button = OtherButton(text=KB.get_symbol(default), alpha_text=_alpha_label(alpha, caps), beta_text=KB.get_symbol(beta), height=HEIGHT, width=WIDTH, pos_x=start_x + i * (WIDTH + gap_x), pos_y=start_y)
+            button.kb = kb
+            buttons.append(button)
 
 
         return buttons
@@ -212,8 +234,68 @@ def get_other_buttons(screen, alpha=False, beta=False, caps=False, state="d"):
         section_2_gap_x = max(int((MAIN_AREA_WIDTH - (5 * WIDTH)) / 4), GAP_X + scale_value(20, screen, min_value=0))
         buttons.extend(create_row(row, left_margin, y, section_2_gap_x))
 
-
-    for button in buttons:
-        button.draw(screen, state=state)
-    
     return buttons
+
+
+class KeypadLayout:
+    """Keypad buttons built once per screen size, with a grid index for hit tests.
+
+    Mode switches only swap labels/enabled flags and redraw the keys whose
+    face actually changed; the shell is drawn once by draw_all().
+    """
+
+    def __init__(self, screen, alpha=False, beta=False, caps=False):
+        self.screen = screen
+        self.size = screen.get_size()
+        self.mode = (alpha, beta, caps)
+        self.system_buttons = build_buttons(screen, alpha=alpha, beta=beta, caps=caps)
+        self.main_buttons = build_other_buttons(screen, alpha=alpha, beta=beta, caps=caps)
+        self.buttons = self.system_buttons + self.main_buttons
+        self.cell = max(1, scale_value(HIT_CELL, screen, min_value=1))
+        self.index = {}
+        for button in self.buttons:
+            rect = button.rect
+            for cx in range(rect.left // self.cell, (rect.right - 1) // self.cell + 1):
+                for cy in range(rect.top // self.cell, (rect.bottom - 1) // self.cell + 1):
+                    self.index.setdefault((cx, cy), []).append(button)
+
+    def is_stale(self):
+        return self.screen.get_size() != self.size
+
+    def button_at(self, pos):
+        x, y = pos
+        for button in self.index.get((int(x) // self.cell, int(y) // self.cell), ()):
+            if button.rect.collidepoint(pos):
+                return button
+        return None
+
+    def draw_button(self, button, pressed=False, state="d"):
+        if isinstance(button, OtherButton):
+            button.draw(self.screen, state=state, pressed=pressed)
+        else:
+            button.draw(self.screen, pressed=pressed)
+
+    def draw_all(self, state="d"):
+        draw_shell(self.screen)
+        for button in self.buttons:
+            self.draw_button(button, state=state)
+
+    def set_mode(self, alpha=False, beta=False, caps=False, state="d"):
+        """Swap key faces for a new mode; returns the buttons that were redrawn."""
+        if self.mode == (alpha, beta, caps):
+            return []
+        self.mode = (alpha, beta, caps)
+        changed = []
+        for button in self.system_buttons:
+            face = _system_face(button.kb, alpha, beta, caps)
+            if face != (button.text, button.enabled):
+                button.text, button.enabled = face
+                changed.append(button)
+        for button in self.main_buttons:
+            label = _alpha_label(button.kb[1], caps)
+            if label != button.alpha_text:
+                button.alpha_text = label
+                changed.append(button)
+        for button in changed:
+            self.draw_button(button, state=state)
+        return changed